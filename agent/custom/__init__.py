@@ -1 +1,3 @@
-from .action import *
\ No newline at end of file
+from .action import *
+from .reco import *
+from .sink import *
\ No newline at end of file
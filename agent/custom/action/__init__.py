@@ -1,4 +1,6 @@
 from .common import *
 from .select_job import *
 from .map_cleanup import *
-from .select_map import *
\ No newline at end of file
+from .select_map import *
+from .farm_all import *
+from .watchdog import *
\ No newline at end of file
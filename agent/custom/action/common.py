@@ -1,23 +1,29 @@
-import os
 import json
 import random
+import time
 from typing import Optional, Tuple
 
-from PIL import Image
-
 from maa.agent.agent_server import AgentServer, TaskDetail
 from maa.custom_action import CustomAction
 from maa.context import Context
 from maa.define import RectType
 
-from utils.logger import logger, log_dir
+from utils.artifacts import artifact_store
+from utils.logger import logger
 from utils import get_format_timestamp
+from utils.metrics import battles_total, click_seconds
+from utils import session
+from utils.coords import scale_rect, screen_scale
 
 
 def click(context: Context, x: int, y: int, w: int = 1, h: int = 1):
-    context.tasker.controller.post_click(
-        random.randint(x, x + w - 1), random.randint(y, y + h - 1)
-    ).wait()
+    """在 720 短边设计坐标系中点击，按当前截图分辨率换算（见 utils.coords）。"""
+    x, y, w, h = scale_rect([x, y, w, h], screen_scale(context))
+    click_x, click_y = random.randint(x, x + w - 1), random.randint(y, y + h - 1)
+    session.record_event("click", {"x": click_x, "y": click_y})
+    start = time.perf_counter()
+    context.tasker.controller.post_click(click_x, click_y).wait()
+    click_seconds.observe(time.perf_counter() - start)
 
 
 @AgentServer.custom_action("MyAction111")
@@ -43,10 +49,25 @@ class MyAction111(CustomAction):
         return CustomAction.RunResult(success=True)
 
 
+@AgentServer.custom_action("RecordBattle")
+class RecordBattle(CustomAction):
+    """战斗结束（WaitBattleEnd 命中）时计数，供 metrics 统计每小时战斗数。"""
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+        battles_total.inc()
+        session.record_event("battle_end", {"node": argv.node_name})
+        return CustomAction.RunResult(success=True)
+
+
 @AgentServer.custom_action("Screenshot")
 class Screenshot(CustomAction):
     """
-    自定义截图动作，保存当前屏幕截图到指定目录。
+    自定义截图动作，保存当前屏幕截图到 log_dir（受调试产物总大小上限管理）。
+    开启会话录制（MAA_RECORD_SESSION）时写入录制文件而不是单独的 PNG。
 
     参数格式:
     {
@@ -71,20 +92,17 @@ class Screenshot(CustomAction):
         if abs(aspect_ratio - target_ratio) / target_ratio > 0.01:
             logger.error(f"当前模拟器分辨率不是16:9! 当前分辨率: {width}x{height}")
 
-        # BGR2RGB
-        if len(screen_array.shape) == 3 and screen_array.shape[2] == 3:
-            rgb_array = screen_array[:, :, ::-1]
-        else:
-            rgb_array = screen_array
-            logger.warning("当前截图并非三通道")
+        if session.recorder is not None:
+            session.record_frame(screen_array)
+            logger.info(f"截图写入会话录制 {session.recorder.path}")
+            return CustomAction.RunResult(success=True)
 
-        img = Image.fromarray(rgb_array)
+        if len(screen_array.shape) != 3 or screen_array.shape[2] != 3:
+            logger.warning("当前截图并非三通道")
 
-        save_dir = log_dir
-        os.makedirs(save_dir, exist_ok=True)
-        time_str = get_format_timestamp()
-        img.save(f"{save_dir}/{time_str}.png")
-        logger.info(f"截图保存至 {save_dir}/{time_str}.png")
+        # 编码与写入在后台线程进行，见 utils/artifacts.py
+        path = artifact_store.save_image(screen_array, f"{get_format_timestamp()}.png")
+        logger.info(f"截图保存至 {path}")
 
         task_detail: TaskDetail = context.tasker.get_task_detail(
             argv.task_detail.task_id
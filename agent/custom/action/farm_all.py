@@ -0,0 +1,158 @@
+from typing import Dict, List, Tuple
+
+from maa.agent.agent_server import AgentServer
+from maa.context import Context
+from maa.custom_action import CustomAction
+
+from utils.logger import logger
+
+from .map_cleanup import (
+    FULL_NAV_NODES,
+    MAP_SWITCH_NAV_NODES,
+    MapCleanup,
+    has_variant,
+    make_planner,
+    make_retry_queue,
+    nav_seconds,
+    run_with_retries,
+    task_succeeded,
+)
+
+
+# 地图选择界面中的地图顺序（自上而下），同时作为遍历顺序
+MAP_ORDER = [
+    "EastContinent",
+    "VoidRealm",
+    "FrozenContinent",
+    "ElementalLand",
+    "MistyContinent",
+    "ShadowContinent",
+    "LegionDomain",
+    "StormIsles",
+]
+
+
+@AgentServer.custom_action("FarmAllMaps")
+class FarmAllMaps(CustomAction):
+    """
+    全地图刷图动作：
+    - 地图开关来自 FarmAllMaps 节点 attach 中的 map_xxx 字段
+    - 职业开关与 MapCleanup 相同（use_xxx）
+    - 按职业分组遍历：每个职业只切换一次角色，之后的地图直接在地图界面切换，
+      跳过 ClickSettingsButton / RecognizeJobCharacter / ClickEnterButton / ClickMapEntry
+    - 单个 (job, map) 失败时推迟到队尾退避重试（见 map_cleanup.run_with_retries），其余组合照常执行
+    - 设置了时间预算（attach.time_budget_minutes）时按预期收益选择并排序组合，每项结束后按实际耗时重新规划
+    - 结束时报告相比逐个地图入口节省的导航点击次数和等待时间
+    """
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+        node_obj = context.get_node_object(argv.node_name)
+        attach = getattr(node_obj, "attach", {}) if node_obj else {}
+
+        enabled_maps = self._collect_enabled_maps(attach)
+        enabled_jobs = MapCleanup._collect_enabled_jobs(attach)
+        plan = self._plan(enabled_maps, enabled_jobs)
+
+        logger.info(f"[FarmAllMaps] maps={enabled_maps}, jobs={enabled_jobs}")
+
+        map_cleanup = MapCleanup()
+        previous_job = None
+        # 实际执行的 完整入口 / 直接切换地图 次数，用于报告节省的导航
+        runs = {"full": 0, "switch": 0}
+
+        def run_one(item: Tuple[str, str], after_failure: bool) -> CustomAction.RunResult:
+            nonlocal previous_job
+            job_name, map_name = item
+            # 上一项失败时画面状态未知，重新走完整入口
+            if job_name != previous_job or after_failure:
+                runs["full"] += 1
+                result = map_cleanup._run_one_job(context, map_name, job_name)
+            else:
+                runs["switch"] += 1
+                result = self._switch_map(context, map_name, job_name)
+            previous_job = job_name
+            return result
+
+        # 失败的 (job, map) 推迟到队尾重试，其余组合照常执行
+        result = run_with_retries(
+            context,
+            argv.node_name,
+            make_retry_queue(plan),
+            run_one,
+            make_planner(context, argv.node_name, attach, share_navigation=True),
+            lambda item: (item[1], item[0]),
+        )
+        self._report_saving(context, runs["full"], runs["switch"])
+        return result
+
+    @staticmethod
+    def _collect_enabled_maps(attach) -> List[str]:
+        """根据 map_xxx 布尔字段收集需要执行的地图，按地图选择界面中的顺序返回。"""
+        return [name for name in MAP_ORDER if attach.get(f"map_{name}", False)]
+
+    @staticmethod
+    def _plan(maps: List[str], jobs: List[str]) -> List[Tuple[str, str]]:
+        """
+        生成 (job, map) 执行顺序。
+
+        切换角色的代价远高于切换地图，因此以职业为外层循环；
+        地图按选择界面中的顺序排列，相邻地图的点击位置也相邻。
+        """
+        return [(job, map_name) for job in jobs for map_name in maps]
+
+    @staticmethod
+    def _switch_map(context: Context, map_name: str, job_name: str) -> CustomAction.RunResult:
+        """当前角色已在地图界面（上一张地图的 TaskComplete），直接打开地图选择并切换。"""
+        logger.info(f"[FarmAllMaps] switch map job={job_name} -> {map_name}")
+
+        variant = f"FreeDungeonSwitchMap_{map_name}"
+        try:
+            if has_variant(context, variant):
+                return CustomAction.RunResult(success=task_succeeded(context.run_task(variant)))
+
+            detail = context.run_task(
+                "FreeDungeonSwitchMap",
+                {
+                    "SelectMapByParam": {
+                        "action": {
+                            "type": "Custom",
+                            "param": {
+                                "custom_action": "SelectMap",
+                                "custom_action_param": {"map": map_name},
+                            },
+                        }
+                    }
+                },
+            )
+        except Exception as e:
+            logger.error(f"[FarmAllMaps] FreeDungeonSwitchMap failed for {map_name}/{job_name}: {e}")
+            return CustomAction.RunResult(success=False)
+
+        return CustomAction.RunResult(success=task_succeeded(detail))
+
+    @staticmethod
+    def _report_saving(context: Context, full_runs: int, switch_runs: int) -> Dict[str, float]:
+        """
+        对比逐个地图入口（每个 map/job 都走 MapJobCommon -> FreeDungeonTask）的导航开销。
+
+        只统计实际执行过的项：跳过的项不计，失败后重新走完整入口的项按完整入口计。
+        """
+        full_seconds = nav_seconds(context, FULL_NAV_NODES)
+        switch_seconds = nav_seconds(context, MAP_SWITCH_NAV_NODES)
+        total_runs = full_runs + switch_runs
+
+        baseline_clicks = len(FULL_NAV_NODES) * total_runs
+        actual_clicks = len(FULL_NAV_NODES) * full_runs + len(MAP_SWITCH_NAV_NODES) * switch_runs
+        saving = {
+            "clicks": baseline_clicks - actual_clicks,
+            "seconds": (full_seconds - switch_seconds) * switch_runs,
+        }
+        logger.info(
+            f"[FarmAllMaps] {total_runs} runs ({switch_runs} map switches), navigation clicks "
+            f"{actual_clicks}/{baseline_clicks}, saved {saving['clicks']} clicks and {saving['seconds']:.1f}s"
+        )
+        return saving
@@ -1,9 +1,159 @@
-from typing import Dict, List
+import time
+from typing import Callable, Hashable, List, Optional, Set, Tuple
 
 from maa.agent.agent_server import AgentServer
 from maa.context import Context
 from maa.custom_action import CustomAction
 
+from utils.farm_planner import FarmPlanner
+from utils.logger import logger
+from utils.metrics import job_retries_total, node_failures_total
+from utils.retry_queue import RetryQueue
+
+
+# 资源中的节点名，按资源 hash 失效
+_node_names: Set[str] = set()
+_node_names_hash: Optional[str] = None
+
+# 失败的 (map, job) 推迟到队尾重试：每项最多尝试 3 次，退避 10s 起翻倍，
+# 整次运行的重试次数不超过总项数的一半（至少 2 次）
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 10.0
+RETRY_MAX_BACKOFF_SECONDS = 120.0
+
+# 切换角色：设置 -> 选择职业 -> 进入
+CHARACTER_NAV_NODES = ["ClickSettingsButton", "RecognizeJobCharacter", "ClickEnterButton"]
+# 从任意界面进入地图
+MAP_ENTRY_NAV_NODES = ["ClickMapEntry"]
+# 已在地图界面时切换地图
+MAP_SWITCH_NAV_NODES = ["ClickMapSelector", "SelectMapByParam"]
+FULL_NAV_NODES = CHARACTER_NAV_NODES + MAP_ENTRY_NAV_NODES + MAP_SWITCH_NAV_NODES
+
+
+def task_succeeded(detail) -> bool:
+    """run_task 的结果：子流水线中途失败（如 SelectJob / SelectMap 未命中）时不会抛异常，需要看任务状态。"""
+    return detail is not None and detail.status.succeeded
+
+
+def make_retry_queue(items: List[Hashable]) -> RetryQueue:
+    return RetryQueue(
+        items,
+        max_attempts=RETRY_MAX_ATTEMPTS,
+        backoff=RETRY_BACKOFF_SECONDS,
+        max_backoff=RETRY_MAX_BACKOFF_SECONDS,
+        budget=max(2, len(items) // 2),
+    )
+
+
+def wait_unless_stopping(context: Context, seconds: float) -> bool:
+    """等待重试退避；任务被停止时提前返回 False。"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if context.tasker.stopping:
+            return False
+        time.sleep(min(0.5, deadline - time.monotonic()))
+    return not context.tasker.stopping
+
+
+def nav_seconds(context: Context, nodes: List[str]) -> float:
+    """一组导航节点的 post_delay 总和（秒）。"""
+    delay = 0
+    for name in nodes:
+        node_obj = context.get_node_object(name)
+        delay += getattr(node_obj, "post_delay", 0) if node_obj else 0
+    return delay / 1000
+
+
+def make_planner(context: Context, entry: str, attach: dict, share_navigation: bool) -> Optional[FarmPlanner]:
+    """
+    入口节点 attach 中设置了 time_budget_minutes（interface 的「时间预算」选项）时返回规划器，否则不规划。
+
+    share_navigation：同一职业的后续地图是否只需切换地图（FarmAllMaps），否则每项都走完整入口。
+    """
+    minutes = attach.get("time_budget_minutes", 0)
+    if not minutes:
+        return None
+    full = nav_seconds(context, FULL_NAV_NODES)
+    switch = nav_seconds(context, MAP_SWITCH_NAV_NODES) if share_navigation else full
+    logger.info(f"[{entry}] 时间预算 {minutes} 分钟，按预期收益规划执行顺序")
+    return FarmPlanner(minutes * 60, full, switch)
+
+
+def run_with_retries(
+    context: Context,
+    entry: str,
+    queue: RetryQueue,
+    run_one: Callable[[Hashable, bool], CustomAction.RunResult],
+    planner: Optional[FarmPlanner] = None,
+    item_key: Callable[[Hashable], Tuple[str, str]] = lambda item: item,
+) -> CustomAction.RunResult:
+    """
+    依次执行队列中的项，失败项推迟重试而不中断其余项，结束时输出汇总。
+
+    run_one(item, after_failure)：after_failure 表示上一项失败，画面状态未知，不能沿用上一项的界面。
+    有项最终放弃时返回失败，但只在全部项处理完之后。
+    有 planner 时每项开始前按剩余时间重新规划未执行的项（item_key 把项换成 (地图, 职业)），
+    放不下的项与等不起的重试跳过，跳过不算失败。
+    """
+    after_failure = False
+    while True:
+        if planner is not None:
+            pending = queue.pending()
+            order = planner.plan([item_key(item) for item in pending])
+            by_key = {item_key(item): item for item in pending}
+            queue.reorder([by_key[key] for key in order], "超出时间预算")
+            if pending:
+                logger.info(f"[{entry}] 剩余 {max(planner.remaining(), 0):.0f}s，计划: {planner.describe(order)}")
+        step = queue.next()
+        if step is None:
+            break
+        item, wait = step
+        if planner is not None and not planner.fits(item_key(item), wait):
+            queue.skip(item, "重试超出时间预算")
+            continue
+        if wait > 0:
+            logger.info(f"[{entry}] {item} 等待 {wait:.0f}s 后重试")
+        if not wait_unless_stopping(context, wait):
+            logger.info(f"[{entry}] Task is stopping, exiting early. {queue.summary()}")
+            return CustomAction.RunResult(success=False)
+        if queue.attempts.get(item):
+            job_retries_total.labels(entry).inc()
+
+        if planner is not None:
+            planner.start(item_key(item))
+        result = run_one(item, after_failure)
+        after_failure = not getattr(result, "success", False)
+        if planner is not None:
+            planner.finish(item_key(item), not after_failure)
+        if not after_failure:
+            queue.success(item)
+        elif queue.failure(item, "执行失败"):
+            logger.warning(f"[{entry}] {item} 失败，推迟到队尾重试")
+        else:
+            logger.error(f"[{entry}] {item} 失败，放弃: {queue.given_up[item]}")
+            node_failures_total.labels(entry).inc()
+
+    summary = queue.summary()
+    if planner is not None:
+        summary += f"，收益 {planner.yield_total:.1f}"
+    logger.info(f"[{entry}] {summary}")
+    return CustomAction.RunResult(success=not queue.given_up)
+
+
+def has_variant(context: Context, entry: str) -> bool:
+    """
+    资源中是否存在 tools/generate_variants.py 预编译的入口。
+
+    查节点名列表而不是 get_node_data：开发模式下没有生成变体，查询不存在的节点每次都会在框架日志中报错。
+    """
+    global _node_names_hash
+    resource = context.tasker.resource
+    if resource.hash != _node_names_hash:
+        _node_names.clear()
+        _node_names.update(resource.node_list)
+        _node_names_hash = resource.hash
+    return entry in _node_names
+
 
 @AgentServer.custom_action("MapCleanup")
 class MapCleanup(CustomAction):
@@ -11,7 +161,8 @@ class MapCleanup(CustomAction):
     通用地图清理动作：
     - 当前地图通过任务名 / entry 名区分（例如 EastContinent、VoidRealm 等）
     - 职业开关来自 interface 中对该 entry 的 pipeline_override（use_xxx）
-    - 在这里统一遍历所有勾选的职业并逐个执行清理逻辑
+    - 在这里统一遍历所有勾选的职业并逐个执行清理逻辑，单个职业失败时推迟到最后退避重试
+    - 设置了时间预算（attach.time_budget_minutes）时按预期收益排序职业，放不下的跳过
     """
 
     def run(
@@ -21,24 +172,22 @@ class MapCleanup(CustomAction):
     ) -> CustomAction.RunResult:
         # 任务名就是 entry 名（例如 EastContinent / VoidRealm / ...）
         current_map = argv.node_name
-        print("current_map:",current_map)
         node_obj = context.get_node_object(current_map)
         attach = getattr(node_obj, "attach", {}) if node_obj else {}
 
         # 收集所有已开启的职业
         enabled_jobs = self._collect_enabled_jobs(attach)
-        print("enabled_jobs:", enabled_jobs)
+        logger.info(f"[MapCleanup] map={current_map}, jobs={enabled_jobs}")
 
-        print(f"[MapCleanup] map={current_map}, jobs={enabled_jobs}")
-
-        # 逐个职业执行清理
-        for job in enabled_jobs:
-            result = self._run_one_job(context, current_map, job)
-            if not getattr(result, "success", False):
-                print(f"[MapCleanup] job {job} failed on {current_map}")
-                return result
-
-        return CustomAction.RunResult(success=True)
+        # 逐个职业执行清理；单个职业失败时推迟重试，不影响其余职业
+        queue = make_retry_queue([(current_map, job) for job in enabled_jobs])
+        return run_with_retries(
+            context,
+            current_map,
+            queue,
+            lambda item, _: self._run_one_job(context, item[0], item[1]),
+            make_planner(context, current_map, attach, share_navigation=False),
+        )
 
     @staticmethod
     def _collect_enabled_jobs(attach):
@@ -69,10 +218,21 @@ class MapCleanup(CustomAction):
     def _run_one_job(self, context: Context, map_name: str, job_name: str) -> CustomAction.RunResult:
         """
         单个职业的执行逻辑：
-        - 通过 pipeline_override 将 map / job 信息写入通用子流水线 MapJobCommon
+        - 优先调用安装时预编译的 MapJobCommon_<map>_<job> 入口（tools/generate_variants.py）
+        - 没有预编译变体时（如开发环境），通过 pipeline_override 将 map / job 信息写入通用子流水线 MapJobCommon
         - 然后调用该子流水线，让复杂流程都在 pipeline 里实现
         """
-        print(f"[MapCleanup] dispatch job={job_name} on map={map_name} -> MapJobCommon")
+        variant = f"MapJobCommon_{map_name}_{job_name}"
+        if has_variant(context, variant):
+            logger.info(f"[MapCleanup] dispatch job={job_name} on map={map_name} -> {variant}")
+            try:
+                detail = context.run_task(variant)
+            except Exception as e:
+                logger.error(f"[MapCleanup] {variant} failed: {e}")
+                return CustomAction.RunResult(success=False)
+            return CustomAction.RunResult(success=task_succeeded(detail))
+
+        logger.info(f"[MapCleanup] dispatch job={job_name} on map={map_name} -> MapJobCommon")
 
         # 将当前 map / job 信息和地图坐标写入通用子流水线配置（V2 范式）
         # 使用 action.param.custom_action_param 格式传递参数
@@ -105,9 +265,9 @@ class MapCleanup(CustomAction):
 
         # 运行通用子流水线，由它内部决定如何 OCR / 点击 / 刷图
         try:
-            context.run_task("MapJobCommon")
+            detail = context.run_task("MapJobCommon")
         except Exception as e:
-            print(f"[MapCleanup] MapJobCommon failed for {map_name}/{job_name}: {e}")
+            logger.error(f"[MapCleanup] MapJobCommon failed for {map_name}/{job_name}: {e}")
             return CustomAction.RunResult(success=False)
 
-        return CustomAction.RunResult(success=True)
+        return CustomAction.RunResult(success=task_succeeded(detail))
@@ -3,6 +3,10 @@ from maa.context import Context
 from maa.custom_action import CustomAction
 import json
 
+from utils.metrics import node_failures_total
+
+from .common import click
+
 
 @AgentServer.custom_action("SelectJob")
 class SelectJob(CustomAction):
@@ -69,6 +73,7 @@ class SelectJob(CustomAction):
 
         if not job_name:
             print(f"[SelectJobCharacter] Error: job parameter not found")
+            node_failures_total.labels(argv.node_name).inc()
             return CustomAction.RunResult(success=False)
 
         print(f"[SelectJobCharacter] Selecting job by OCR: {job_name}")
@@ -78,8 +83,7 @@ class SelectJob(CustomAction):
     def _select_by_coord(self, context, job_name):
         
         click_x, click_y = self.JOB_COORD[job_name]
-        click_job = context.tasker.controller.post_click(click_x, click_y)
-        click_job.wait()
+        click(context, click_x, click_y)
         return CustomAction.RunResult(success=True)
         
     # def _select_by_ocr(self, context: Context, job_name: str, offset_x: int = 0, offset_y: int = -40) -> CustomAction.RunResult:
@@ -3,6 +3,10 @@ from maa.context import Context
 from maa.custom_action import CustomAction
 import json
 
+from utils.metrics import node_failures_total
+
+from .common import click
+
 @AgentServer.custom_action("SelectMap")
 class SelectMap(CustomAction):
     """
@@ -56,12 +60,12 @@ class SelectMap(CustomAction):
                 
         except Exception as e:
             print(f"[SelectMap] Error: {e}")
+            node_failures_total.labels(argv.node_name).inc()
             return CustomAction.RunResult(success=False)
 
         print(f"[SelectMap] Clicking map '{map_name}' at ({click_x}, {click_y})")
 
         # 执行点击
-        click_job = context.tasker.controller.post_click(click_x, click_y)
-        click_job.wait()
+        click(context, click_x, click_y)
 
         return CustomAction.RunResult(success=True)
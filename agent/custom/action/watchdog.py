@@ -0,0 +1,21 @@
+from maa.agent.agent_server import AgentServer
+from maa.context import Context
+from maa.custom_action import CustomAction
+
+from utils.metrics import recovery_seconds
+from utils.watchdog import watchdog
+
+
+@AgentServer.custom_action("WatchdogRecovered")
+class WatchdogRecovered(CustomAction):
+    """恢复子流水线的最后一步：清除看门狗触发状态并记录恢复耗时。"""
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+        latency = watchdog.recovered()
+        if latency:
+            recovery_seconds.observe(latency)
+        return CustomAction.RunResult(success=True)
@@ -0,0 +1,2 @@
+from .watchdog import *
+from .frame_targets import *
\ No newline at end of file
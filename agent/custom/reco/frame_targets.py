@@ -0,0 +1,235 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from maa.agent.agent_server import AgentServer
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+
+from utils.frame_targets import FrameFeatures, TargetResult, evaluate, fingerprint, target_key
+from utils.governor import governor
+from utils.logger import logger
+from utils.metrics import frame_age_seconds, recognition_seconds
+from utils.prefetch import FramePrefetcher
+from utils.reco_pool import reco_pool
+
+# 查询选项，不属于目标本身
+OPTION_KEYS = ("group", "window", "interval", "max_age", "latency_critical")
+
+# latency_critical 节点：两次查询间隔超过该秒数视为新一轮等待
+WAIT_GAP_SECONDS = 60.0
+# 等待时长达到预计时长的该比例后，截图 / 识别优先于其他实例
+PRIORITY_FRACTION = 0.8
+
+# 组名 -> 该组所有目标，按资源 hash 失效
+_groups: Dict[str, List[dict]] = {}
+_groups_hash: Optional[str] = None
+
+# 最近一帧的共享预处理与已求值结果
+_frame: dict = {"fingerprint": None, "features": None, "results": {}}
+
+# 节点名 -> 本轮等待的 {"since", "last"}；节点名 -> 等待时长的滑动平均
+_waits: Dict[str, dict] = {}
+_expected: Dict[str, float] = {}
+
+
+def split_param(param: dict) -> tuple:
+    options = {k: param[k] for k in OPTION_KEYS if k in param}
+    return options, {k: v for k, v in param.items() if k not in OPTION_KEYS}
+
+
+def group_targets(context: Context, group: str) -> List[dict]:
+    global _groups_hash
+    resource = context.tasker.resource
+    if resource.hash != _groups_hash:
+        start = time.perf_counter()
+        _groups.clear()
+        for name in resource.node_list:
+            recognition = (resource.get_node_data(name) or {}).get("recognition", {})
+            param = recognition.get("param", {})
+            if recognition.get("type") != "Custom" or param.get("custom_recognition") != "FrameTargets":
+                continue
+            options, target = split_param(param.get("custom_recognition_param") or {})
+            if "group" not in options:
+                continue
+            targets = _groups.setdefault(options["group"], [])
+            if all(target_key(t) != target_key(target) for t in targets):
+                targets.append(target)
+        _groups_hash = resource.hash
+        logger.debug(
+            f"[FrameTargets] 索引 {len(_groups)} 个目标组，耗时 {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+    return _groups.get(group, [])
+
+
+def wait_priority(node: str) -> bool:
+    """latency_critical 节点本轮等待是否已接近预计结束时刻（如 WaitBattleEnd 接近往常的战斗时长）。"""
+    now = time.monotonic()
+    wait = _waits.get(node)
+    if wait is None or now - wait["last"] > WAIT_GAP_SECONDS:
+        wait = _waits[node] = {"since": now, "last": now}
+    wait["last"] = now
+    expected = _expected.get(node)
+    return expected is not None and now - wait["since"] >= PRIORITY_FRACTION * expected
+
+
+def wait_finished(node: str):
+    """latency_critical 节点命中，记录本轮等待时长。"""
+    wait = _waits.pop(node, None)
+    if wait is None:
+        return
+    duration = time.monotonic() - wait["since"]
+    expected = _expected.get(node)
+    _expected[node] = duration if expected is None else expected + 0.3 * (duration - expected)
+
+
+def wait_state(node: str) -> Tuple[Optional[float], Optional[float]]:
+    """latency_critical 节点 (本轮已等待秒数, 往常等待时长)；当前没有在等待时前者为 None。"""
+    now = time.monotonic()
+    wait = _waits.get(node)
+    elapsed = now - wait["since"] if wait is not None and now - wait["last"] <= WAIT_GAP_SECONDS else None
+    return elapsed, _expected.get(node)
+
+
+def wait_reset(node: str):
+    """放弃本轮等待（如看门狗已触发恢复），不计入往常时长。"""
+    _waits.pop(node, None)
+
+
+def lookup(image: np.ndarray, group: List[dict], target: dict, priority: bool = False) -> Tuple[TargetResult, bool]:
+    """返回 (目标结果, 是否来自同一帧的缓存)；新帧上求值整组目标 group。"""
+    key = target_key(target)
+    current = fingerprint(image)
+    if _frame["fingerprint"] == current and key in _frame["results"]:
+        return _frame["results"][key], True
+    if _frame["fingerprint"] != current:
+        _frame.update(fingerprint=current, features=FrameFeatures(image), results={})
+
+    results = _frame["results"]
+    pending = [t for t in group if target_key(t) not in results]
+    if all(target_key(t) != key for t in pending):
+        pending.append(target)
+    with governor.acquire("recognition", priority):
+        if reco_pool.enabled:
+            results.update(reco_pool.run("frame_targets", image, pending))
+        else:
+            results.update(evaluate(_frame["features"], pending))
+    return results[key], False
+
+
+def poll(
+    context: Context,
+    group: List[dict],
+    target: dict,
+    window: float,
+    interval: float,
+    max_age: float,
+    priority: bool = False,
+) -> TargetResult:
+    """
+    在 window 秒内用预取帧持续识别，识别当前帧时后台已在截下一帧，相邻截图至少相隔 interval 秒。
+
+    只接受本次轮询开始后才截取的帧；命中时若帧龄已超过 max_age（识别期间画面可能已变化），
+    放弃该结果继续等下一帧。
+    预取期间后台线程独占与框架的反向调用，轮询内不能再访问 context（目标组须事先取好），
+    否则两个线程的请求与响应在同一通道上交错。
+    """
+    controller = context.tasker.controller
+
+    def capture():
+        with governor.acquire("screencap", priority):
+            controller.post_screencap().wait()
+        return controller.cached_image
+
+    prefetcher = FramePrefetcher(capture, interval)
+    not_before = time.monotonic()
+    deadline = not_before + window
+    seq = 0
+    prefetcher.start()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            frame = prefetcher.next(seq, not_before, max_age, timeout=remaining)
+            if frame is None:
+                break
+            seq = frame.seq
+            frame_age_seconds.observe(frame.age)
+            (hit, box, detail), _ = lookup(frame.image, group, target, priority)
+            if hit and frame.age <= max_age:
+                return hit, box, {**detail, "frame_seq": frame.seq}
+    finally:
+        prefetcher.stop()
+        logger.debug(
+            f"[FrameTargets] 预取轮询 {prefetcher.captures} 帧，"
+            f"平均截图 {prefetcher.capture_seconds / max(prefetcher.captures, 1) * 1000:.0f} ms"
+        )
+    return False, None, {}
+
+
+@AgentServer.custom_recognition("FrameTargets")
+class FrameTargets(CustomRecognition):
+    """
+    单帧多目标识别的按节点查询。
+
+    同一组（group）的节点在某一帧上第一次被查询时，整组的 ColorMatch / 模板匹配目标
+    共享灰度、HSV、下采样等预处理一次算完；同一帧上的后续查询（同一 next 列表中的其他节点、
+    看门狗的已知界面探测等）直接取结果。
+
+    设置 window 时，框架传入的帧未命中后在 agent 内继续轮询 window 秒：
+    后台线程预取截图，轮询周期由 截图 + 识别 缩短为两者中较慢的一个，但不短于 interval。
+    interval 默认取节点的 rate_limit，与框架自身轮询该节点的频率一致。
+
+    启用主机 CPU 预算（utils/governor.py）时，每次截图与识别先申请令牌；
+    设置 latency_critical 的节点在等待接近往常时长后优先（如 WaitBattleEnd 接近战斗结束）。
+    启用识别进程池（utils/reco_pool.py）时，新帧上的求值在工作进程中进行。
+
+    参数格式（custom_recognition_param），除选项外与 utils/frame_targets.py 的目标格式相同：
+    {
+        "group": "FreeDungeon",     // 可选，目标组
+        "window": 3,                // 可选，预取轮询秒数，默认 0（不轮询）
+        "interval": 1,              // 可选，轮询时相邻截图的最小间隔（秒），默认为节点的 rate_limit
+        "max_age": 0.5,             // 可选，命中帧允许的最大帧龄（秒）
+        "latency_critical": false,  // 可选，接近预计结束时刻时截图 / 识别优先
+        "type": "ColorMatch",
+        "lower": [57, 219, 123],
+        "upper": [57, 219, 123],
+        "count": 50,
+        "connected": true
+    }
+    """
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> Optional[CustomRecognition.AnalyzeResult]:
+        start = time.perf_counter()
+        try:
+            options, target = split_param(json.loads(argv.custom_recognition_param))
+            group = group_targets(context, options["group"]) if "group" in options else []
+            critical = options.get("latency_critical", False)
+            priority = critical and wait_priority(argv.node_name)
+            (hit, box, detail), cached = lookup(argv.image, group, target, priority)
+            detail = {**detail, "cached": cached}
+            if not hit and options.get("window", 0) > 0:
+                interval = options.get("interval")
+                if interval is None:
+                    interval = (context.get_node_data(argv.node_name) or {}).get("rate_limit", 1000) / 1000
+                hit, box, detail = poll(
+                    context, group, target, options["window"], interval, options.get("max_age", 0.5), priority
+                )
+            if hit and critical:
+                wait_finished(argv.node_name)
+        except Exception as e:
+            logger.error(f"[FrameTargets] {argv.node_name}: {e}")
+            return None
+        finally:
+            recognition_seconds.labels("FrameTargets").observe(time.perf_counter() - start)
+
+        if not hit:
+            return None
+        return CustomRecognition.AnalyzeResult(box=box, detail=detail)
@@ -0,0 +1,93 @@
+import json
+import time
+from typing import Optional
+
+from maa.agent.agent_server import AgentServer
+from maa.context import Context
+from maa.custom_recognition import CustomRecognition
+
+from utils.logger import logger
+from utils.metrics import recognition_seconds
+from utils.watchdog import watchdog
+from utils import session
+
+from .frame_targets import wait_reset, wait_state
+
+# 战斗节点已有往常等待时长时，等待超过其该倍数视为战斗已结束（之后出现的静止画面 / 未知界面才计时）
+BATTLE_MARGIN = 1.5
+
+
+@AgentServer.custom_recognition("WatchdogCheck")
+class WatchdogCheck(CustomRecognition):
+    """
+    将当前帧喂给看门狗，看门狗触发时命中，使 pipeline 跳转到恢复子流水线。
+
+    战斗画面可能长时间静止，也没有可识别的已知界面，因此战斗节点（latency_critical 的 FrameTargets，
+    如 WaitBattleEnd）本轮等待未超过预计战斗时长时不做判定，只重新计时。预计战斗时长为往常等待时长的
+    BATTLE_MARGIN 倍，还没有完成过战斗时取 battle_seconds；超过之后（战斗应已结束）画面静止
+    freeze_seconds 或 unknown_seconds 内没有已知界面即触发。
+
+    参数格式（custom_recognition_param，均为可选）：
+    {
+        "freeze_seconds": 8,            // 战斗之外画面不变多久判定为卡死
+        "unknown_seconds": 15,          // 战斗之外多久没有出现已知界面判定为未知界面
+        "battle": "WaitBattleEnd",      // 战斗节点，为空时不区分战斗阶段
+        "battle_seconds": 180,          // 预计战斗时长上限
+        "known": ["KnownScreenResult"]  // 已知界面的识别节点，为空时不做未知界面检测
+    }
+
+    已知界面节点在战斗之外的每次轮询时都会识别，应是不轮询（无 window）的廉价识别，
+    如与等待节点同组的 FrameTargets，同一帧上直接取缓存结果。
+    """
+
+    def analyze(
+        self,
+        context: Context,
+        argv: CustomRecognition.AnalyzeArg,
+    ) -> Optional[CustomRecognition.AnalyzeResult]:
+        start = time.perf_counter()
+        try:
+            param = json.loads(argv.custom_recognition_param) if argv.custom_recognition_param else {}
+        except Exception as e:
+            logger.error(f"[WatchdogCheck] Error parsing custom_recognition_param: {e}")
+            param = {}
+
+        watchdog.freeze_seconds = param.get("freeze_seconds", watchdog.freeze_seconds)
+        watchdog.unknown_seconds = param.get("unknown_seconds", watchdog.unknown_seconds)
+
+        battle = param.get("battle")
+        in_battle = bool(battle) and self._in_battle(battle, param.get("battle_seconds", 180))
+        known = None
+        known_nodes = param.get("known", [])
+        if known_nodes and not in_battle:
+            known = any(
+                self._hit(context.run_recognition(node, argv.image)) for node in known_nodes
+            )
+        reason = watchdog.feed(argv.image, known, hold=in_battle)
+        session.record_frame(argv.image)
+        recognition_seconds.labels("WatchdogCheck").observe(time.perf_counter() - start)
+
+        if reason is None:
+            return None
+        if battle:
+            # 恢复后重新进入战斗时重新计时
+            wait_reset(battle)
+
+        session.record_event("recognition", {"node": argv.node_name, "hit": True, "reason": watchdog.tripped_reason})
+        height, width = argv.image.shape[:2]
+        return CustomRecognition.AnalyzeResult(
+            box=(0, 0, width, height),
+            detail={"reason": watchdog.tripped_reason},
+        )
+
+    @staticmethod
+    def _in_battle(battle: str, battle_seconds: float) -> bool:
+        elapsed, expected = wait_state(battle)
+        if elapsed is None:
+            return False
+        limit = battle_seconds if expected is None else min(battle_seconds, expected * BATTLE_MARGIN)
+        return elapsed < limit
+
+    @staticmethod
+    def _hit(reco_detail) -> bool:
+        return bool(reco_detail and getattr(reco_detail, "hit", reco_detail.box is not None))
@@ -0,0 +1,2 @@
+from .node_stats import *
+from .settle_probe import *
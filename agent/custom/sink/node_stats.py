@@ -0,0 +1,65 @@
+import time
+from typing import Dict, Tuple
+
+from maa.agent.agent_server import AgentServer
+from maa.context import Context, ContextEventSink
+from maa.event_sink import NotificationType
+
+from utils import session
+
+
+@AgentServer.context_sink()
+class NodeStatsSink(ContextEventSink):
+    """
+    把 next 列表的候选顺序与每次识别的命中 / 耗时写入会话录制事件，
+    供 tools/order_next_lists.py 统计各节点后继的命中频率与识别成本。未开启录制时不做任何事。
+    客户端需通过 AgentClient.register_sink 转发任务器事件，否则收不到回调
+    （tools/simulate_game.py --record 会注册，见 docs/zh_cn/录制与调优.md）。
+
+    事件：
+        next_list        {"task_id", "node", "candidates"}
+        node_recognition {"task_id", "node", "hit", "ms"}
+    """
+
+    def __init__(self):
+        super().__init__()
+        # (task_id, 节点名) -> 识别开始时刻
+        self._started: Dict[Tuple[int, str], float] = {}
+
+    def on_node_next_list(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeNextListDetail,
+    ):
+        if session.recorder is None or noti_type != NotificationType.Starting:
+            return
+        session.record_event(
+            "next_list",
+            {"task_id": detail.task_id, "node": detail.name, "candidates": [attr.name for attr in detail.next_list]},
+        )
+
+    def on_node_recognition(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeRecognitionDetail,
+    ):
+        if session.recorder is None:
+            return
+        key = (detail.task_id, detail.name)
+        if noti_type == NotificationType.Starting:
+            self._started[key] = time.perf_counter()
+            return
+        started = self._started.pop(key, None)
+        if started is None:
+            return
+        session.record_event(
+            "node_recognition",
+            {
+                "task_id": detail.task_id,
+                "node": detail.name,
+                "hit": noti_type == NotificationType.Succeeded,
+                "ms": (time.perf_counter() - started) * 1000,
+            },
+        )
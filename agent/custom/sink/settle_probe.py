@@ -0,0 +1,76 @@
+import os
+import time
+from typing import Dict
+
+from maa.agent.agent_server import AgentServer
+from maa.context import Context, ContextEventSink
+from maa.event_sink import NotificationType
+
+from utils import session
+from utils.logger import logger
+
+# 每个动作结束后在 post_delay 之外多截图的时长，覆盖比当前延迟更慢的画面变化
+PROBE_EXTRA_SECONDS = 1.0
+
+
+@AgentServer.context_sink()
+class SettleProbeSink(ContextEventSink):
+    """
+    测量每个动作之后画面实际稳定所需的时间，供 tools/tune_delays.py 计算最小安全 post_delay。
+
+    开启会话录制且设置环境变量 MAA_PROBE_SETTLE=1 时生效。框架在 post_delay 结束后才通知动作完成，
+    因此在 next 列表开始识别时把各候选的 post_delay 覆盖为 0，动作完成时写入 node_action 事件，
+    再由本监听器在原 post_delay + PROBE_EXTRA_SECONDS 内连续截图写入录制，代替框架的等待。
+    agent 只能在处理框架回调期间反向调用控制器，所以截图在回调内同步进行。
+    每个动作多停留 PROBE_EXTRA_SECONDS，仅用于采集数据，不要在正式运行时开启。
+    与 node_stats.py 相同，需客户端调用 AgentClient.register_sink 转发任务器事件
+    （tools/simulate_game.py --probe_settle 会注册，见 docs/zh_cn/录制与调优.md）。
+
+    事件：
+        node_action {"task_id", "node", "post_delay"}
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = bool(os.environ.get("MAA_PROBE_SETTLE"))
+        # 节点名 -> 覆盖前的 post_delay
+        self._post_delay: Dict[str, int] = {}
+
+    def on_node_next_list(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeNextListDetail,
+    ):
+        if not self.enabled or session.recorder is None or noti_type != NotificationType.Starting:
+            return
+        override = {}
+        for attr in detail.next_list:
+            if attr.name not in self._post_delay:
+                self._post_delay[attr.name] = (context.get_node_data(attr.name) or {}).get("post_delay", 0)
+            if self._post_delay[attr.name]:
+                override[attr.name] = {"post_delay": 0}
+        if override:
+            context.override_pipeline(override)
+
+    def on_node_action(
+        self,
+        context: Context,
+        noti_type: NotificationType,
+        detail: ContextEventSink.NodeActionDetail,
+    ):
+        if not self.enabled or session.recorder is None or noti_type != NotificationType.Succeeded:
+            return
+
+        post_delay = self._post_delay.get(detail.name, 0)
+        session.record_event("node_action", {"task_id": detail.task_id, "node": detail.name, "post_delay": post_delay})
+
+        controller = context.tasker.controller
+        deadline = time.monotonic() + post_delay / 1000 + PROBE_EXTRA_SECONDS
+        try:
+            while time.monotonic() < deadline:
+                image = controller.post_screencap().wait().get()
+                if image is not None and image.size:
+                    session.record_frame(image)
+        except Exception as e:
+            logger.error(f"[SettleProbe] 截图失败: {e}")
@@ -88,9 +88,62 @@ def agent(is_dev_mode=False):
         socket_id = sys.argv[-1]
         logger.info(f"socket_id: {socket_id}")
 
+        from utils import session  # type: ignore
+        from utils.logger import log_dir  # type: ignore
+
+        # 可选的 Prometheus 指标端点，例如 MAA_METRICS_PORT=9100
+        metrics_port = os.environ.get("MAA_METRICS_PORT")
+        if metrics_port:
+            from utils.metrics import start_http_server  # type: ignore
+
+            start_http_server(int(metrics_port))
+
+        # 可选的会话录制（帧 + 动作 / 识别事件），写入 debug/custom/sessions
+        # 另设 MAA_PROBE_SETTLE=1 时在每个动作后连续截图，用于 tools/tune_delays.py 调整 post_delay
+        if os.environ.get("MAA_RECORD_SESSION"):
+            recorder = session.start_recording(log_dir / "sessions")
+            logger.info(f"会话录制: {recorder.path}")
+            logger.info("next 列表统计等任务器事件需客户端调用 AgentClient.register_sink 转发，见 docs/zh_cn/录制与调优.md")
+
+        # 调试产物（截图、会话录制、压缩日志）的总大小上限，后台压缩与淘汰，例如 MAA_ARTIFACT_BUDGET_MB=2048
+        from utils.artifacts import artifact_store, budget_from_env as artifact_budget  # type: ignore
+
+        artifact_store.start(artifact_budget(os.environ.get("MAA_ARTIFACT_BUDGET_MB")))
+
+        # 可选的主机级 CPU 预算，多开时所有 agent 共享，例如 MAA_CPU_BUDGET=3 或 auto
+        cpu_budget = os.environ.get("MAA_CPU_BUDGET")
+        if cpu_budget:
+            from utils.governor import budget_from_env, governor  # type: ignore
+
+            governor.configure(budget_from_env(cpu_budget))
+
+        # 可选的识别工作进程池，例如 MAA_RECO_WORKERS=2 或 auto
+        reco_workers = os.environ.get("MAA_RECO_WORKERS")
+        if reco_workers:
+            from utils.reco_pool import reco_pool, workers_from_env  # type: ignore
+
+            reco_pool.start(workers_from_env(reco_workers))
+
+        # 可选的内存采样（tools/soak_agent.py 浸泡测试），例如 MAA_MEMORY_PROBE=debug/soak/memory.jsonl
+        memory_probe = None
+        if os.environ.get("MAA_MEMORY_PROBE"):
+            from utils.memory_probe import MemoryProbe  # type: ignore
+
+            interval = float(os.environ.get("MAA_MEMORY_PROBE_INTERVAL", 60))
+            memory_probe = MemoryProbe(Path(os.environ["MAA_MEMORY_PROBE"]), interval)
+            memory_probe.start()
+
         AgentServer.start_up(socket_id)
         logger.info("AgentServer启动")
         AgentServer.join()
+        session.stop_recording()
+        artifact_store.stop()
+        if memory_probe is not None:
+            memory_probe.stop()
+        if reco_workers:
+            reco_pool.stop()
+        if cpu_budget:
+            governor.release()
         AgentServer.shut_down()
         logger.info("AgentServer关闭")
     except ImportError as e:
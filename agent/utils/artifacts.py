@@ -0,0 +1,270 @@
+"""
+调试产物管理：log_dir（debug/custom）下截图、会话录制与已压缩日志的总大小上限。
+
+- 保存：save_image 把帧放入有界队列后立即返回，由后台线程编码写入（PNG 快速压缩）；
+  队列满时丢弃该截图并计数，不阻塞刷图
+- 去重：按像素内容的摘要，与最近保存过且仍存在的截图完全相同时不再写入
+- 后台压缩：写入超过 RECOMPRESS_AFTER_SECONDS 的截图用最高压缩级别重写（仍为 PNG，工具可直接读取），
+  已压缩的文件名记在 artifacts.json 中，重启后不重复压缩
+- 淘汰：受管文件总大小超过预算时按修改时间从旧到新删除；当天的日志由 loguru 管理，
+  正在写入的会话录制与最近 ACTIVE_SECONDS 内修改过的文件不删
+- 低优先级：后台线程降低自身的调度（Windows 上还有 I/O）优先级；压缩与扫描只在队列空闲时进行，
+  读写量按 IO_BYTES_PER_SECOND 限速
+- I/O 统计：stats 中按操作累计字节数与文件数，同时计入 metrics（maa_artifact_*）
+
+MAA_ARTIFACT_BUDGET_MB 设置预算（默认 1024）。
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .logger import log_dir, logger
+from .metrics import registry
+
+DEFAULT_BUDGET_MB = 1024
+QUEUE_SIZE = 8
+RECOMPRESS_AFTER_SECONDS = 300.0
+ACTIVE_SECONDS = 60.0
+SCAN_SECONDS = 30.0
+# 压缩与淘汰的读写限速
+IO_BYTES_PER_SECOND = 8 * 2**20
+# 去重时记住的最近截图数
+DEDUP_ENTRIES = 256
+STATE_FILE = "artifacts.json"
+
+artifact_io_bytes_total = registry.counter(
+    "maa_artifact_io_bytes_total", "Bytes read, written and deleted by the artifact store.", label="op"
+)
+artifact_files_total = registry.counter(
+    "maa_artifact_files_total", "Artifact store file events.", label="event"
+)
+artifact_store_bytes = registry.gauge("maa_artifact_store_bytes", "Bytes of managed debug artifacts.")
+
+
+def _lower_thread_priority():
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32  # type: ignore
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith("linux"):
+            # Linux 上线程是独立的调度实体，只影响本线程
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except Exception as e:
+        logger.debug(f"[Artifacts] 无法降低后台线程优先级: {e}")
+
+
+class ArtifactStore:
+    def __init__(self, directory: Path = log_dir):
+        self.directory = directory
+        self.budget = DEFAULT_BUDGET_MB * 2**20
+        self.stats: Dict[str, float] = {
+            "bytes_written": 0,
+            "bytes_read": 0,
+            "bytes_deleted": 0,
+            "saved": 0,
+            "deduplicated": 0,
+            "dropped": 0,
+            "recompressed": 0,
+            "evicted": 0,
+            "io_seconds": 0.0,
+        }
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, str]]]" = queue.Queue(QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._recent: "OrderedDict[bytes, Path]" = OrderedDict()
+        self._compressed: set = set()
+        self._total = 0
+        self._next_scan = 0.0
+        self._throttle_until = 0.0
+
+    def start(self, budget_mb: float = DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 2**20)
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            self._compressed = set(json.loads((self.directory / STATE_FILE).read_text(encoding="utf-8")))
+        except (FileNotFoundError, ValueError):
+            self._compressed = set()
+        self._thread = threading.Thread(target=self._loop, name="ArtifactStore", daemon=True)
+        self._thread.start()
+        logger.info(f"[Artifacts] 调试产物上限 {budget_mb:.0f} MB: {self.directory}")
+
+    def stop(self):
+        """写完队列中的截图后停止。"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def save_image(self, image: np.ndarray, name: str) -> Path:
+        """异步保存 BGR 截图到 directory / name，返回目标路径（写入前文件尚不存在）。"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((image, name))
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"[Artifacts] 截图写入排队已满，丢弃 {name}")
+        return self.directory / name
+
+    # ---------- 后台线程 ----------
+
+    def _loop(self):
+        _lower_thread_priority()
+        while True:
+            timeout = max(self._throttle_until - time.monotonic(), 0) or SCAN_SECONDS / 3
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            try:
+                if item:
+                    self._write(*item)
+                elif time.monotonic() >= self._throttle_until:
+                    self._maintain()
+            except Exception as e:
+                logger.warning(f"[Artifacts] {e}")
+
+    def _count(self, event: str, amount: float = 1):
+        self.stats[event] += amount
+        artifact_files_total.labels(event).inc(amount)
+
+    def _io(self, op: str, size: int, seconds: float = 0.0):
+        self.stats[f"bytes_{op}"] += size
+        self.stats["io_seconds"] += seconds
+        artifact_io_bytes_total.labels(op).inc(size)
+
+    def _throttle(self, size: int):
+        self._throttle_until = max(self._throttle_until, time.monotonic()) + size / IO_BYTES_PER_SECOND
+
+    def _write(self, image: np.ndarray, name: str):
+        digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=16).digest()
+        previous = self._recent.get(digest)
+        if previous is not None and previous.exists():
+            self._recent.move_to_end(digest)
+            self._count("deduplicated")
+            logger.debug(f"[Artifacts] {name} 与 {previous.name} 相同，不再保存")
+            return
+
+        path = self.directory / name
+        start = time.perf_counter()
+        rgb = image[:, :, ::-1] if image.ndim == 3 and image.shape[2] == 3 else image
+        Image.fromarray(rgb).save(path, compress_level=1)
+        size = path.stat().st_size
+        self._io("written", size, time.perf_counter() - start)
+        self._count("saved")
+        self._total += size
+        self._recent[digest] = path
+        if len(self._recent) > DEDUP_ENTRIES:
+            self._recent.popitem(last=False)
+        if self._total > self.budget:
+            self._next_scan = 0.0
+
+    def _managed(self) -> List[Tuple[float, int, Path]]:
+        """(修改时间, 大小, 路径)，按修改时间从旧到新。"""
+        from . import session
+
+        active = session.recorder.path.resolve() if session.recorder is not None else None
+        files = []
+        for pattern in ("*.png", "*.zip", "sessions/*"):
+            for path in self.directory.glob(pattern):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.is_file() and path.resolve() != active:
+                    files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        return files
+
+    def _maintain(self):
+        now = time.monotonic()
+        if now < self._next_scan:
+            return
+        self._next_scan = now + SCAN_SECONDS
+
+        files = self._managed()
+        self._total = sum(size for _, size, _ in files)
+        wall = time.time()
+        evicted = False
+        for mtime, size, path in files:
+            if self._total <= self.budget:
+                break
+            if wall - mtime < ACTIVE_SECONDS:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._io("deleted", size)
+            self._count("evicted")
+            self._total -= size
+            self._compressed.discard(path.name)
+            evicted = True
+        if evicted:
+            logger.info(f"[Artifacts] 超出上限，已删除最旧的产物，当前 {self._total / 2**20:.0f} MB")
+        artifact_store_bytes.set(self._total)
+
+        # 每次空闲只压缩一个文件，之后按读写量限速，新截图随时可以插队
+        for mtime, size, path in files:
+            if path.suffix == ".png" and path.name not in self._compressed and wall - mtime >= RECOMPRESS_AFTER_SECONDS:
+                if path.exists():
+                    self._recompress(path, size)
+                    self._next_scan = 0.0
+                break
+        else:
+            return
+        self._save_state(files)
+
+    def _recompress(self, path: Path, size: int):
+        start = time.perf_counter()
+        with Image.open(path) as image:
+            image.load()
+            tmp = path.with_suffix(".tmp")
+            image.save(tmp, format="PNG", compress_level=9, optimize=True)
+        new_size = tmp.stat().st_size
+        if new_size < size:
+            # 保持修改时间，淘汰顺序不变
+            stat = path.stat()
+            tmp.replace(path)
+            os.utime(path, (stat.st_atime, stat.st_mtime))
+            self._total -= size - new_size
+        else:
+            tmp.unlink()
+        self._io("read", size)
+        self._io("written", new_size, time.perf_counter() - start)
+        self._count("recompressed")
+        self._compressed.add(path.name)
+        self._throttle(size + new_size)
+
+    def _save_state(self, files: List[Tuple[float, int, Path]]):
+        names = {path.name for _, _, path in files}
+        self._compressed &= names
+        tmp = self.directory / (STATE_FILE + ".tmp")
+        tmp.write_text(json.dumps(sorted(self._compressed)), encoding="utf-8")
+        tmp.replace(self.directory / STATE_FILE)
+
+
+def budget_from_env(value: Optional[str]) -> float:
+    """MAA_ARTIFACT_BUDGET_MB 的值，未设置时为 DEFAULT_BUDGET_MB。"""
+    return float(value) if value else DEFAULT_BUDGET_MB
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,39 @@
+"""
+分辨率无关的坐标层。
+
+pipeline 与自定义动作中的坐标、ROI 均按短边 720 的截图设计。
+低分辨率快速模式（interface 中 display_short_side 480 的控制器 + lowres_480 资源）下，
+pipeline 由 tools/generate_lowres.py 预先缩放，自定义动作则在点击时通过这里换算。
+"""
+
+from typing import List, Sequence, Tuple
+
+BASE_SHORT_SIDE = 720
+
+def screen_scale(context) -> float:
+    """
+    当前截图短边相对 BASE_SHORT_SIDE 的比例；尚未截图时返回 1.0。
+
+    每次按控制器最近一次截图计算，不跨调用缓存：重连或切换控制器（如 720 与 480 快速模式）后
+    分辨率会变化，而 agent 收不到连接事件。取缓存截图是一次本地 IPC（每次点击约多 4 ms），
+    相对点击后的 post_delay 可以忽略。
+    """
+    image = context.tasker.controller.cached_image
+    if image is None or not getattr(image, "size", 0):
+        return 1.0
+    return min(image.shape[:2]) / BASE_SHORT_SIDE
+
+
+def scale_point(x: int, y: int, scale: float) -> Tuple[int, int]:
+    return round(x * scale), round(y * scale)
+
+
+def scale_rect(rect: Sequence[int], scale: float) -> List[int]:
+    """缩放 [x, y, w, h]，非零宽高至少保留 1 像素。"""
+    x, y, w, h = rect
+    return [
+        round(x * scale),
+        round(y * scale),
+        max(1, round(w * scale)) if w > 0 else round(w * scale),
+        max(1, round(h * scale)) if h > 0 else round(h * scale),
+    ]
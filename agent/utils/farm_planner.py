@@ -0,0 +1,184 @@
+"""
+按时间预算规划刷图：在给定时间内选择并排序 (地图, 职业)，使预期收益最大。
+
+- 历史：每个 (地图, 职业) 的刷图耗时与战斗数按指数滑动平均记录在 debug/custom/farm_history.json，
+  每执行完一项更新一次；没有历史的项用同地图其他职业、再退到全部项的平均值估计
+- 收益：战斗数 × 地图权重（farm_history.json 中的 reward_per_battle，未配置为 1）
+- 代价：刷图耗时 + 导航耗时；切换职业要走完整入口（设置 -> 选角色 -> 进入 -> 地图入口），
+  同一职业换地图只需打开地图选择
+- 规划：贪心地选当前 收益 / 代价 最高且放得进剩余时间的项，已选职业的后续项不再计切换职业的代价；
+  执行顺序按职业分组（当前职业优先），组内按收益密度降序，预算提前耗尽时损失最小。
+  自身没有历史的项耗时未知，估计值只用于排序，剩余时间大于 0 就视为放得进，执行一次后即有历史
+- 在线重规划：每项开始前用剩余时间和最新的历史重新规划，放不下的项跳过
+"""
+
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .logger import log_dir, logger
+from .metrics import battles_total
+
+HISTORY_PATH = log_dir / "farm_history.json"
+
+# 滑动平均中新样本的权重
+EWMA_ALPHA = 0.3
+# 完全没有历史时的先验
+DEFAULT_SECONDS = 300.0
+DEFAULT_BATTLES = 3.0
+
+Item = Tuple[str, str]  # (地图, 职业)
+
+
+class FarmHistory:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self.items: Dict[str, dict] = {}
+        self.reward_per_battle: Dict[str, float] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.items = data.get("items", {})
+            self.reward_per_battle = data.get("reward_per_battle", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"[FarmPlanner] 读取历史失败，按无历史处理: {e}")
+
+    @staticmethod
+    def key(map_name: str, job_name: str) -> str:
+        return f"{map_name}/{job_name}"
+
+    def known(self, map_name: str, job_name: str) -> bool:
+        return self.key(map_name, job_name) in self.items
+
+    def estimate(self, map_name: str, job_name: str) -> Tuple[float, float]:
+        """返回 (预计刷图秒数, 预计收益)。"""
+        entry = self.items.get(self.key(map_name, job_name))
+        if entry is None:
+            same_map = [v for k, v in self.items.items() if k.split("/")[0] == map_name]
+            pool = same_map or list(self.items.values())
+            if pool:
+                entry = {
+                    "seconds": sum(v["seconds"] for v in pool) / len(pool),
+                    "battles": sum(v["battles"] for v in pool) / len(pool),
+                }
+            else:
+                entry = {"seconds": DEFAULT_SECONDS, "battles": DEFAULT_BATTLES}
+        return entry["seconds"], entry["battles"] * self.reward_per_battle.get(map_name, 1.0)
+
+    def record(self, map_name: str, job_name: str, seconds: float, battles: float):
+        entry = self.items.get(self.key(map_name, job_name))
+        if entry is None:
+            self.items[self.key(map_name, job_name)] = {"seconds": seconds, "battles": battles, "samples": 1}
+            return
+        entry["seconds"] += EWMA_ALPHA * (seconds - entry["seconds"])
+        entry["battles"] += EWMA_ALPHA * (battles - entry["battles"])
+        entry["samples"] = entry.get("samples", 0) + 1
+
+    def save(self):
+        data = {"items": self.items, "reward_per_battle": self.reward_per_battle}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.warning(f"[FarmPlanner] 保存历史失败: {e}")
+
+
+class FarmPlanner:
+    def __init__(
+        self,
+        budget_seconds: float,
+        full_nav_seconds: float,
+        switch_nav_seconds: float,
+        history: Optional[FarmHistory] = None,
+    ):
+        """
+        Args:
+            budget_seconds: 时间预算，从创建时开始计时
+            full_nav_seconds: 走完整入口（含切换职业）的导航耗时
+            switch_nav_seconds: 同一职业切换地图的导航耗时；每项都走完整入口时与 full_nav_seconds 相同
+        """
+        self.deadline = time.monotonic() + budget_seconds
+        self.full_nav_seconds = full_nav_seconds
+        self.switch_nav_seconds = switch_nav_seconds
+        self.history = history or FarmHistory()
+        self.current_job: Optional[str] = None
+        self.yield_total = 0.0
+        self._started = 0.0
+        self._battles = 0.0
+        self._full = True
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def cost(self, item: Item, jobs: set) -> Tuple[float, float]:
+        """返回 (代价秒数, 预计收益)；jobs 为在此之前已切换到的职业。"""
+        seconds, reward = self.history.estimate(*item)
+        nav = self.switch_nav_seconds if item[1] in jobs else self.full_nav_seconds
+        return seconds + nav, reward
+
+    def plan(self, items: List[Item], wait: float = 0.0) -> List[Item]:
+        """从 items 中选出放得进剩余时间（扣除 wait）的项并排好执行顺序。"""
+        budget = self.remaining() - wait
+        jobs = {self.current_job} if self.current_job else set()
+        candidates = list(dict.fromkeys(items))
+        chosen: List[Tuple[Item, float]] = []
+        while candidates:
+            best, best_density, best_cost = None, -1.0, 0.0
+            for item in candidates:
+                cost, reward = self.cost(item, jobs)
+                density = reward / max(cost, 1e-6)
+                if self._fits(item, cost, budget) and density > best_density:
+                    best, best_density, best_cost = item, density, cost
+            if best is None:
+                break
+            chosen.append((best, best_density))
+            candidates.remove(best)
+            budget -= best_cost
+            jobs.add(best[1])
+
+        # 按职业分组：当前职业在前，其余职业按其最优项的选中先后
+        job_order = list(dict.fromkeys(([self.current_job] if self.current_job else []) + [i[1] for i, _ in chosen]))
+        chosen.sort(key=lambda c: (job_order.index(c[0][1]), -c[1]))
+        return [item for item, _ in chosen]
+
+    def _fits(self, item: Item, cost: float, budget: float) -> bool:
+        return cost <= budget if self.history.known(*item) else budget > 0
+
+    def fits(self, item: Item, wait: float = 0.0) -> bool:
+        cost, _ = self.cost(item, {self.current_job} if self.current_job else set())
+        return self._fits(item, cost, self.remaining() - wait)
+
+    def start(self, item: Item):
+        self._started = time.monotonic()
+        self._battles = battles_total.get()
+        self._full = item[1] != self.current_job or self.switch_nav_seconds == self.full_nav_seconds
+
+    def finish(self, item: Item, succeeded: bool):
+        """记录一项的实际耗时与战斗数，失败项只记代价不更新历史（其耗时不代表正常刷图）。"""
+        elapsed = time.monotonic() - self._started
+        battles = battles_total.get() - self._battles
+        map_name, job_name = item
+        self.current_job = job_name if succeeded else None
+        self.yield_total += battles * self.history.reward_per_battle.get(map_name, 1.0)
+        if not succeeded:
+            return
+        nav = self.full_nav_seconds if self._full else self.switch_nav_seconds
+        expected, _ = self.history.estimate(map_name, job_name)
+        self.history.record(map_name, job_name, max(elapsed - nav, 0.0), battles)
+        self.history.save()
+        logger.info(
+            f"[FarmPlanner] {map_name}/{job_name} 用时 {elapsed:.0f}s（预计 {expected + nav:.0f}s），"
+            f"战斗 {battles:.0f} 次，剩余 {max(self.remaining(), 0):.0f}s"
+        )
+
+    def describe(self, plan: List[Item]) -> str:
+        jobs = {self.current_job} if self.current_job else set()
+        parts = []
+        for item in plan:
+            cost, reward = self.cost(item, jobs)
+            jobs.add(item[1])
+            parts.append(f"{item[0]}/{item[1]}({cost:.0f}s, {reward:.1f})")
+        return ", ".join(parts) or "无"
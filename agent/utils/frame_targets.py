@@ -0,0 +1,232 @@
+"""
+单帧多目标识别：同一帧上的多个 ColorMatch / 模板匹配目标共享一次预处理，一次算完。
+
+FrameFeatures 按需计算并缓存 RGB 视图、灰度、HSV 与各倍数的下采样灰度图，
+evaluate 对一组目标逐个求值，返回 {目标键: (是否命中, 框, detail)}。
+
+目标格式与 pipeline 中对应识别的字段一致，坐标按短边 720 设计：
+    {"type": "ColorMatch", "lower": [[r, g, b]], "upper": [[r, g, b]], "count": 50,
+     "connected": true, "method": 4, "roi": [x, y, w, h]}
+    {"type": "TemplateMatch", "template": "gift.png", "threshold": 0.8, "roi": [x, y, w, h]}
+"""
+
+import json
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .coords import BASE_SHORT_SIDE, scale_rect
+from .pyramid import block_mean, load_template, match, to_gray
+
+Box = Tuple[int, int, int, int]
+TargetResult = Tuple[bool, Optional[Box], dict]
+
+# ColorMatch 的 method，与 MaaFramework 一致
+METHOD_RGB = 4
+METHOD_HSV = 40
+METHOD_GRAY = 6
+
+
+def fingerprint(image: np.ndarray) -> tuple:
+    """
+    整帧内容的摘要，用于判断连续几次查询是否针对同一张截图。
+
+    不能只采样部分像素：新出现的小标记（如 12×12 的免费副本标记）可能正好落在采样点之间。
+    CRC32 只用于比较相邻的几帧，碰撞概率可以忽略，720p 一帧约 1 ms（blake2b 约 5 ms）。
+    """
+    return image.shape, zlib.crc32(np.ascontiguousarray(image).data)
+
+
+def target_key(target: dict) -> str:
+    return json.dumps(target, sort_keys=True, ensure_ascii=False)
+
+
+class FrameFeatures:
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self.short_side = min(image.shape[:2])
+        self.scale = self.short_side / BASE_SHORT_SIDE
+        self._gray: Optional[np.ndarray] = None
+        self._hsv: Optional[np.ndarray] = None
+        self._coarse: Dict[int, np.ndarray] = {}
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self.image[:, :, 2::-1]
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = np.clip(np.rint(to_gray(self.image)), 0, 255).astype(np.uint8)
+        return self._gray
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """OpenCV 8 位 HSV：H ∈ [0, 180)，S、V ∈ [0, 255]。"""
+        if self._hsv is None:
+            b, g, r = (self.image[:, :, i].astype(np.float32) for i in range(3))
+            v = np.maximum(np.maximum(r, g), b)
+            delta = v - np.minimum(np.minimum(r, g), b)
+            safe = np.where(delta == 0, np.float32(1), delta)
+            # 与 OpenCV 相同的分支优先级：V == R 优先，其次 V == G
+            h = (r - g) / safe + 4
+            np.copyto(h, (b - r) / safe + 2, where=v == g)
+            np.copyto(h, (g - b) / safe, where=v == r)
+            h *= 30
+            h[h < 0] += 180
+            h[delta == 0] = 0
+            s = delta / np.where(v == 0, np.float32(1), v) * 255
+            hsv = np.empty(self.image.shape[:2] + (3,), dtype=np.uint8)
+            hsv[:, :, 0] = np.rint(h) % 180
+            hsv[:, :, 1] = np.rint(s)
+            hsv[:, :, 2] = v
+            self._hsv = hsv
+        return self._hsv
+
+    def coarse_gray(self, factor: int) -> np.ndarray:
+        if factor not in self._coarse:
+            self._coarse[factor] = to_gray(block_mean(self.image, factor))
+        return self._coarse[factor]
+
+    def roi(self, target: dict) -> Box:
+        """目标 ROI 换算到当前分辨率并裁剪到画面内；未设置或宽高为 0 时为整帧。"""
+        height, width = self.image.shape[:2]
+        roi = target.get("roi")
+        if not roi or roi[2] <= 0 or roi[3] <= 0:
+            return 0, 0, width, height
+        x, y, w, h = scale_rect(roi, self.scale)
+        x, y = max(0, min(x, width)), max(0, min(y, height))
+        return x, y, max(0, min(w, width - x)), max(0, min(h, height - y))
+
+
+def _ranges(value) -> List[List[int]]:
+    return value if value and isinstance(value[0], list) else [value]
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """按行的连续 True 区间 [(row, start, end)]，end 不含。"""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    diff = np.diff(padded, axis=1)
+    starts = np.argwhere(diff == 1)
+    ends = np.argwhere(diff == -1)
+    return np.column_stack([starts[:, 0], starts[:, 1], ends[:, 1]])
+
+
+def largest_component(mask: np.ndarray) -> Tuple[int, Optional[Box]]:
+    """8 连通的最大连通域 (像素数, 外接框)，基于行程合并，不依赖 OpenCV。"""
+    runs = _runs(mask)
+    if not len(runs):
+        return 0, None
+
+    parent = list(range(len(runs)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = runs[:, 0].tolist()
+    starts = runs[:, 1].tolist()
+    ends = runs[:, 2].tolist()
+    prev_begin = prev_end = 0  # 上一行行程在 runs 中的下标范围
+    i = 0
+    while i < len(runs):
+        row = rows[i]
+        j = i
+        while j < len(runs) and rows[j] == row:
+            j += 1
+        if prev_end > prev_begin and rows[prev_begin] == row - 1:
+            k = prev_begin
+            for cur in range(i, j):
+                while k < prev_end and ends[k] < starts[cur]:
+                    k += 1
+                m = k
+                # 8 连通：上一行区间与 [start - 1, end] 有交集即相连
+                while m < prev_end and starts[m] <= ends[cur]:
+                    a, b = find(cur), find(m)
+                    if a != b:
+                        parent[a] = b
+                    m += 1
+        prev_begin, prev_end = i, j
+        i = j
+
+    stats: Dict[int, List[int]] = {}
+    for index in range(len(runs)):
+        root = find(index)
+        row, start, end = rows[index], starts[index], ends[index]
+        if root not in stats:
+            stats[root] = [0, start, row, end, row + 1]
+        stat = stats[root]
+        stat[0] += end - start
+        stat[1] = min(stat[1], start)
+        stat[2] = min(stat[2], row)
+        stat[3] = max(stat[3], end)
+        stat[4] = max(stat[4], row + 1)
+
+    count, x0, y0, x1, y1 = max(stats.values(), key=lambda s: s[0])
+    return count, (x0, y0, x1 - x0, y1 - y0)
+
+
+def color_match(features: FrameFeatures, target: dict) -> TargetResult:
+    x, y, w, h = features.roi(target)
+    method = target.get("method", METHOD_RGB)
+    if method == METHOD_HSV:
+        pixels = features.hsv[y : y + h, x : x + w]
+    elif method == METHOD_GRAY:
+        pixels = features.gray[y : y + h, x : x + w, None]
+    else:
+        pixels = features.rgb[y : y + h, x : x + w]
+
+    # 逐通道与 uint8 标量比较，避免整块广播成 int64
+    mask = np.zeros(pixels.shape[:2], dtype=bool)
+    for lower, upper in zip(_ranges(target["lower"]), _ranges(target["upper"])):
+        in_range = np.ones(pixels.shape[:2], dtype=bool)
+        for channel, (lo, hi) in enumerate(zip(lower, upper)):
+            plane = pixels[:, :, channel]
+            in_range &= (plane >= np.uint8(max(lo, 0))) & (plane <= np.uint8(min(hi, 255)))
+        mask |= in_range
+
+    # count 为面积，低分辨率下按比例平方缩放
+    required = max(1, round(target.get("count", 1) * features.scale * features.scale))
+    if target.get("connected", False):
+        count, box = largest_component(mask)
+    else:
+        count = int(mask.sum())
+        ys, xs = np.nonzero(mask)
+        box = (int(xs.min()), int(ys.min()), int(np.ptp(xs)) + 1, int(np.ptp(ys)) + 1) if count else None
+
+    if box is None or count < required:
+        return False, None, {"count": count}
+    return True, (box[0] + x, box[1] + y, box[2], box[3]), {"count": count}
+
+
+def template_match(features: FrameFeatures, target: dict) -> TargetResult:
+    template = load_template(target["template"], features.short_side)
+    factor = template.factor
+    x, y, w, h = features.roi(target)
+    # 对齐到 factor 的整数倍，才能直接复用整帧的下采样灰度图
+    x0, y0 = x // factor * factor, y // factor * factor
+    image = features.image[y0 : y + h, x0 : x + w]
+    coarse = features.coarse_gray(factor)[
+        y0 // factor : y0 // factor + image.shape[0] // factor,
+        x0 // factor : x0 // factor + image.shape[1] // factor,
+    ]
+
+    score, box = match(image, template, target.get("candidates", 3), coarse_gray=coarse)
+    if box is None or score < target.get("threshold", 0.7):
+        return False, None, {"score": score}
+    return True, (box[0] + x0, box[1] + y0, box[2], box[3]), {"score": score}
+
+
+MATCHERS = {
+    "ColorMatch": color_match,
+    "TemplateMatch": template_match,
+}
+
+
+def evaluate(features: FrameFeatures, targets: List[dict]) -> Dict[str, TargetResult]:
+    """在同一帧的共享预处理上求值一组目标，结果以 target_key 为键。"""
+    return {target_key(target): MATCHERS[target["type"]](features, target) for target in targets}
@@ -0,0 +1,244 @@
+"""
+主机级 CPU 预算：同一台机器上的所有 agent 进程在截图 / 识别前共同消费一个令牌桶。
+
+多开时每个轮询节点都尽可能快地截图识别，大家一起变慢，战斗结束检测超时。
+设置环境变量 MAA_CPU_BUDGET（整机留给 agent 的核数，如 3；auto 为 CPU 核数的 80%）后：
+
+- 令牌单位为 CPU 秒，整机每秒产生 rate 个；共享内存中每个 agent 占一个槽位，
+  最近 ACTIVE_SECONDS 内申请过令牌的实例平分 rate（公平份额），空闲实例不占份额
+- 每次操作先按该类操作的滑动平均代价预扣，结束后按本线程实测的 CPU 时间多退少补；
+  截图在模拟器与控制器进程中的开销无法从 agent 测量，只计 agent 侧接收图像的开销，
+  但同样要等令牌，轮询的截图频率随识别一起受限
+- 令牌不足时等待；延迟敏感的请求（priority，如接近预计结束时刻的 WaitBattleEnd）不等待，
+  允许透支到 -burst，之后由该实例自己的份额偿还，长期看仍是公平的
+- 共享内存的读写由一个文件锁保护，只在记账时持有，不覆盖被管控的操作本身
+
+未设置环境变量时 acquire 为空操作。
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from .logger import logger
+
+SHM_NAME = "maa_ysjyz_governor_v1"
+LOCK_PATH = os.path.join(tempfile.gettempdir(), "maa_ysjyz_governor.lock")
+SLOTS = 64
+# 多久未申请令牌的实例不再计入份额
+ACTIVE_SECONDS = 2.0
+# 多久无心跳的槽位可被新实例回收（进程崩溃时不会主动释放）
+STALE_SECONDS = 30.0
+# 每个实例最多积攒 / 透支的秒数份额
+BURST_SECONDS = 0.5
+# 单次等待的上限，之后重新计算份额
+MAX_SLEEP = 0.1
+
+_HEADER = np.dtype([("rate", "<f8"), ("version", "<u4"), ("slots", "<u4")])
+_SLOT = np.dtype(
+    [
+        ("pid", "<i8"),
+        ("heartbeat", "<f8"),  # 最近一次申请令牌的 time.time()
+        ("tokens", "<f8"),
+        ("last", "<f8"),  # 最近一次补充令牌的 time.time()
+        ("used", "<f8"),  # 累计消耗的 CPU 秒
+        ("waited", "<f8"),  # 累计等待秒数
+    ]
+)
+
+
+class _HostLock:
+    """跨进程互斥：锁文件 + flock / msvcrt.locking。"""
+
+    def __init__(self, path: str):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._local = threading.Lock()
+
+    def __enter__(self):
+        self._local.acquire()
+        if sys.platform == "win32":
+            import msvcrt
+
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if sys.platform == "win32":
+            import msvcrt
+
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._local.release()
+
+
+def _open_shared_memory():
+    from multiprocessing import shared_memory
+
+    size = _HEADER.itemsize + _SLOT.itemsize * SLOTS
+    try:
+        shm = shared_memory.SharedMemory(SHM_NAME, create=True, size=size)
+    except FileExistsError:
+        shm = shared_memory.SharedMemory(SHM_NAME)
+    if sys.platform != "win32":
+        # 不让本进程退出时删除共享内存，其他 agent 仍在使用
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    return shm
+
+
+class Governor:
+    def __init__(self):
+        self.enabled = False
+        self.rate = 0.0
+        self._shm = None
+        self._lock: Optional[_HostLock] = None
+        self._header = None
+        self._slots = None
+        self._index = -1
+        # 操作类型 -> 滑动平均代价（秒）
+        self._cost: Dict[str, float] = {}
+        self.waited = 0.0
+        self.requests = 0
+
+    def configure(self, cores: float):
+        """启用并设置整机预算（核数）；所有实例应使用相同的值，后设置的覆盖先前的。"""
+        try:
+            self._lock = _HostLock(LOCK_PATH)
+            self._shm = _open_shared_memory()
+            buf = self._shm.buf
+            self._header = np.ndarray((1,), _HEADER, buf, 0)
+            self._slots = np.ndarray((SLOTS,), _SLOT, buf, _HEADER.itemsize)
+            with self._lock:
+                self._header["rate"] = cores
+                self._header["slots"] = SLOTS
+                self._index = self._claim_slot()
+        except Exception as e:
+            logger.error(f"[Governor] 初始化失败，不做 CPU 限流: {e}")
+            return
+        self.rate = cores
+        self.enabled = self._index >= 0
+        if not self.enabled:
+            logger.error(f"[Governor] 槽位已满（{SLOTS}），不做 CPU 限流")
+            return
+        logger.info(f"[Governor] 整机 CPU 预算 {cores:.2f} 核，槽位 {self._index}")
+
+    def _claim_slot(self) -> int:
+        now = time.time()
+        slots = self._slots
+        pid = os.getpid()
+        free = np.flatnonzero((slots["pid"] == 0) | (slots["pid"] == pid) | (now - slots["heartbeat"] > STALE_SECONDS))
+        if not len(free):
+            return -1
+        index = int(free[0])
+        slots[index] = (pid, now, 0.0, now, 0.0, 0.0)
+        return index
+
+    def release(self):
+        if not self.enabled:
+            return
+        with self._lock:  # type: ignore
+            if self._slots[self._index]["pid"] == os.getpid():  # type: ignore
+                self._slots[self._index]["pid"] = 0  # type: ignore
+        self.enabled = False
+
+    def _take(self, cost: float, priority: bool) -> float:
+        """在锁内尝试扣除令牌；成功返回 0，否则返回预计还需等待的秒数。"""
+        now = time.time()
+        slots = self._slots
+        rate = float(self._header["rate"][0])  # type: ignore
+        slot = slots[self._index]  # type: ignore
+        if slot["pid"] != os.getpid():
+            # 槽位因长时间无心跳被回收
+            self._index = self._claim_slot()
+            if self._index < 0:
+                self.enabled = False
+                return 0.0
+            slot = slots[self._index]  # type: ignore
+
+        active = np.count_nonzero((slots["pid"] != 0) & (now - slots["heartbeat"] <= ACTIVE_SECONDS))  # type: ignore
+        share = rate / max(1, active + (0 if now - slot["heartbeat"] <= ACTIVE_SECONDS else 1))
+        burst = share * BURST_SECONDS
+        slot["tokens"] = min(burst, slot["tokens"] + (now - slot["last"]) * share)
+        slot["last"] = now
+        slot["heartbeat"] = now
+        if slot["tokens"] >= cost or (priority and slot["tokens"] - cost >= -burst):
+            slot["tokens"] -= cost
+            slot["used"] += cost
+            return 0.0
+        return (cost - slot["tokens"]) / max(share, 1e-6)
+
+    @contextmanager
+    def acquire(self, kind: str, priority: bool = False) -> Iterator[None]:
+        """在执行一次 kind 类操作前申请令牌，操作结束后按本线程 CPU 时间结算。"""
+        if not self.enabled:
+            yield
+            return
+
+        estimate = self._cost.get(kind, 0.005)
+        start_wait = time.perf_counter()
+        while True:
+            with self._lock:  # type: ignore
+                wait = self._take(estimate, priority)
+            if wait <= 0 or not self.enabled:
+                break
+            time.sleep(min(wait, MAX_SLEEP))
+        waited = time.perf_counter() - start_wait
+        self.waited += waited
+        self.requests += 1
+
+        start = time.thread_time()
+        try:
+            yield
+        finally:
+            actual = time.thread_time() - start
+            self._cost[kind] = estimate + 0.2 * (actual - estimate)
+            if self.enabled:
+                with self._lock:  # type: ignore
+                    slot = self._slots[self._index]  # type: ignore
+                    if slot["pid"] == os.getpid():
+                        slot["tokens"] -= actual - estimate
+                        slot["used"] += actual - estimate
+                        slot["waited"] += waited
+
+    def charge(self, seconds: float):
+        """记入在其他进程完成的操作的 CPU 时间（如识别工作进程，见 reco_pool.py）。"""
+        if not self.enabled:
+            return
+        with self._lock:  # type: ignore
+            slot = self._slots[self._index]  # type: ignore
+            if slot["pid"] == os.getpid():
+                slot["tokens"] -= seconds
+                slot["used"] += seconds
+
+    def snapshot(self) -> list:
+        """各活跃槽位的 (pid, 累计 CPU 秒, 累计等待秒)。"""
+        if self._slots is None:
+            return []
+        with self._lock:  # type: ignore
+            return [(int(s["pid"]), float(s["used"]), float(s["waited"])) for s in self._slots if s["pid"]]
+
+
+def budget_from_env(value: str) -> float:
+    """MAA_CPU_BUDGET 的值：核数，或 auto（CPU 核数的 80%）。"""
+    if value.strip().lower() == "auto":
+        return max(1.0, (os.cpu_count() or 1) * 0.8)
+    return float(value)
+
+
+governor = Governor()
@@ -0,0 +1,92 @@
+"""
+长时间运行的内存采样：定期把 RSS、tracemalloc 增长最多的分配位置、GC 统计追加写入 JSON Lines 文件。
+
+设置环境变量 MAA_MEMORY_PROBE=<文件路径> 后启用（tools/soak_agent.py 浸泡测试使用），
+采样间隔 MAA_MEMORY_PROBE_INTERVAL 秒（默认 60）。每行一个采样：
+    {"time": 秒（相对启动）, "rss": 字节, "traced": 字节, "peak": 字节, "objects": gc 跟踪的对象数,
+     "gc_count": [0/1/2 代计数], "gc_collections": [各代累计回收次数], "gc_collected": [...],
+     "top": [{"where": "文件:行", "size": 字节, "diff": 相对首个采样的增长, "count": 块数}]}
+
+tracemalloc 只保存 1 层调用栈，开销约为分配次数的常数倍，只应在测试时启用。
+"""
+
+import gc
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from .logger import logger
+from .metrics import _rss_bytes
+
+# 采样中保留的增长最多的分配位置数
+TOP_ALLOCATORS = 15
+
+
+class MemoryProbe:
+    def __init__(self, path: Path, interval: float = 60.0):
+        self.path = path
+        self.interval = interval
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(1)
+        self._baseline = self._snapshot()
+        self._thread = threading.Thread(target=self._loop, name="MemoryProbe", daemon=True)
+        self._thread.start()
+        logger.info(f"[MemoryProbe] 每 {self.interval:.0f}s 采样写入 {self.path}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+        tracemalloc.stop()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+
+    def sample(self):
+        if not tracemalloc.is_tracing():
+            return
+        stats = self._snapshot().compare_to(self._baseline, "lineno")  # type: ignore
+        stats.sort(key=lambda s: s.size_diff, reverse=True)
+        traced, peak = tracemalloc.get_traced_memory()
+        gc_stats = gc.get_stats()
+        record = {
+            "time": round(time.monotonic() - self._started, 1),
+            "rss": _rss_bytes(),
+            "traced": traced,
+            "peak": peak,
+            "objects": len(gc.get_objects()),
+            "gc_count": list(gc.get_count()),
+            "gc_collections": [s["collections"] for s in gc_stats],
+            "gc_collected": [s["collected"] for s in gc_stats],
+            "top": [
+                {"where": str(s.traceback), "size": s.size, "diff": s.size_diff, "count": s.count}
+                for s in stats[:TOP_ALLOCATORS]
+            ],
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"[MemoryProbe] 采样失败: {e}")
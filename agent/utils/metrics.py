@@ -0,0 +1,251 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+# 识别 / 点击耗时的固定分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def get(self) -> float:
+        with self._lock:
+            return self.value
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...], lock: threading.Lock):
+        self.bounds = bounds
+        self._lock = lock
+        # 最后一个桶为 +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Metric:
+    """
+    指标族，按标签值缓存子指标。
+
+    写入方不止一个：AgentServer 回调线程、FrameTargets 预取线程、ArtifactStore
+    线程等都会更新指标，`+=` 不是原子操作，因此同一指标族的所有子指标共用一把锁，
+    更新与导出都在锁内进行，导出的直方图各桶与 sum / count 保持一致。
+    子指标在首次出现该标签时创建，之后的更新只做原地加法，不分配新对象。
+    """
+
+    def __init__(self, name: str, help: str, kind: str, label: Optional[str] = None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._children: Dict[str, object] = {}
+        self._default = None if label else self._new_child()
+
+    def _new_child(self):
+        if self.kind == "histogram":
+            return _Histogram(self.buckets, self._lock)
+        return _Counter(self._lock)
+
+    def labels(self, value: str):
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.get(value)
+                if child is None:
+                    child = self._children[value] = self._new_child()
+        return child
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)  # type: ignore
+
+    def observe(self, value: float):
+        self._default.observe(value)  # type: ignore
+
+    def set(self, value: float):
+        self._default.set(value)  # type: ignore
+
+    def get(self) -> float:
+        """无标签计数器 / 仪表的当前值。"""
+        return self._default.get()  # type: ignore
+
+    def _samples(self):
+        if self.label:
+            return [(f'{{{self.label}="{k}"}}', v) for k, v in list(self._children.items())]
+        return [("", self._default)]
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        with self._lock:
+            samples = [
+                (label, child.value if self.kind != "histogram" else (list(child.counts), child.sum, child.count))
+                for label, child in self._samples()
+            ]
+        for label, sample in samples:
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{label} {sample}")
+                continue
+            counts, total, count = sample
+            inner = label[1:-1] + "," if label else ""
+            cumulative = 0
+            for bound, bucket in zip(self.bounds_with_inf(), counts):
+                cumulative += bucket
+                lines.append(f'{self.name}_bucket{{{inner}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{label} {total}")
+            lines.append(f"{self.name}_count{label} {count}")
+
+    def bounds_with_inf(self):
+        return [str(b) for b in self.buckets] + ["+Inf"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+        self.start_time = time.time()
+
+    def counter(self, name: str, help: str, label: Optional[str] = None) -> Metric:
+        return self._add(Metric(name, help, "counter", label))
+
+    def gauge(self, name: str, help: str, label: Optional[str] = None) -> Metric:
+        return self._add(Metric(name, help, "gauge", label))
+
+    def histogram(self, name: str, help: str, label: Optional[str] = None, buckets=LATENCY_BUCKETS) -> Metric:
+        return self._add(Metric(name, help, "histogram", label, buckets))
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines: List[str] = []
+        for metric in self.metrics:
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+def _rss_bytes() -> int:
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.WorkingSetSize
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # macOS 上 ru_maxrss 单位为字节，其余为 KB；这里只能拿到峰值
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+registry = Registry()
+
+battles_total = registry.counter("maa_battles_total", "Finished battles.")
+battles_per_hour = registry.gauge("maa_battles_per_hour", "Finished battles per hour since agent start.")
+recognition_seconds = registry.histogram(
+    "maa_recognition_seconds", "Custom recognition latency.", label="recognizer"
+)
+frame_age_seconds = registry.histogram(
+    "maa_frame_age_seconds", "Age of prefetched frames when recognition starts on them."
+)
+click_seconds = registry.histogram("maa_click_seconds", "Controller click latency (post_click + wait).")
+node_failures_total = registry.counter("maa_node_failures_total", "Failed custom actions per node.", label="node")
+job_retries_total = registry.counter("maa_job_retries_total", "Retried (map, job) items per entry node.", label="node")
+recovery_seconds = registry.histogram(
+    "maa_recovery_seconds", "Watchdog recovery latency.", buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+)
+memory_rss_bytes = registry.gauge("maa_memory_rss_bytes", "Resident set size of the agent process.")
+uptime_seconds = registry.gauge("maa_uptime_seconds", "Seconds since agent start.")
+
+
+def _collect():
+    uptime = time.time() - registry.start_time
+    uptime_seconds.set(uptime)
+    battles_per_hour.set(battles_total.get() * 3600 / max(uptime, 1.0))
+    try:
+        memory_rss_bytes.set(_rss_bytes())
+    except Exception:
+        pass
+
+
+registry.collectors.append(_collect)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """在后台线程启动 /metrics 端点（Prometheus 文本格式）。"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="Metrics", daemon=True).start()
+    logger.info(f"Metrics 端点已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,111 @@
+"""
+预取截图：识别当前帧的同时，后台线程已在截下一帧。
+
+串行轮询的周期是 截图 + 识别；预取后接近 max(截图, 识别)。
+
+- 双缓冲：后台线程截图写入后缓冲，完成后与前缓冲交换（只交换引用，消费方持有的帧不会被覆盖）
+- 帧龄：每帧记录序号与截图开始 / 结束时间；消费方只取比上次更新的帧，
+  并拒绝截图开始早于 not_before（例如上一次动作完成时刻）或超过 max_age 的旧帧
+- 截图间隔：相邻两次截图的开始时刻至少相隔 interval 秒，避免连续截图占满 ADB 与 CPU
+"""
+
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from .logger import logger
+
+
+class Frame(NamedTuple):
+    seq: int
+    image: np.ndarray
+    started_at: float  # time.monotonic()，截图请求发出时刻
+    captured_at: float  # time.monotonic()，截图返回时刻
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.captured_at
+
+
+class FramePrefetcher:
+    def __init__(self, capture: Callable[[], Optional[np.ndarray]], interval: float = 0.0):
+        self.capture = capture
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._front: Optional[Frame] = None
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.captures = 0
+        self.capture_seconds = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="FramePrefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止并等待正在进行的截图结束，之后控制器交还给 pipeline。"""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                image = self.capture()
+            except Exception as e:
+                logger.error(f"[FramePrefetcher] 截图失败: {e}")
+                image = None
+            captured = time.monotonic()
+            if image is None or not getattr(image, "size", 0):
+                # 截图失败时不要空转
+                self._stop_event.wait(0.1)
+                continue
+
+            with self._cond:
+                self._seq += 1
+                # 后缓冲完成，交换到前缓冲
+                self._front = Frame(self._seq, image, started, captured)
+                self.captures += 1
+                self.capture_seconds += captured - started
+                self._cond.notify_all()
+
+            # 识别与这段等待重叠，轮询周期为 max(interval, 截图, 识别)
+            self._stop_event.wait(max(0.0, started + self.interval - time.monotonic()))
+
+    def next(
+        self,
+        after_seq: int = 0,
+        not_before: float = 0.0,
+        max_age: float = float("inf"),
+        timeout: Optional[float] = None,
+    ) -> Optional[Frame]:
+        """
+        等待一帧满足：序号大于 after_seq、截图开始不早于 not_before、帧龄不超过 max_age。
+
+        超时或已停止时返回 None。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                frame = self._front
+                if (
+                    frame is not None
+                    and frame.seq > after_seq
+                    and frame.started_at >= not_before
+                    and frame.age <= max_age
+                ):
+                    return frame
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if self._stop_event.is_set() or (remaining is not None and remaining <= 0):
+                    return None
+                self._cond.wait(remaining)
@@ -0,0 +1,183 @@
+"""
+由粗到细的金字塔模板匹配（TM_CCOEFF_NORMED，与 MaaFramework TemplateMatch 的默认 method 5 一致）。
+
+1. 整张 ROI 按 factor 块均值下采样并转灰度，用 FFT 计算粗尺度的归一化相关
+2. 取粗尺度得分最高的若干候选峰
+3. 只在候选峰附近的小窗口内，用全分辨率灰度图逐像素精确计算
+
+模板在 PreparedTemplate 中预处理一次（灰度、去均值、范数、各尺度版本），由 load_template 按进程缓存。
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PIL import Image
+
+from .coords import BASE_SHORT_SIDE
+
+# BGR -> 灰度权重，与 OpenCV COLOR_BGR2GRAY 相同
+GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    return image[:, :, :3].astype(np.float32) @ GRAY_WEIGHTS
+
+
+def block_mean(image: np.ndarray, factor: int) -> np.ndarray:
+    """按 factor × factor 块求均值下采样（丢弃不足一块的边缘）。"""
+    if factor == 1:
+        return image.astype(np.float32)
+    h = image.shape[0] // factor * factor
+    w = image.shape[1] // factor * factor
+    # 逐偏移做 factor² 次跨步整数累加，比 reshape 后 mean 快数倍
+    if np.issubdtype(image.dtype, np.integer):
+        dtype = np.uint32 if factor > 16 else np.uint16
+    else:
+        dtype = np.float32
+    acc = np.zeros((h // factor, w // factor) + image.shape[2:], dtype=dtype)
+    for dy in range(factor):
+        for dx in range(factor):
+            acc += image[dy:h:factor, dx:w:factor]
+    return acc.astype(np.float32) / (factor * factor)
+
+
+def window_sums(image: np.ndarray, h: int, w: int) -> np.ndarray:
+    """所有 h × w 窗口的像素和（积分图）。"""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0), axis=1, out=integral[1:, 1:])
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+class PreparedTemplate:
+    def __init__(self, gray: np.ndarray, factor: int):
+        self.factor = factor
+        self.full = self._prepare(gray)
+        self.coarse = self._prepare(block_mean(gray, factor))
+
+    @staticmethod
+    def _prepare(gray: np.ndarray) -> Tuple[np.ndarray, float]:
+        zero_mean = gray.astype(np.float32) - float(gray.mean())
+        return zero_mean, float(np.sqrt((zero_mean.astype(np.float64) ** 2).sum()))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.full[0].shape  # type: ignore
+
+
+def auto_factor(template_shape: Tuple[int, int], min_side: int = 8, max_factor: int = 8) -> int:
+    """粗尺度模板短边不小于 min_side 的最大下采样倍数。"""
+    factor = max(1, min(template_shape) // min_side)
+    return min(factor, max_factor)
+
+
+# 安装后 cwd 为项目根目录，开发模式下 main.py 会切换到 assets，两种情况模板都在这里
+IMAGE_DIR = Path("resource") / "base" / "image"
+
+# (模板名, 截图短边) -> 预处理后的模板
+_templates: Dict[Tuple[str, int], PreparedTemplate] = {}
+
+
+def load_template(name: str, short_side: int) -> PreparedTemplate:
+    """加载并缓存模板；模板按短边 BASE_SHORT_SIDE 截取，低分辨率模式下同比缩小。"""
+    key = (name, short_side)
+    if key not in _templates:
+        path = IMAGE_DIR / name
+        if not path.exists():
+            raise FileNotFoundError(f"模板图不存在: {path}")
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            if short_side != BASE_SHORT_SIDE:
+                scale = short_side / BASE_SHORT_SIDE
+                size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                image = image.resize(size, Image.Resampling.BOX)
+            gray = to_gray(np.asarray(image)[:, :, ::-1])
+        _templates[key] = PreparedTemplate(gray, auto_factor(gray.shape))
+    return _templates[key]
+
+
+def ncc_fft(image: np.ndarray, template: Tuple[np.ndarray, float]) -> np.ndarray:
+    zero_mean, norm = template
+    h, w = zero_mean.shape
+    H, W = image.shape
+    if H < h or W < w or norm == 0:
+        return np.zeros((max(H - h + 1, 0), max(W - w + 1, 0)), dtype=np.float32)
+
+    shape = (H + h - 1, W + w - 1)
+    corr = np.fft.irfft2(
+        np.fft.rfft2(image, shape) * np.fft.rfft2(zero_mean[::-1, ::-1], shape), shape
+    )[h - 1 : H, w - 1 : W]
+
+    n = h * w
+    s1 = window_sums(image, h, w)
+    s2 = window_sums(image.astype(np.float64) ** 2, h, w)
+    denom = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0)) * norm
+    return np.where(denom > 1e-6, corr / np.maximum(denom, 1e-6), 0).astype(np.float32)
+
+
+def ncc_direct(image: np.ndarray, template: Tuple[np.ndarray, float]) -> np.ndarray:
+    zero_mean, norm = template
+    h, w = zero_mean.shape
+    windows = sliding_window_view(image, (h, w))
+    numerator = np.einsum("ijkl,kl->ij", windows, zero_mean, optimize=True)
+    s1 = windows.sum(axis=(2, 3), dtype=np.float64)
+    s2 = np.einsum("ijkl,ijkl->ij", windows, windows, optimize=True).astype(np.float64)
+    denom = np.sqrt(np.maximum(s2 - s1 * s1 / (h * w), 0)) * norm
+    return np.where(denom > 1e-6, numerator / np.maximum(denom, 1e-6), 0).astype(np.float32)
+
+
+def top_peaks(scores: np.ndarray, count: int, radius: int) -> List[Tuple[int, int]]:
+    """得分最高且彼此间距大于 radius 的至多 count 个峰。"""
+    peaks: List[Tuple[int, int]] = []
+    if scores.size == 0:
+        return peaks
+    flat = np.argsort(scores, axis=None)[::-1][: count * (2 * radius + 1) ** 2]
+    for index in flat:
+        y, x = divmod(int(index), scores.shape[1])
+        if all(abs(y - py) > radius or abs(x - px) > radius for py, px in peaks):
+            peaks.append((y, x))
+            if len(peaks) == count:
+                break
+    return peaks
+
+
+def match(
+    image: np.ndarray,
+    template: PreparedTemplate,
+    candidates: int = 3,
+    coarse_gray: Optional[np.ndarray] = None,
+) -> Tuple[float, Optional[Tuple[int, int, int, int]]]:
+    """
+    在 BGR 图像中匹配模板，返回 (最高得分, 框 [x, y, w, h])。
+
+    coarse_gray 可传入调用方已算好的粗尺度灰度图（与 template.factor 一致），避免重复下采样。
+    """
+    factor = template.factor
+    h, w = template.shape
+    if image.shape[0] < h or image.shape[1] < w:
+        return 0.0, None
+
+    if coarse_gray is None:
+        coarse_gray = to_gray(block_mean(image, factor))
+    coarse_scores = ncc_fft(coarse_gray, template.coarse)
+    peaks = top_peaks(coarse_scores, candidates, radius=1)
+
+    best_score, best_box = -1.0, None
+    margin = factor * 2
+    for cy, cx in peaks:
+        y0 = max(cy * factor - margin, 0)
+        x0 = max(cx * factor - margin, 0)
+        y1 = min(cy * factor + margin + h, image.shape[0])
+        x1 = min(cx * factor + margin + w, image.shape[1])
+        if y1 - y0 < h or x1 - x0 < w:
+            continue
+        scores = ncc_direct(to_gray(image[y0:y1, x0:x1]), template.full)
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        if scores[y, x] > best_score:
+            best_score = float(scores[y, x])
+            best_box = (int(x0 + x), int(y0 + y), w, h)
+
+    return best_score, best_box
@@ -0,0 +1,207 @@
+"""
+识别工作进程池：把 NumPy / Pillow 识别从 agent 进程移到独立进程，避免与 AgentServer 线程、日志争用 GIL。
+
+- 帧传递：共享内存中的环形槽位（每个工作进程 2 个），agent 把帧复制进空闲槽位，
+  工作进程直接在共享内存上构造 ndarray 识别，不经过 pickle；只有任务参数与结果（命中、框、detail）走队列
+- 任务：按名称注册在 TASKS 中，工作进程各自缓存模板
+- 结果：后台线程按请求号取回结果、归还槽位；工作进程的 CPU 时间计入主机 CPU 预算（governor.py）
+- 帧大于槽位、进程池不可用时调用方在本进程识别，结果相同
+
+设置环境变量 MAA_RECO_WORKERS（进程数，或 auto 为 CPU 核数 - 1）后启用，
+自定义识别 FrameTargets 透明地分发到进程池。
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .governor import governor
+from .logger import logger
+
+# 每个槽位可容纳的最大帧（1080p BGR）
+SLOT_BYTES = 1920 * 1080 * 3
+SLOTS_PER_WORKER = 2
+# 工作进程检查父进程是否仍在的间隔
+PARENT_CHECK_SECONDS = 1.0
+# 等待结果的上限，超时视为工作进程异常，之后改回本进程识别
+RESULT_TIMEOUT_SECONDS = 10.0
+
+
+def _frame_targets(image: np.ndarray, targets: list) -> dict:
+    from .frame_targets import FrameFeatures, evaluate
+
+    return evaluate(FrameFeatures(image), targets)
+
+
+TASKS = {
+    "frame_targets": _frame_targets,
+}
+
+
+def _worker(shm_name: str, cwd: str, tasks, results, parent: int):
+    from multiprocessing import shared_memory
+
+    # spawn 会重新执行 agent/main.py 的模块级代码，其中的 chdir 与父进程的开发模式目录不同，模板路径相对 cwd
+    os.chdir(cwd)
+    shm = shared_memory.SharedMemory(shm_name)
+    try:
+        while True:
+            try:
+                task = tasks.get(timeout=PARENT_CHECK_SECONDS)
+            except queue.Empty:
+                if os.getppid() != parent:
+                    return
+                continue
+            if task is None:
+                return
+            request, slot, shape, dtype, name, args = task
+            start = time.thread_time()
+            try:
+                image = np.ndarray(shape, dtype, shm.buf, slot * SLOT_BYTES)
+                result = (True, TASKS[name](image, *args))
+                del image
+            except Exception as e:
+                result = (False, f"{type(e).__name__}: {e}")
+            results.put((request, result, time.thread_time() - start))
+    finally:
+        shm.close()
+
+
+class RecognitionPool:
+    def __init__(self):
+        self.enabled = False
+        self.workers = 0
+        self._processes: list = []
+        self._shm = None
+        self._tasks = None
+        self._results = None
+        self._free: "queue.Queue[int]" = queue.Queue()
+        self._pending: Dict[int, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._collector: Optional[threading.Thread] = None
+
+    def start(self, workers: int):
+        from multiprocessing import shared_memory
+
+        # agent 进程中有 AgentServer 的线程，fork 不安全
+        ctx = multiprocessing.get_context("spawn")
+        slots = workers * SLOTS_PER_WORKER
+        try:
+            self._shm = shared_memory.SharedMemory(create=True, size=SLOT_BYTES * slots)
+            self._tasks = ctx.Queue()
+            self._results = ctx.Queue()
+            for index in range(workers):
+                process = ctx.Process(
+                    target=_worker,
+                    args=(self._shm.name, os.getcwd(), self._tasks, self._results, os.getpid()),
+                    name=f"RecognitionWorker-{index}",
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+        except Exception as e:
+            logger.error(f"[RecognitionPool] 启动失败，在本进程识别: {e}")
+            self.stop()
+            return
+        for slot in range(slots):
+            self._free.put(slot)
+        self._collector = threading.Thread(target=self._collect, name="RecognitionPool", daemon=True)
+        self._collector.start()
+        self.workers = workers
+        self.enabled = True
+        logger.info(f"[RecognitionPool] {workers} 个识别进程，{slots} 个帧槽位")
+
+    def stop(self):
+        self.enabled = False
+        for _ in self._processes:
+            self._tasks.put(None)  # type: ignore
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        if self._results is not None and self._collector is not None:
+            self._results.put(None)
+            self._collector.join()
+        self._collector = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _collect(self):
+        while True:
+            item = self._results.get()  # type: ignore
+            if item is None:
+                break
+            request, (ok, value), cpu = item
+            with self._pending_lock:
+                future, slot = self._pending.pop(request)
+            self._free.put(slot)
+            governor.charge(cpu)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+        # 进程池已停止，未完成的请求不会再有结果
+        with self._pending_lock:
+            for future, _ in self._pending.values():
+                future.set_exception(RuntimeError("识别进程池已停止"))
+            self._pending.clear()
+
+    def submit(self, name: str, image: np.ndarray, *args) -> Optional[Future]:
+        """
+        把 image 复制进空闲槽位并提交任务；帧大于槽位或进程池未启用时返回 None。
+
+        工作进程在任务中途退出时其槽位不会归还，等待空闲槽位超过 RESULT_TIMEOUT_SECONDS
+        同样视为进程池异常，停用后返回 None，由调用方在本进程识别。
+        """
+        if not self.enabled or image.nbytes > SLOT_BYTES:
+            return None
+        try:
+            slot = self._free.get(timeout=RESULT_TIMEOUT_SECONDS)
+        except queue.Empty:
+            alive = sum(p.is_alive() for p in self._processes)
+            logger.error(f"[RecognitionPool] {name} 等待空闲槽位超时，存活进程 {alive}/{self.workers}，改为本进程识别")
+            self.enabled = False
+            return None
+        view = np.ndarray(image.shape, image.dtype, self._shm.buf, slot * SLOT_BYTES)  # type: ignore
+        np.copyto(view, image)
+        del view
+        request = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[request] = (future, slot)
+        self._tasks.put((request, slot, image.shape, image.dtype.str, name, args))  # type: ignore
+        return future
+
+    def run(self, name: str, image: np.ndarray, *args) -> Any:
+        """在工作进程中执行 TASKS[name](image, *args)，不可用时在本进程执行。"""
+        future = self.submit(name, image, *args)
+        if future is None:
+            return TASKS[name](image, *args)
+        try:
+            return future.result(timeout=RESULT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            alive = sum(p.is_alive() for p in self._processes)
+            logger.error(f"[RecognitionPool] {name} 超时，存活进程 {alive}/{self.workers}，改为本进程识别")
+            self.enabled = False
+            return TASKS[name](image, *args)
+
+
+def workers_from_env(value: str) -> int:
+    """MAA_RECO_WORKERS 的值：进程数，或 auto（CPU 核数 - 1，至少 1）。"""
+    if value.strip().lower() == "auto":
+        return max(1, (os.cpu_count() or 1) - 1)
+    return int(value)
+
+
+reco_pool = RecognitionPool()
@@ -0,0 +1,94 @@
+"""
+失败隔离的重试队列：某一项失败时推迟到队尾，其余项照常执行。
+
+- 每项最多尝试 max_attempts 次，第 n 次失败后至少等待 backoff × 2^(n-1) 秒（不超过 max_backoff）再重试
+- 全部项共享 budget 次重试，用完后新的失败项直接放弃，避免持续故障时无限拖长运行
+- 未执行过的项总是优先于等待重试的项；只剩等待中的项时，返回最早可重试项及需等待的秒数
+- 未执行的项可由调用方重排或跳过（如按时间预算规划，见 utils/farm_planner.py），跳过不算失败
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class RetryQueue(Generic[T]):
+    def __init__(
+        self,
+        items: Iterable[T],
+        max_attempts: int = 3,
+        backoff: float = 5.0,
+        max_backoff: float = 60.0,
+        budget: Optional[int] = None,
+    ):
+        self._pending: Deque[T] = deque(items)
+        self.total = len(self._pending)
+        # (可重试时刻 monotonic, 项)
+        self._deferred: List[Tuple[float, T]] = []
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = self.total if budget is None else budget
+        self.retries = 0
+        self.attempts: Dict[T, int] = {}
+        self.succeeded: List[T] = []
+        self.given_up: Dict[T, str] = {}
+        self.skipped: Dict[T, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._deferred)
+
+    def next(self) -> Optional[Tuple[T, float]]:
+        """返回 (下一项, 需等待的秒数)；队列为空时返回 None。取出的项必须随后报告 success / failure。"""
+        if self._pending:
+            return self._pending.popleft(), 0.0
+        if not self._deferred:
+            return None
+        index = min(range(len(self._deferred)), key=lambda i: self._deferred[i][0])
+        ready_at, item = self._deferred.pop(index)
+        self.retries += 1
+        return item, max(0.0, ready_at - time.monotonic())
+
+    def pending(self) -> List[T]:
+        """尚未执行过的项，按执行顺序。"""
+        return list(self._pending)
+
+    def reorder(self, order: List[T], reason: str = ""):
+        """按 order 重排未执行的项；不在 order 中的项跳过。"""
+        pending = set(self._pending)
+        for item in self._pending:
+            if item not in order:
+                self.skipped[item] = reason
+        self._pending = deque(item for item in order if item in pending)
+
+    def skip(self, item: T, reason: str = ""):
+        """跳过 next() 刚取出的项。"""
+        self.skipped[item] = reason
+
+    def success(self, item: T):
+        self.attempts[item] = self.attempts.get(item, 0) + 1
+        self.succeeded.append(item)
+
+    def failure(self, item: T, reason: str = "") -> bool:
+        """记录一次失败；返回是否会重试。"""
+        attempts = self.attempts[item] = self.attempts.get(item, 0) + 1
+        if attempts >= self.max_attempts:
+            self.given_up[item] = f"{reason}（已尝试 {attempts} 次）"
+            return False
+        # 已排队等待的重试同样占用预算
+        if self.retries + len(self._deferred) >= self.budget:
+            self.given_up[item] = f"{reason}（重试预算 {self.budget} 已用完）"
+            return False
+        delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+        self._deferred.append((time.monotonic() + delay, item))
+        return True
+
+    def summary(self) -> str:
+        text = f"完成 {len(self.succeeded)}/{self.total}，重试 {self.retries} 次"
+        if self.given_up:
+            text += "，放弃: " + "; ".join(f"{item} {reason}" for item, reason in self.given_up.items())
+        if self.skipped:
+            text += "，跳过: " + "; ".join(f"{item} {reason}" for item, reason in self.skipped.items())
+        return text
@@ -0,0 +1,260 @@
+"""
+会话录制格式（.mysr）：单文件保存帧序列与事件，支持 mmap 随机访问。
+
+文件结构：
+    header  : MAGIC(4) version(u16) reserved(u16)
+    record* : kind(u8) seq(u32) timestamp(f64) length(u32) payload
+    index   : (offset(u64) kind(u8) seq(u32) timestamp(f64))*
+    footer  : INDEX_MAGIC(4) index_offset(u64) count(u32)
+
+record 类型：
+    K 关键帧  payload = height(u16) width(u16) channels(u8) + zlib(原始像素)
+    D 差分帧  payload = zlib(当前帧 XOR 上一帧)
+    E 事件    payload = UTF-8 JSON（动作、识别结果等）
+
+未正常关闭（没有 index）的文件可通过顺序扫描 record 恢复。
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"MYSR"
+INDEX_MAGIC = b"MYSI"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<BIdI")
+INDEX_ENTRY = struct.Struct("<QBId")
+FOOTER = struct.Struct("<4sQI")
+SHAPE = struct.Struct("<HHB")
+
+KIND_KEYFRAME = ord("K")
+KIND_DELTA = ord("D")
+KIND_EVENT = ord("E")
+
+
+class SessionWriter:
+    def __init__(self, path: Path, keyframe_interval: int = 30, level: int = 1):
+        self.path = Path(path)
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+
+        self._lock = threading.Lock()
+        self._file = open(self.path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0))
+        self._index: List[Tuple[int, int, int, float]] = []
+        self._previous: Optional[np.ndarray] = None
+        self._frame_count = 0
+        self._event_count = 0
+
+    def _write(self, kind: int, seq: int, timestamp: float, payload: bytes):
+        offset = self._file.tell()
+        self._file.write(RECORD.pack(kind, seq, timestamp, len(payload)))
+        self._file.write(payload)
+        self._index.append((offset, kind, seq, timestamp))
+
+    def add_frame(self, image: np.ndarray, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        if image.ndim == 2:
+            image = image[:, :, None]
+
+        with self._lock:
+            previous = self._previous
+            if (
+                previous is None
+                or previous.shape != image.shape
+                or self._frame_count % self.keyframe_interval == 0
+            ):
+                height, width, channels = image.shape
+                payload = SHAPE.pack(height, width, channels) + zlib.compress(image.tobytes(), self.level)
+                self._write(KIND_KEYFRAME, self._frame_count, timestamp, payload)
+                self._previous = image.copy()
+            else:
+                np.bitwise_xor(image, previous, out=previous)
+                self._write(KIND_DELTA, self._frame_count, timestamp, zlib.compress(previous.tobytes(), self.level))
+                previous[...] = image
+            self._frame_count += 1
+
+    def add_event(self, kind: str, data: dict, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        payload = json.dumps({"type": kind, **data}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._write(KIND_EVENT, self._event_count, timestamp, payload)
+            self._event_count += 1
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            index_offset = self._file.tell()
+            for entry in self._index:
+                self._file.write(INDEX_ENTRY.pack(*entry))
+            self._file.write(FOOTER.pack(INDEX_MAGIC, index_offset, len(self._index)))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionReader:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} 不是会话录制文件")
+        if version > VERSION:
+            raise ValueError(f"不支持的会话录制版本: {version}")
+
+        index = self._read_index()
+        # 帧：(offset, kind, timestamp)；keyframe_of[i] 为帧 i 所依赖的关键帧序号
+        self.frames: List[Tuple[int, int, float]] = []
+        self.keyframe_of: List[int] = []
+        self.event_offsets: List[Tuple[int, float]] = []
+        self.records: List[Tuple[int, int, float]] = []
+        for offset, kind, _, timestamp in index:
+            self.records.append((offset, kind, timestamp))
+            if kind == KIND_EVENT:
+                self.event_offsets.append((offset, timestamp))
+                continue
+            if kind == KIND_KEYFRAME:
+                self.keyframe_of.append(len(self.frames))
+            else:
+                self.keyframe_of.append(self.keyframe_of[-1] if self.keyframe_of else 0)
+            self.frames.append((offset, kind, timestamp))
+
+        self._cache_index = -1
+        self._cache: Optional[np.ndarray] = None
+
+    def _read_index(self) -> List[Tuple[int, int, int, float]]:
+        size = len(self._mm)
+        if size >= HEADER.size + FOOTER.size:
+            magic, index_offset, count = FOOTER.unpack_from(self._mm, size - FOOTER.size)
+            if magic == INDEX_MAGIC and index_offset + count * INDEX_ENTRY.size + FOOTER.size == size:
+                return [
+                    INDEX_ENTRY.unpack_from(self._mm, index_offset + i * INDEX_ENTRY.size)
+                    for i in range(count)
+                ]
+
+        # 未正常关闭：顺序扫描 record，丢弃末尾不完整的部分
+        index = []
+        offset = HEADER.size
+        while offset + RECORD.size <= size:
+            kind, seq, timestamp, length = RECORD.unpack_from(self._mm, offset)
+            if kind not in (KIND_KEYFRAME, KIND_DELTA, KIND_EVENT) or offset + RECORD.size + length > size:
+                break
+            index.append((offset, kind, seq, timestamp))
+            offset += RECORD.size + length
+        return index
+
+    def _payload(self, offset: int) -> memoryview:
+        _, _, _, length = RECORD.unpack_from(self._mm, offset)
+        start = offset + RECORD.size
+        return memoryview(self._mm)[start : start + length]
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    def timestamp(self, index: int) -> float:
+        return self.frames[index][2]
+
+    def frame(self, index: int) -> np.ndarray:
+        """随机访问第 index 帧（BGR）。顺序访问时复用上一帧，只解一个差分。"""
+        if index < 0:
+            index += len(self.frames)
+        if self._cache is not None and self._cache_index == index:
+            return self._cache.copy()
+
+        keyframe = self.keyframe_of[index]
+        if self._cache is not None and keyframe <= self._cache_index < index:
+            start, image = self._cache_index + 1, self._cache
+        else:
+            payload = self._payload(self.frames[keyframe][0])
+            height, width, channels = SHAPE.unpack_from(payload, 0)
+            raw = zlib.decompress(payload[SHAPE.size :])
+            image = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, channels).copy()
+            start = keyframe + 1
+
+        for i in range(start, index + 1):
+            delta = np.frombuffer(zlib.decompress(self._payload(self.frames[i][0])), dtype=np.uint8)
+            np.bitwise_xor(image, delta.reshape(image.shape), out=image)
+
+        self._cache_index, self._cache = index, image
+        return image.copy()
+
+    def iter_frames(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        for i in range(len(self.frames)):
+            yield i, self.frames[i][2], self.frame(i)
+
+    def events(self) -> Iterator[Tuple[float, dict]]:
+        for offset, timestamp in self.event_offsets:
+            yield timestamp, json.loads(bytes(self._payload(offset)).decode("utf-8"))
+
+    def timeline(self) -> Iterator[Tuple[float, str, object]]:
+        """按写入顺序交错返回 ("frame", 帧序号) 与 ("event", 事件)。"""
+        frame_index = 0
+        for offset, kind, timestamp in self.records:
+            if kind == KIND_EVENT:
+                yield timestamp, "event", json.loads(bytes(self._payload(offset)).decode("utf-8"))
+            else:
+                yield timestamp, "frame", frame_index
+                frame_index += 1
+
+    def close(self):
+        self._cache = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# agent 进程内的当前录制会话，未开启录制时为 None
+recorder: Optional[SessionWriter] = None
+
+
+def start_recording(directory: Path, keyframe_interval: int = 30) -> SessionWriter:
+    global recorder
+    os.makedirs(directory, exist_ok=True)
+    recorder = SessionWriter(Path(directory) / f"{time.strftime('%Y.%m.%d-%H.%M.%S')}.mysr", keyframe_interval)
+    return recorder
+
+
+def stop_recording():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+
+
+def record_frame(image: np.ndarray):
+    if recorder is not None:
+        recorder.add_frame(image)
+
+
+def record_event(kind: str, data: dict):
+    if recorder is not None:
+        recorder.add_event(kind, data)
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .logger import logger
+
+
+class Watchdog:
+    """
+    卡死检测看门狗。
+
+    - pipeline 轮询时通过 feed() 喂入当前帧（由 WatchdogCheck 自定义识别调用），喂帧时即做判定：
+      画面长时间不变（frozen）或长时间无已知界面（unknown）即触发
+    - hold=True 的帧（如战斗进行中，画面可能长时间静止、也没有已知界面）只重新计时，不做判定
+    - 长时间没有喂帧（pipeline 已离开等待节点）时视为空闲，下次喂帧重新计时
+    - 触发后由 pipeline 进入恢复子流水线，恢复完成时调用 recovered() 记录恢复耗时
+
+    判定只在喂帧时进行：pipeline 之外没有人能让流程跳转到恢复子流水线，后台计时不会更早生效。
+    """
+
+    def __init__(
+        self,
+        freeze_seconds: float = 8.0,
+        unknown_seconds: float = 15.0,
+        diff_threshold: float = 2.0,
+        stride: int = 16,
+        idle_seconds: float = 10.0,
+    ):
+        self.freeze_seconds = freeze_seconds
+        self.unknown_seconds = unknown_seconds
+        self.diff_threshold = diff_threshold
+        self.stride = stride
+        self.idle_seconds = idle_seconds
+
+        self._lock = threading.Lock()
+
+        self._signature: Optional[np.ndarray] = None
+        self._last_feed = 0.0
+        self._last_change = 0.0
+        self._last_known = 0.0
+
+        self.tripped_reason: Optional[str] = None
+        self.tripped_at = 0.0
+        self.recovery_latencies: List[float] = []
+
+    def feed(self, image: np.ndarray, known: Optional[bool] = None, hold: bool = False) -> Optional[str]:
+        """
+        喂入一帧并判定，返回触发原因（frozen / unknown），未触发返回 None。
+
+        Args:
+            image: BGR 截图
+            known: 当前画面是否为已知界面；None 表示未做已知界面检测
+            hold: 当前处于允许画面静止、没有已知界面的阶段，只重新计时
+        """
+        now = time.monotonic()
+        signature = image[:: self.stride, :: self.stride].astype(np.int16)
+
+        with self._lock:
+            if self.tripped_reason is not None:
+                return self.tripped_reason
+
+            # 距上次喂帧过久视为新一轮等待，重新计时
+            if hold or now - self._last_feed > self.idle_seconds:
+                self._signature = None
+                self._last_change = now
+                self._last_known = now
+
+            if (
+                self._signature is None
+                or self._signature.shape != signature.shape
+                or np.abs(signature - self._signature).mean() > self.diff_threshold
+            ):
+                self._last_change = now
+            self._signature = signature
+            self._last_feed = now
+            if known:
+                self._last_known = now
+
+            if now - self._last_change > self.freeze_seconds:
+                self._trip("frozen", now - self._last_change)
+            elif known is not None and now - self._last_known > self.unknown_seconds:
+                self._trip("unknown", now - self._last_known)
+            return self.tripped_reason
+
+    def is_tripped(self) -> bool:
+        return self.tripped_reason is not None
+
+    def recovered(self) -> float:
+        """恢复子流水线完成时调用，返回并记录从触发到恢复的耗时（秒）。"""
+        with self._lock:
+            if self.tripped_reason is None:
+                return 0.0
+            latency = time.monotonic() - self.tripped_at
+            reason = self.tripped_reason
+            self.recovery_latencies.append(latency)
+            self.tripped_reason = None
+            self._signature = None
+            self._last_feed = 0.0
+
+        logger.info(f"[Watchdog] 已从 {reason} 中恢复，耗时 {latency:.2f}s")
+        return latency
+
+    def _trip(self, reason: str, stalled: float):
+        self.tripped_reason = reason
+        self.tripped_at = time.monotonic()
+        logger.warning(f"[Watchdog] 检测到 {reason}，已停滞 {stalled:.1f}s，触发恢复流程")
+
+
+watchdog = Watchdog()
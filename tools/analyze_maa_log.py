@@ -0,0 +1,304 @@
+"""
+从 MaaFramework 调试日志（Toolkit.init_option 指定目录下的 debug/maa.log）提取节点耗时，不需要额外埋点。
+
+只解析框架的 !!!OnEventNotify!!! 行，流式读取、常数内存，可处理数 GB 的日志：
+- Node.PipelineNode  节点从开始识别 next 列表到动作及延迟结束的总耗时（按命中的节点名统计）
+- Node.NextList      在 next 列表中找到命中项的耗时（含截图循环与 rate_limit 等待）
+- Node.Recognition   单个候选的识别耗时与命中率
+- Node.Action        动作耗时（含 pre_delay / post_delay）
+开始 / 结束按 node_id / task_id / reco_id / action_id 配对，同时在途的条目数量有限；
+分位数用对数分桶直方图近似（相对误差约 12%）。
+
+--timeline <dir> 为每个任务（进程号 + task_id）写一个时间线文件，并按时间把 agent 的 loguru 日志
+（agent/utils/logger.py，debug/custom/*.log，可为轮转后的 .zip）合并进当时正在运行的任务。
+loguru 时间只精确到秒，同一秒内的先后顺序不可靠。
+
+用法:
+    python tools/analyze_maa_log.py debug/maa.log [maa.bak.log ...] [--top 30]
+    python tools/analyze_maa_log.py debug/maa.log --timeline timelines/ --loguru debug/custom/2026-10-19.log
+"""
+
+import argparse
+import heapq
+import io
+import json
+import math
+import time
+import zipfile
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+NOTIFY_MARK = b"!!!OnEventNotify!!!"
+MSG_PREFIX = "[msg="
+DETAILS_PREFIX = "[details="
+
+# 对数分桶：1 ms × 1.25^k，覆盖到约 1 小时
+BUCKET_BASE = 1.25
+BUCKET_COUNT = 70
+
+# 同时打开的时间线文件数
+OPEN_FILES = 32
+
+
+class Stats:
+    """计数 / 命中 / 总和 / 最大值 + 对数分桶直方图，常数内存。"""
+
+    __slots__ = ("count", "hits", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.hits = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, ms: float, hit: bool = True):
+        self.count += 1
+        self.hits += hit
+        self.total += ms
+        self.max = max(self.max, ms)
+        index = 0 if ms <= 1 else min(BUCKET_COUNT - 1, int(math.log(ms, BUCKET_BASE)) + 1)
+        self.buckets[index] += 1
+
+    def percentile(self, p: float) -> float:
+        target = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return min(BUCKET_BASE**index, self.max)
+        return self.max
+
+
+_minute_cache: Dict[str, float] = {}
+
+
+def parse_time(text: str) -> float:
+    """"2026-10-19 17:43:21.657" -> epoch 秒（本地时间）。每分钟只调用一次 mktime。"""
+    minute = text[:16]
+    base = _minute_cache.get(minute)
+    if base is None:
+        if len(_minute_cache) > 1024:
+            _minute_cache.clear()
+        base = _minute_cache[minute] = time.mktime(time.strptime(minute, "%Y-%m-%d %H:%M"))
+    return base + float(text[17:23] or 0)
+
+
+def read_events(paths: List[Path]) -> Iterator[Tuple[float, str, str, dict]]:
+    """流式产出 (时间, 进程号, msg, details)。"""
+    for path in paths:
+        with open(path, "rb") as f:
+            for raw in f:
+                if NOTIFY_MARK not in raw:
+                    continue
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                start = line.find(MSG_PREFIX)
+                details_at = line.find(DETAILS_PREFIX)
+                if start < 0 or details_at < 0 or not line.endswith("]"):
+                    continue
+                msg = line[start + len(MSG_PREFIX) : line.index("]", start)]
+                try:
+                    details = json.loads(line[details_at + len(DETAILS_PREFIX) : -1])
+                except ValueError:
+                    continue
+                pid_at = line.find("[Px")
+                pid = line[pid_at + 3 : line.index("]", pid_at)] if pid_at >= 0 else ""
+                yield parse_time(line[1:24]), pid, msg, details
+
+
+def read_loguru(paths: List[Path]) -> Iterator[Tuple[float, str]]:
+    """流式产出 (时间, 行)，格式见 agent/utils/logger.py；不以时间开头的行（堆栈等）归入上一条。"""
+    for path in paths:
+        if path.suffix == ".zip":
+            with zipfile.ZipFile(path) as archive:
+                for name in archive.namelist():
+                    with archive.open(name) as raw:
+                        yield from _loguru_lines(io.TextIOWrapper(raw, encoding="utf-8", errors="replace"))
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                yield from _loguru_lines(f)
+
+
+def _loguru_lines(f: TextIO) -> Iterator[Tuple[float, str]]:
+    last = 0.0
+    for line in f:
+        line = line.rstrip("\n")
+        if len(line) > 22 and line[4] == "-" and line[19:22] == " | ":
+            last = parse_time(line[:19] + ".000")
+        yield last, line
+
+
+class TimelineWriter:
+    """每个任务一个文件 <进程号>_<task_id>.txt（task_id 在每个进程内从头编号）；只保留最近使用的 OPEN_FILES 个句柄。"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+        self._files: "OrderedDict[Tuple[str, int], TextIO]" = OrderedDict()
+        self._created = set()
+
+    def write(self, task: Tuple[str, int], timestamp: float, text: str):
+        f = self._files.pop(task, None)
+        if f is None:
+            if len(self._files) >= OPEN_FILES:
+                self._files.popitem(last=False)[1].close()
+            mode = "a" if task in self._created else "w"
+            self._created.add(task)
+            f = open(self.directory / f"{task[0]}_{task[1]}.txt", mode, encoding="utf-8")
+        self._files[task] = f
+        clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        f.write(f"{clock}.{int(timestamp * 1000) % 1000:03d}  {text}\n")
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+class Analyzer:
+    def __init__(self, timeline: Optional[TimelineWriter] = None):
+        self.timeline = timeline
+        self.stats: Dict[str, Dict[str, Stats]] = {
+            kind: defaultdict(Stats) for kind in ("node", "next_list", "recognition", "action")
+        }
+        # 在途条目：key -> (开始时间, 名称)
+        self._open: Dict[tuple, Tuple[float, str]] = {}
+        # 正在运行的任务栈 (进程号, task_id)，run_task 子任务嵌套在父任务内
+        self.running: List[Tuple[str, int]] = []
+        self.tasks = 0
+
+    def _begin(self, key: tuple, timestamp: float, name: str):
+        self._open[key] = (timestamp, name)
+
+    def _end(self, key: tuple, timestamp: float) -> Optional[Tuple[float, str]]:
+        started = self._open.pop(key, None)
+        if started is None:
+            return None
+        return (timestamp - started[0]) * 1000, started[1]
+
+    def feed(self, timestamp: float, pid: str, msg: str, details: dict):
+        kind, _, phase = msg.rpartition(".")
+        task_id = details.get("task_id")
+        task = (pid, task_id)
+        name = details.get("name", "")
+        text = None
+
+        if kind == "Tasker.Task":
+            if phase == "Starting":
+                # 被强制结束的进程不会写出任务结束事件，换进程后丢弃它遗留的任务
+                self.running = [item for item in self.running if item[0] == pid]
+                self.running.append(task)
+                self.tasks += 1
+                text = f"task start  {details.get('entry')}"
+            else:
+                if task in self.running:
+                    self.running.remove(task)
+                text = f"task {phase.lower()}  {details.get('entry')}"
+        elif kind == "Node.PipelineNode":
+            key = ("node", details.get("node_id"))
+            if phase == "Starting":
+                self._begin(key, timestamp, name)
+            else:
+                ended = self._end(key, timestamp)
+                executed = (details.get("node_details") or {}).get("name") or name
+                if ended:
+                    self.stats["node"][executed].add(ended[0], phase == "Succeeded")
+                    text = f"node {executed}  {phase.lower()}  {ended[0]:.0f} ms"
+        elif kind == "Node.NextList":
+            key = ("next_list", task_id, name)
+            if phase == "Starting":
+                self._begin(key, timestamp, name)
+                candidates = [item.get("name") for item in details.get("list", [])]
+                text = f"next_list {name} -> {candidates}"
+            else:
+                ended = self._end(key, timestamp)
+                if ended:
+                    self.stats["next_list"][name].add(ended[0], phase == "Succeeded")
+                    text = f"next_list {name}  {phase.lower()}  {ended[0]:.0f} ms"
+        elif kind == "Node.Recognition":
+            key = ("reco", details.get("reco_id"))
+            if phase == "Starting":
+                self._begin(key, timestamp, name)
+            else:
+                ended = self._end(key, timestamp)
+                if ended:
+                    self.stats["recognition"][name].add(ended[0], phase == "Succeeded")
+                    text = f"  reco {name}  {'hit' if phase == 'Succeeded' else 'miss'}  {ended[0]:.0f} ms"
+        elif kind == "Node.Action":
+            key = ("action", details.get("action_id"))
+            if phase == "Starting":
+                self._begin(key, timestamp, name)
+            else:
+                ended = self._end(key, timestamp)
+                if ended:
+                    self.stats["action"][name].add(ended[0], phase == "Succeeded")
+                    action = (details.get("action_details") or {}).get("action", "")
+                    text = f"  action {name} ({action})  {phase.lower()}  {ended[0]:.0f} ms"
+
+        if self.timeline is not None and text is not None and task_id is not None:
+            self.timeline.write(task, timestamp, text)
+
+    def feed_loguru(self, timestamp: float, line: str):
+        if self.timeline is not None and self.running:
+            self.timeline.write(self.running[-1], timestamp, f"  [agent] {line}")
+
+
+def merged(events: Iterator[Tuple[float, str, str, dict]], loguru: Iterator[Tuple[float, str]]):
+    """按时间归并两个有序流；同一时刻框架事件在前。"""
+    framework = ((t, 0, (pid, msg), details) for t, pid, msg, details in events)
+    agent = ((t, 1, line, None) for t, line in loguru)
+    return heapq.merge(framework, agent, key=lambda item: (item[0], item[1]))
+
+
+def print_table(title: str, stats: Dict[str, Stats], top: int):
+    rows = sorted(stats.items(), key=lambda item: -item[1].total)[:top]
+    if not rows:
+        return
+    print(f"\n== {title} ==")
+    print(f"{'name':<36}{'count':>8}{'ok %':>7}{'mean ms':>10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'total s':>10}")
+    for name, s in rows:
+        print(
+            f"{name:<36}{s.count:>8}{s.hits / s.count:>7.0%}{s.total / s.count:>10.1f}"
+            f"{s.percentile(50):>9.0f}{s.percentile(90):>9.0f}{s.percentile(99):>9.0f}{s.max:>9.0f}{s.total / 1000:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从 MaaFramework 调试日志提取节点耗时")
+    parser.add_argument("logs", type=str, nargs="+", help="maa.log，多个文件按时间先后给出")
+    parser.add_argument("--loguru", type=str, nargs="*", default=[], help="agent 的 loguru 日志（可为 .zip）")
+    parser.add_argument("--timeline", type=str, default=None, help="按 task_id 输出时间线的目录")
+    parser.add_argument("--top", type=int, default=30, help="每张表显示的行数（按总耗时排序）")
+    args = parser.parse_args()
+
+    timeline = TimelineWriter(Path(args.timeline)) if args.timeline else None
+    analyzer = Analyzer(timeline)
+    start = time.perf_counter()
+    events = read_events([Path(p) for p in args.logs])
+    loguru = read_loguru([Path(p) for p in args.loguru]) if timeline else iter(())
+    count = 0
+    try:
+        for timestamp, source, payload, details in merged(events, loguru):
+            if source == 0:
+                count += 1
+                analyzer.feed(timestamp, payload[0], payload[1], details)
+            else:
+                analyzer.feed_loguru(timestamp, payload)
+    finally:
+        if timeline is not None:
+            timeline.close()
+
+    elapsed = time.perf_counter() - start
+    size = sum(Path(p).stat().st_size for p in args.logs) / 1024 / 1024
+    print(f"{count} events, {analyzer.tasks} tasks, {size:.1f} MB in {elapsed:.1f}s ({size / max(elapsed, 1e-9):.1f} MB/s)")
+    print_table("节点总耗时 (PipelineNode)", analyzer.stats["node"], args.top)
+    print_table("查找下一节点 (NextList)", analyzer.stats["next_list"], args.top)
+    print_table("识别 (Recognition)", analyzer.stats["recognition"], args.top)
+    print_table("动作 (Action，含延迟)", analyzer.stats["action"], args.top)
+    if timeline is not None:
+        print(f"\ntimelines written to {args.timeline}")
+
+
+if __name__ == "__main__":
+    main()
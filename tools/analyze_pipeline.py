@@ -0,0 +1,349 @@
+"""
+Pipeline 静态分析工具。
+
+加载 assets/resource/base/pipeline 下所有 JSON，并叠加自定义动作在运行时注入的
+pipeline_override 与 run_task 调用，构建节点图后输出（自定义识别 / 动作参数中出现的节点名，
+如 WatchdogCheck 的 known，记为引用：计入可达性，不参与跳转与延迟预算）：
+- 引用了不存在节点的 next / on_error
+- 从任何入口都无法到达的节点
+- 环（含自环）及每转一圈的固定延迟
+- 每个入口到终止节点的最好 / 最坏固定延迟预算（pre_delay + post_delay + timeout）
+
+用法:
+    python tools/analyze_pipeline.py [--override tuned.json ...] [--json]
+"""
+
+import argparse
+import heapq
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+
+from utils import assets_dir, load_jsonc, load_pipeline, pipeline_dir  # type: ignore
+
+# MaaFramework 节点字段默认值（见 deps/tools/pipeline.schema.json）
+DEFAULT_PRE_DELAY = 200
+DEFAULT_POST_DELAY = 200
+DEFAULT_RATE_LIMIT = 1000
+DEFAULT_TIMEOUT = 20000
+
+# 自定义动作在运行时通过 context.run_task 调用的子任务
+RUNTIME_CALLS: Dict[str, List[str]] = {
+    "MapCleanup": ["MapJobCommon"],
+    "FarmAllMaps": ["MapJobCommon", "FreeDungeonSwitchMap"],
+}
+
+# 这些入口的预编译变体（<entry>_<map>[_<job>]）同样由自定义动作调用
+RUNTIME_VARIANT_BASES = ["MapJobCommon", "FreeDungeonSwitchMap"]
+
+# MapCleanup._run_one_job 在每个职业前注入的 pipeline_override（取第一个地图 / 职业作代表）
+RUNTIME_OVERRIDES: Dict[str, dict] = {
+    "RecognizeJobCharacter": {
+        "action": {
+            "type": "Custom",
+            "param": {
+                "custom_action": "SelectJob",
+                "custom_action_param": {"job": "warrior"},
+            },
+        }
+    },
+    "SelectMapByParam": {
+        "action": {
+            "type": "Custom",
+            "param": {
+                "custom_action": "SelectMap",
+                "custom_action_param": {"map": "EastContinent"},
+            },
+        }
+    },
+}
+
+
+def apply_override(pipeline: Dict[str, dict], override: Dict[str, dict]):
+    for name, fields in override.items():
+        pipeline.setdefault(name, {}).update(fields)
+
+
+def parse_target(item) -> str:
+    """解析 next 列表项，兼容 "[JumpBack]Name" 前缀和 {"name": ...} 写法。"""
+    if isinstance(item, dict):
+        return item.get("name", "")
+    name = str(item)
+    while name.startswith("["):
+        name = name[name.index("]") + 1 :]
+    return name
+
+
+def custom_params(node: dict) -> list:
+    """节点的 custom_recognition_param / custom_action_param，兼容 v1 平铺与 v2 嵌套写法。"""
+    params = [node.get("custom_recognition_param"), node.get("custom_action_param")]
+    for key, field in (("recognition", "custom_recognition_param"), ("action", "custom_action_param")):
+        value = node.get(key)
+        if isinstance(value, dict):
+            params.append(value.get("param", {}).get(field))
+    return [param for param in params if param is not None]
+
+
+def referenced_names(value, names: Set[str]) -> List[str]:
+    """参数中所有等于某个节点名的字符串。"""
+    if isinstance(value, str):
+        return [value] if value in names else []
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [name for item in value for name in referenced_names(item, names)]
+    return []
+
+
+def custom_action_name(node: dict) -> Optional[str]:
+    action = node.get("action")
+    if isinstance(action, dict) and action.get("type") == "Custom":
+        return action.get("param", {}).get("custom_action")
+    return node.get("custom_action")
+
+
+class PipelineGraph:
+    def __init__(self, pipeline: Dict[str, dict]):
+        self.pipeline = pipeline
+        # name -> [(target, kind)]，kind 为 next / on_error / call / ref
+        self.edges: Dict[str, List[Tuple[str, str]]] = {}
+        names = set(pipeline)
+        for name, node in pipeline.items():
+            edges = []
+            for kind in ("next", "interrupt", "on_error"):
+                targets = node.get(kind, [])
+                if isinstance(targets, (str, dict)):
+                    targets = [targets]
+                edges += [(parse_target(t), "on_error" if kind == "on_error" else "next") for t in targets]
+            edges += [(t, "call") for t in RUNTIME_CALLS.get(custom_action_name(node) or "", [])]
+            refs = [t for param in custom_params(node) for t in referenced_names(param, names)]
+            edges += [(t, "ref") for t in dict.fromkeys(refs) if t != name]
+            self.edges[name] = edges
+
+    def field(self, name: str, key: str, default: int) -> int:
+        return self.pipeline.get(name, {}).get(key, default)
+
+    def edge_cost(self, name: str, kind: str) -> Tuple[int, int]:
+        """离开节点 name 的一次转移的 (最好, 最坏) 固定延迟，毫秒。"""
+        base = self.field(name, "pre_delay", DEFAULT_PRE_DELAY) + self.field(
+            name, "post_delay", DEFAULT_POST_DELAY
+        )
+        timeout = self.field(name, "timeout", DEFAULT_TIMEOUT)
+        if kind in ("call", "ref"):
+            return 0, 0
+        if kind == "on_error":
+            return base + timeout, base + timeout
+        return base, base + timeout
+
+    def dangling(self) -> List[Tuple[str, str]]:
+        return [
+            (name, target)
+            for name, edges in self.edges.items()
+            for target, _ in edges
+            if target not in self.pipeline
+        ]
+
+    def reachable(self, entries: List[str]) -> Set[str]:
+        seen: Set[str] = set()
+        stack = [e for e in entries if e in self.pipeline]
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            stack += [t for t, _ in self.edges.get(name, []) if t in self.pipeline]
+        return seen
+
+    def cycles(self) -> List[List[str]]:
+        """枚举所有基本环（含自环），每个环以其中顺序最靠前的节点开头。"""
+        order = {name: i for i, name in enumerate(self.pipeline)}
+        result: List[List[str]] = []
+
+        def walk(start: str, name: str, path: List[str]):
+            for target, kind in self.edges.get(name, []):
+                if kind in ("call", "ref") or target not in order or order[target] < order[start]:
+                    continue
+                if target == start:
+                    result.append(list(path))
+                elif target not in path:
+                    path.append(target)
+                    walk(start, target, path)
+                    path.pop()
+
+        for name in self.pipeline:
+            walk(name, name, [name])
+        return result
+
+    def cycle_cost(self, cycle: List[str]) -> Tuple[int, int]:
+        """环转一圈的 (最好, 最坏) 固定延迟，毫秒。同一对节点有多条边时取对应最值。"""
+        best = worst = 0
+        for i, name in enumerate(cycle):
+            target = cycle[(i + 1) % len(cycle)]
+            costs = [self.edge_cost(name, kind) for t, kind in self.edges[name] if t == target]
+            best += min(c[0] for c in costs)
+            worst += max(c[1] for c in costs)
+        return best, worst
+
+    def is_terminal(self, name: str) -> bool:
+        return not any(kind in ("next", "on_error") for _, kind in self.edges.get(name, []))
+
+    def best_case(self, entry: str) -> Tuple[int, List[str]]:
+        """Dijkstra：到任意终止节点的最短固定延迟路径。"""
+        queue = [(0, entry, [entry])]
+        done: Set[str] = set()
+        while queue:
+            cost, name, path = heapq.heappop(queue)
+            if name in done:
+                continue
+            done.add(name)
+            if self.is_terminal(name):
+                return cost + self.call_cost(name, best=True), path
+            cost += self.call_cost(name, best=True)
+            for target, kind in self.edges.get(name, []):
+                if kind in ("call", "ref") or target not in self.pipeline:
+                    continue
+                heapq.heappush(queue, (cost + self.edge_cost(name, kind)[0], target, path + [target]))
+        return -1, []
+
+    def worst_case(self, entry: str) -> Tuple[int, List[str]]:
+        """枚举简单路径：到任意终止节点的最长固定延迟路径（环只走一次）。"""
+        best: Tuple[int, List[str]] = (-1, [])
+
+        def walk(name: str, cost: int, path: List[str]):
+            nonlocal best
+            cost += self.call_cost(name, best=False)
+            if self.is_terminal(name):
+                if cost > best[0]:
+                    best = (cost, list(path))
+                return
+            for target, kind in self.edges.get(name, []):
+                if kind in ("call", "ref") or target not in self.pipeline or target in path:
+                    continue
+                path.append(target)
+                walk(target, cost + self.edge_cost(name, kind)[1], path)
+                path.pop()
+
+        walk(entry, 0, [entry])
+        return best
+
+    def call_cost(self, name: str, best: bool) -> int:
+        """自定义动作内部 run_task 调用的子任务预算（每次调用计一次）。"""
+        total = 0
+        for target, kind in self.edges.get(name, []):
+            if kind == "call" and target in self.pipeline and target != name:
+                cost, _ = self.best_case(target) if best else self.worst_case(target)
+                total += max(cost, 0)
+        return total
+
+
+def find_entries(pipeline: Dict[str, dict]) -> List[str]:
+    entries = []
+    interface_path = assets_dir / "interface.json"
+    if interface_path.exists():
+        entries += [task["entry"] for task in load_jsonc(interface_path).get("task", [])]
+    for targets in RUNTIME_CALLS.values():
+        entries += targets
+    return [e for e in dict.fromkeys(entries) if e in pipeline]
+
+
+def analyze(pipeline: Dict[str, dict]) -> dict:
+    graph = PipelineGraph(pipeline)
+    entries = find_entries(pipeline)
+    # tools/generate_variants.py 预编译的入口由自定义动作在运行时直接调用
+    variant_entries = [
+        name for name in pipeline if any(name.startswith(f"{base}_") for base in RUNTIME_VARIANT_BASES)
+    ]
+    reachable = graph.reachable(entries + variant_entries)
+
+    budgets = {}
+    for entry in entries:
+        best, best_path = graph.best_case(entry)
+        worst, worst_path = graph.worst_case(entry)
+        budgets[entry] = {
+            "best_ms": best,
+            "best_path": best_path,
+            "worst_ms": worst,
+            "worst_path": worst_path,
+        }
+
+    return {
+        "entries": entries,
+        "dangling": graph.dangling(),
+        "unreachable": sorted(name for name in pipeline if name not in reachable),
+        "cycles": [
+            {"nodes": cycle, "best_ms": cost[0], "worst_ms": cost[1]}
+            for cycle, cost in ((c, graph.cycle_cost(c)) for c in graph.cycles())
+        ],
+        "budgets": budgets,
+        "delay_nodes": sorted(
+            (
+                (
+                    name,
+                    graph.field(name, "post_delay", DEFAULT_POST_DELAY),
+                    graph.field(name, "rate_limit", DEFAULT_RATE_LIMIT),
+                    graph.field(name, "timeout", DEFAULT_TIMEOUT),
+                )
+                for name in pipeline
+            ),
+            key=lambda item: -(item[1] + item[3]),
+        ),
+    }
+
+
+def print_report(report: dict):
+    print(f"入口: {', '.join(report['entries'])}")
+
+    print("\n== 不存在的引用 ==")
+    for name, target in report["dangling"] or [("-", "-")]:
+        print(f"  {name} -> {target}")
+
+    print("\n== 不可达节点 ==")
+    for name in report["unreachable"] or ["-"]:
+        print(f"  {name}")
+
+    print("\n== 环（每圈固定延迟，秒）==")
+    for cycle in sorted(report["cycles"], key=lambda c: -c["worst_ms"]):
+        print(f"  {cycle['best_ms'] / 1000:>8.1f}{cycle['worst_ms'] / 1000:>10.1f}  {' -> '.join(cycle['nodes'])}")
+
+    print("\n== 入口固定延迟预算（秒，环只走一次，run_task 子任务按单次调用计）==")
+    print(f"  {'entry':<24}{'best':>10}{'worst':>12}")
+    for entry, budget in report["budgets"].items():
+        print(f"  {entry:<24}{budget['best_ms'] / 1000:>10.1f}{budget['worst_ms'] / 1000:>12.1f}")
+        print(f"    worst path: {' -> '.join(budget['worst_path'])}")
+
+    print("\n== 延迟最重的节点（ms）==")
+    print(f"  {'node':<24}{'post_delay':>12}{'rate_limit':>12}{'timeout':>10}")
+    for name, post_delay, rate_limit, timeout in report["delay_nodes"][:10]:
+        print(f"  {name:<24}{post_delay:>12}{rate_limit:>12}{timeout:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline 静态分析")
+    parser.add_argument("--pipeline_dir", type=str, default=str(pipeline_dir))
+    parser.add_argument(
+        "--override", type=str, action="append", default=[], help="额外叠加的 pipeline_override 文件"
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    parser.add_argument("--strict", action="store_true", help="存在不存在的引用时返回非零")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(Path(args.pipeline_dir))
+    apply_override(pipeline, RUNTIME_OVERRIDES)
+    for file in args.override:
+        apply_override(pipeline, load_jsonc(Path(file)))
+
+    report = analyze(pipeline)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=4))
+    else:
+        print_report(report)
+
+    if args.strict and report["dangling"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+对比 MapCleanup 两种分发方式的开销：
+- override：每个职业构造 pipeline_override，序列化后交给框架合并，再 run_task("MapJobCommon")
+- variant：直接 run_task("MapJobCommon_<map>_<job>")（tools/generate_variants.py 预编译）
+
+Python 侧总是可测；安装了 maafw 时额外测量框架侧 Resource.override_pipeline
+合并 override 与查找预编译节点的耗时。
+
+用法:
+    python tools/bench_dispatch.py [--iterations 2000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+
+from generate_variants import collect_jobs, collect_maps, generate_variants  # type: ignore
+from utils import assets_dir, load_jsonc, load_pipeline, pipeline_dir  # type: ignore
+
+
+def build_override(map_name: str, job_name: str) -> dict:
+    """与 MapCleanup._run_one_job 注入的 override 相同。"""
+    return {
+        "RecognizeJobCharacter": {
+            "action": {
+                "type": "Custom",
+                "param": {
+                    "custom_action": "SelectJob",
+                    "custom_action_param": {"job": job_name},
+                },
+            }
+        },
+        "SelectMapByParam": {
+            "action": {
+                "type": "Custom",
+                "param": {
+                    "custom_action": "SelectMap",
+                    "custom_action_param": {"map": map_name},
+                },
+            }
+        },
+    }
+
+
+def bench(name: str, func: Callable[[str, str], object], pairs, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(*pairs[i % len(pairs)])
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"  {name:<40}{per_call:>10.2f} us/dispatch")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MapCleanup 分发开销基准")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(pipeline_dir)
+    interface = load_jsonc(assets_dir / "interface.json")
+    maps = collect_maps(pipeline, interface)
+    jobs = collect_jobs(interface)
+    pairs = [(m, j) for m in maps for j in jobs]
+    variants = generate_variants(pipeline, maps, jobs)
+
+    print(f"{len(pairs)} map/job pairs, {args.iterations} iterations")
+    print("Python 侧（构造参数 + 序列化，即跨 IPC 的负载）:")
+    override_us = bench(
+        "override dict + json.dumps",
+        lambda m, j: json.dumps(build_override(m, j), ensure_ascii=False),
+        pairs,
+        args.iterations,
+    )
+    variant_us = bench(
+        "variant entry name",
+        lambda m, j: f"MapJobCommon_{m}_{j}",
+        pairs,
+        args.iterations,
+    )
+    print(f"  payload: {len(json.dumps(build_override(*pairs[0])))} bytes vs {len(f'MapJobCommon_{pairs[0][0]}_{pairs[0][1]}')} bytes")
+
+    try:
+        from maa.resource import Resource
+    except ImportError:
+        print("未安装 maafw，跳过框架侧测量")
+        return
+
+    resource = Resource()
+    resource.post_bundle(assets_dir / "resource" / "base").wait()
+    resource.override_pipeline(variants)
+
+    print("框架侧:")
+    override_fw_us = bench(
+        "Resource.override_pipeline",
+        lambda m, j: resource.override_pipeline(build_override(m, j)),
+        pairs,
+        args.iterations,
+    )
+    variant_fw_us = bench(
+        "Resource.get_node_data(variant)",
+        lambda m, j: resource.get_node_data(f"MapJobCommon_{m}_{j}"),
+        pairs,
+        args.iterations,
+    )
+    print(
+        f"合计: override {override_us + override_fw_us:.2f} us vs variant {variant_us + variant_fw_us:.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+单帧多目标识别（agent/utils/frame_targets.py，自定义识别 FrameTargets）基准。
+
+对 pipeline 中每个 FrameTargets 目标组：
+- 逐个节点用框架识别（Tasker.post_recognition）各自完整处理同一帧的总耗时
+- 整组目标在一次共享预处理上求值的耗时
+- 两者的命中是否一致、命中框左上角的最大偏移
+
+帧来源同 bench_resolution.py：--session 会话录制、--images PNG 目录，都不提供时合成一帧。
+
+用法:
+    python tools/bench_frame_targets.py [--session x.mysr | --images dir]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.frame_targets import FrameFeatures, evaluate, target_key  # type: ignore
+from bench_resolution import builtin_recognition, load_frames, make_tasker  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+# 与 agent/custom/reco/frame_targets.py 的 OPTION_KEYS 一致
+OPTION_KEYS = ("group", "window", "max_age", "latency_critical")
+
+
+def frame_targets_param(node: dict) -> Optional[dict]:
+    """FrameTargets 节点的 custom_recognition_param（v1 平铺或 v2 嵌套写法），其他节点返回 None。"""
+    recognition = node.get("recognition")
+    fields = (recognition.get("param") or {}) if isinstance(recognition, dict) else node
+    if fields.get("custom_recognition") != "FrameTargets":
+        return None
+    return fields.get("custom_recognition_param") or {}
+
+
+def collect_groups(pipeline: dict) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for name, node in pipeline.items():
+        param = frame_targets_param(node)
+        if param and "group" in param:
+            groups.setdefault(param["group"], []).append(name)
+    return groups
+
+
+def node_target(node: dict) -> dict:
+    return {k: v for k, v in (frame_targets_param(node) or {}).items() if k not in OPTION_KEYS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单帧多目标识别基准")
+    parser.add_argument("--session", type=str, default=None)
+    parser.add_argument("--images", type=str, default=None)
+    parser.add_argument("--max_frames", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base_dir = assets_dir / "resource" / "base"
+    pipeline = load_pipeline(base_dir / "pipeline")
+    groups = collect_groups(pipeline)
+    frames = load_frames(args)
+    tasker, resource, _ = make_tasker([base_dir])
+    print(f"{len(frames)} frames, shape {frames[0].shape}")
+
+    # 模板路径相对资源目录，与 agent 运行时一致
+    os.chdir(assets_dir)
+
+    for group, names in groups.items():
+        targets = {name: node_target(pipeline[name]) for name in names}
+        unique = list({target_key(t): t for t in targets.values()}.values())
+
+        framework_time = shared_time = 0.0
+        mismatched, max_offset = 0, 0
+        for _ in range(args.repeat):
+            for frame in frames:
+                framework = {}
+                start = time.perf_counter()
+                for name in names:
+                    reco_type, param = builtin_recognition(resource, name)
+                    detail = tasker.post_recognition(reco_type, param, frame).wait().get()
+                    reco = detail.nodes[0].recognition if detail and detail.nodes else None
+                    framework[name] = reco if reco and reco.hit else None
+                framework_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                results = evaluate(FrameFeatures(frame), unique)
+                shared_time += time.perf_counter() - start
+
+                for name, target in targets.items():
+                    hit, box, _ = results[target_key(target)]
+                    if hit != (framework[name] is not None):
+                        mismatched += 1
+                    elif hit:
+                        expected = framework[name].box
+                        max_offset = max(max_offset, abs(expected[0] - box[0]), abs(expected[1] - box[1]))
+
+        n = args.repeat * len(frames)
+        print(f"group {group}: {len(names)} nodes, {len(unique)} distinct targets")
+        print(f"  mismatched hits: {mismatched}, max box offset: {max_offset} px")
+        print(f"  per-node framework recognition: {framework_time / n * 1000:.2f} ms/frame")
+        print(f"  shared single pass:             {shared_time / n * 1000:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+主机 CPU 预算（agent/utils/governor.py）的多开容量基准。
+
+启动 N 个进程模拟 N 个多开实例，每个实例循环：战斗 --battle_seconds（±10%）期间持续轮询
+「截图 -> 识别 FreeDungeon 组目标」（同 WaitBattleEnd 的预取轮询），战斗结束帧出现礼包图标后
+记录检测延迟（结束到识别命中），再空闲 --idle_seconds（返回地图、进副本等导航）开始下一场。
+截图在本机的开销用 --capture_ms 的 CPU 忙等模拟（模拟器编码 / 传输）。
+
+对每个 N 分别跑不加限流与启用 governor 两种模式：后者所有实例共享 --budget 核的令牌桶，
+接近预计结束时刻（平均战斗时长的 80%，同 FrameTargets 的 latency_critical）的轮询优先。
+输出每种模式的每实例轮询频率、检测延迟 p50 / p95 与 CPU 利用率，
+以及检测延迟 p95 不超过 --sla 秒时每核最多容纳的实例数。
+
+用法:
+    python tools/bench_governor.py [--instances 1 2 4 8] [--seconds 30] [--budget 1]
+        [--battle_seconds 5] [--capture_ms 15] [--sla 1.0]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils import governor as governor_module  # type: ignore
+from agent.utils.frame_targets import FrameFeatures, evaluate, target_key  # type: ignore
+from bench_frame_targets import collect_groups, node_target  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+# 同 agent/custom/reco/frame_targets.py
+PRIORITY_FRACTION = 0.8
+
+
+def make_frames():
+    """返回 (战斗中的帧, 战斗结束出现礼包图标的帧)。"""
+    rng = np.random.default_rng(0)
+    battle = rng.integers(0, 60, (1280, 720, 3), dtype=np.uint8)
+    gift = np.asarray(Image.open(assets_dir / "resource" / "base" / "image" / "gift.png").convert("RGB"))[:, :, ::-1]
+    result = battle.copy()
+    result[40 : 40 + gift.shape[0], 600 : 600 + gift.shape[1]] = gift
+    return battle, result
+
+
+def burn(seconds: float):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def instance(index: int, args, targets: List[dict], governed: bool, shm_name: str, results):
+    os.chdir(assets_dir)
+    governor = governor_module.governor
+    if governed:
+        governor_module.SHM_NAME = shm_name
+        governor_module.LOCK_PATH = f"{governor_module.LOCK_PATH}.{shm_name}"
+        governor.configure(args.budget)
+    gift_key = target_key(next(t for t in targets if t.get("template") == "gift.png"))
+    battle_frame, result_frame = make_frames()
+    evaluate(FrameFeatures(result_frame), targets)  # 预热模板缓存
+
+    rng = random.Random(index)
+    # 错开各实例的战斗相位
+    time.sleep(rng.uniform(0, args.battle_seconds))
+    latencies: List[float] = []
+    polls = 0
+    expected = None
+    deadline = time.monotonic() + args.seconds
+    cpu_start = time.process_time()
+    while time.monotonic() < deadline:
+        duration = args.battle_seconds * rng.uniform(0.9, 1.1)
+        start = time.monotonic()
+        end = start + duration
+        while time.monotonic() < deadline:
+            priority = expected is not None and time.monotonic() - start >= PRIORITY_FRACTION * expected
+            with governor.acquire("screencap", priority):
+                burn(args.capture_ms / 1000)
+                frame = result_frame if time.monotonic() >= end else battle_frame
+            with governor.acquire("recognition", priority):
+                hit = evaluate(FrameFeatures(frame), targets)[gift_key][0]
+            polls += 1
+            if hit:
+                latencies.append(time.monotonic() - end)
+                expected = duration if expected is None else expected + 0.3 * (duration - expected)
+                break
+        time.sleep(args.idle_seconds)
+    results.put((latencies, polls, time.process_time() - cpu_start))
+    governor.release()
+
+
+def run(count: int, args, targets: List[dict], governed: bool) -> dict:
+    shm_name = f"maa_ysjyz_governor_bench_{os.getpid()}_{count}"
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=instance, args=(i, args, targets, governed, shm_name, results))
+        for i in range(count)
+    ]
+    wall = time.monotonic()
+    for worker in workers:
+        worker.start()
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    wall = time.monotonic() - wall
+    if governed:
+        from multiprocessing import shared_memory
+
+        try:
+            shared_memory.SharedMemory(shm_name).unlink()
+            os.remove(f"{governor_module.LOCK_PATH}.{shm_name}")
+        except FileNotFoundError:
+            pass
+
+    latencies = np.array([x for c in collected for x in c[0]] or [np.inf])
+    return {
+        "polls_per_second": sum(c[1] for c in collected) / count / args.seconds,
+        "battles": sum(len(c[0]) for c in collected),
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "cpu": sum(c[2] for c in collected) / wall / (os.cpu_count() or 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主机 CPU 预算多开容量基准")
+    parser.add_argument("--instances", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--budget", type=float, default=None, help="governor 的整机核数，默认 CPU 核数")
+    parser.add_argument("--battle_seconds", type=float, default=5)
+    parser.add_argument("--idle_seconds", type=float, default=2)
+    parser.add_argument("--capture_ms", type=float, default=15)
+    parser.add_argument("--sla", type=float, default=1.0, help="检测延迟 p95 上限（秒）")
+    parser.add_argument("--group", type=str, default="FreeDungeon")
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    args.budget = args.budget or float(cores)
+
+    pipeline = load_pipeline(assets_dir / "resource" / "base" / "pipeline")
+    names = collect_groups(pipeline).get(args.group, [])
+    targets = list({target_key(t): t for t in (node_target(pipeline[n]) for n in names)}.values())
+    if not any(t.get("template") == "gift.png" for t in targets):
+        print(f"目标组 {args.group} 中没有礼包图标目标")
+        return
+
+    print(f"{cores} cores, governor budget {args.budget:g}, battle {args.battle_seconds:g}s, sla p95 <= {args.sla:g}s")
+    print(f"{'instances':>9}  {'mode':<9}{'polls/s':>9}{'battles':>9}{'p50 s':>8}{'p95 s':>8}{'cpu':>7}")
+    fits = {False: 0, True: 0}
+    for count in args.instances:
+        for governed in (False, True):
+            result = run(count, args, targets, governed)
+            if result["p95"] <= args.sla:
+                fits[governed] = max(fits[governed], count)
+            print(
+                f"{count:>9}  {'governor' if governed else 'free':<9}{result['polls_per_second']:>9.1f}"
+                f"{result['battles']:>9}{result['p50']:>8.2f}{result['p95']:>8.2f}{result['cpu']:>7.0%}"
+            )
+    for governed in (False, True):
+        print(
+            f"{'governor' if governed else 'free'}: up to {fits[governed]} instances "
+            f"({fits[governed] / cores:.1f} per core) within sla"
+        )
+
+
+if __name__ == "__main__":
+    main()
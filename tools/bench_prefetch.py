@@ -0,0 +1,96 @@
+"""
+预取截图（agent/utils/prefetch.py）在回放中的轮询频率收益。
+
+用录制的帧模拟控制器：每次截图耗时 --capture_ms 后按顺序返回下一帧。
+对 FreeDungeon 组目标（见 single_battle.json）分别跑：
+- 串行轮询：截图 -> 识别 -> 截图 ...
+- 预取轮询：后台线程连续截图，识别线程始终取最新的新帧
+
+输出两者每秒轮询次数与预取模式下识别开始时的平均 / 最大帧龄。
+
+帧来源同 bench_resolution.py：--session 会话录制、--images PNG 目录，都不提供时合成一帧。
+
+用法:
+    python tools/bench_prefetch.py [--session x.mysr | --images dir] [--capture_ms 120] [--seconds 5]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.frame_targets import FrameFeatures, evaluate, target_key  # type: ignore
+from agent.utils.prefetch import FramePrefetcher  # type: ignore
+from bench_frame_targets import collect_groups, node_target  # type: ignore
+from bench_resolution import load_frames  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预取截图轮询频率基准")
+    parser.add_argument("--session", type=str, default=None)
+    parser.add_argument("--images", type=str, default=None)
+    parser.add_argument("--max_frames", type=int, default=50)
+    parser.add_argument("--capture_ms", type=float, default=120)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--group", type=str, default="FreeDungeon")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(assets_dir / "resource" / "base" / "pipeline")
+    names = collect_groups(pipeline).get(args.group, [])
+    targets = list({target_key(t): t for t in (node_target(pipeline[n]) for n in names)}.values())
+    if not targets:
+        print(f"没有找到目标组 {args.group}")
+        return
+
+    frames = load_frames(args)
+    # 模板路径相对资源目录，与 agent 运行时一致
+    os.chdir(assets_dir)
+    evaluate(FrameFeatures(frames[0]), targets)  # 预热模板缓存
+
+    source = itertools.cycle(frames)
+
+    def capture():
+        time.sleep(args.capture_ms / 1000)
+        return next(source)
+
+    print(f"{len(frames)} frames, {len(targets)} targets, capture {args.capture_ms:.0f} ms")
+
+    # 串行
+    loops, start = 0, time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        evaluate(FrameFeatures(capture()), targets)
+        loops += 1
+    serial = loops / (time.perf_counter() - start)
+
+    # 预取
+    prefetcher = FramePrefetcher(capture)
+    prefetcher.start()
+    loops, seq, ages = 0, 0, []
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < args.seconds:
+            frame = prefetcher.next(seq, timeout=1.0)
+            if frame is None:
+                break
+            seq = frame.seq
+            ages.append(frame.age)
+            evaluate(FrameFeatures(frame.image), targets)
+            loops += 1
+    finally:
+        prefetcher.stop()
+    prefetched = loops / (time.perf_counter() - start)
+
+    print(f"serial:     {serial:.2f} loops/s")
+    print(f"prefetched: {prefetched:.2f} loops/s ({prefetched / serial:.2f}x)")
+    if ages:
+        print(f"frame age at recognition: mean {sum(ages) / len(ages) * 1000:.1f} ms, max {max(ages) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
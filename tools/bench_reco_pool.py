@@ -0,0 +1,137 @@
+"""
+识别工作进程池（agent/utils/reco_pool.py）与本进程识别的延迟、吞吐对比。
+
+对 FreeDungeon 组目标（见 single_battle.json）分别跑：
+- 延迟：单个调用方逐帧识别，每次识别的中位数 / p95 耗时
+- 吞吐：--callers 个线程同时识别（对应 AgentServer 并发回调），每秒完成的识别次数
+
+--gil_noise 个线程同时执行纯 Python 循环，模拟 AgentServer 线程、日志等与识别争用 GIL 的负载。
+进程池模式依次测 --workers 中的每个进程数。
+
+帧来源同 bench_resolution.py：--session 会话录制、--images PNG 目录，都不提供时合成一帧。
+
+用法:
+    python tools/bench_reco_pool.py [--session x.mysr | --images dir] [--workers 1 2 4]
+        [--callers 4] [--gil_noise 2] [--seconds 5]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.frame_targets import FrameFeatures, evaluate, target_key  # type: ignore
+from agent.utils.reco_pool import RecognitionPool  # type: ignore
+from bench_frame_targets import collect_groups, node_target  # type: ignore
+from bench_resolution import load_frames  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+
+def gil_noise(stop: threading.Event):
+    counter = 0
+    while not stop.is_set():
+        for i in range(1000):
+            counter += i
+
+
+def measure(recognize: Callable, frames: List[np.ndarray], args) -> dict:
+    stop = threading.Event()
+    noise = [threading.Thread(target=gil_noise, args=(stop,), daemon=True) for _ in range(args.gil_noise)]
+    for thread in noise:
+        thread.start()
+    try:
+        source = itertools.cycle(frames)
+        for frame in frames[:3]:
+            recognize(frame)  # 预热模板缓存
+        latencies = []
+        for _ in range(args.latency_runs):
+            frame = next(source)
+            start = time.perf_counter()
+            recognize(frame)
+            latencies.append(time.perf_counter() - start)
+
+        counts = [0] * args.callers
+        deadline = time.perf_counter() + args.seconds
+
+        def caller(index: int):
+            frames_iter = itertools.cycle(frames[index:] + frames[:index])
+            while time.perf_counter() < deadline:
+                recognize(next(frames_iter))
+                counts[index] += 1
+
+        callers = [threading.Thread(target=caller, args=(i,)) for i in range(args.callers)]
+        for thread in callers:
+            thread.start()
+        for thread in callers:
+            thread.join()
+    finally:
+        stop.set()
+        for thread in noise:
+            thread.join()
+    return {
+        "p50": float(np.percentile(latencies, 50)) * 1000,
+        "p95": float(np.percentile(latencies, 95)) * 1000,
+        "throughput": sum(counts) / args.seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="识别工作进程池基准")
+    parser.add_argument("--session", type=str, default=None)
+    parser.add_argument("--images", type=str, default=None)
+    parser.add_argument("--max_frames", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--callers", type=int, default=4)
+    parser.add_argument("--gil_noise", type=int, default=2)
+    parser.add_argument("--latency_runs", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--group", type=str, default="FreeDungeon")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(assets_dir / "resource" / "base" / "pipeline")
+    names = collect_groups(pipeline).get(args.group, [])
+    targets = list({target_key(t): t for t in (node_target(pipeline[n]) for n in names)}.values())
+    if not targets:
+        print(f"没有找到目标组 {args.group}")
+        return
+
+    frames = load_frames(args)
+    # 模板路径相对资源目录，与 agent 运行时一致
+    os.chdir(assets_dir)
+    print(
+        f"{os.cpu_count()} cores, {len(frames)} frames {frames[0].shape}, {len(targets)} targets, "
+        f"{args.callers} callers, {args.gil_noise} GIL noise threads"
+    )
+    print(f"{'mode':<14}{'p50 ms':>9}{'p95 ms':>9}{'reco/s':>9}")
+
+    result = measure(lambda frame: evaluate(FrameFeatures(frame), targets), frames, args)
+    baseline = result["throughput"]
+    print(f"{'in-process':<14}{result['p50']:>9.1f}{result['p95']:>9.1f}{result['throughput']:>9.1f}")
+
+    for workers in args.workers:
+        pool = RecognitionPool()
+        pool.start(workers)
+        if not pool.enabled:
+            print(f"进程池启动失败（{workers} 个进程）")
+            continue
+        try:
+            result = measure(lambda frame: pool.run("frame_targets", frame, targets), frames, args)
+        finally:
+            pool.stop()
+        print(
+            f"{f'pool x{workers}':<14}{result['p50']:>9.1f}{result['p95']:>9.1f}{result['throughput']:>9.1f}"
+            f"  ({result['throughput'] / max(baseline, 1e-9):.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
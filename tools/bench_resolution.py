@@ -0,0 +1,171 @@
+"""
+对比不同截图短边下的单帧开销。
+
+对每个短边（默认 720 / 540 / 480 / 360）：
+- 原始帧字节数与 PNG 编码耗时（近似截图传输开销）
+- 用对应分辨率的资源（720 为 base，其余为 tools/generate_lowres.py 生成的覆盖包）
+  通过 Tasker.post_recognition 执行 FindFreeDungeon（框架 ColorMatch）与 WaitBattleEnd（框架 TemplateMatch）的耗时
+
+帧来源：--session 会话录制、--images PNG 目录，都不提供时合成一帧。
+
+用法:
+    python tools/bench_resolution.py [--session x.mysr | --images dir] [--sides 720 540 480 360]
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from generate_lowres import generate_lowres  # type: ignore
+from utils import assets_dir  # type: ignore
+
+BENCH_NODES = ["FindFreeDungeon", "WaitBattleEnd"]
+
+
+def load_frames(args) -> List[np.ndarray]:
+    """返回 BGR 帧列表。"""
+    if args.session:
+        from agent.utils.session import SessionReader  # type: ignore
+
+        with SessionReader(Path(args.session)) as reader:
+            step = max(1, reader.frame_count // args.max_frames)
+            return [reader.frame(i) for i in range(0, reader.frame_count, step)][: args.max_frames]
+    if args.images:
+        files = sorted(Path(args.images).glob("*.png"))[: args.max_frames]
+        return [np.asarray(Image.open(f).convert("RGB"))[:, :, ::-1].copy() for f in files]
+
+    # 合成帧：背景噪声 + 绿色标记 + 礼包图标
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 60, (1280, 720, 3), dtype=np.uint8)
+    frame[600:612, 300:312] = (123, 219, 57)  # BGR
+    gift = np.asarray(Image.open(assets_dir / "resource" / "base" / "image" / "gift.png").convert("RGB"))[:, :, ::-1]
+    frame[40 : 40 + gift.shape[0], 600 : 600 + gift.shape[1]] = gift
+    return [frame]
+
+
+def resize(frame: np.ndarray, short_side: int) -> np.ndarray:
+    height, width = frame.shape[:2]
+    scale = short_side / min(height, width)
+    size = (round(width * scale), round(height * scale))
+    return np.asarray(Image.fromarray(frame).resize(size, Image.Resampling.BOX))
+
+
+def bench_encode(frames: List[np.ndarray]) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        Image.fromarray(frame).save(io.BytesIO(), format="PNG", compress_level=1)
+    return (time.perf_counter() - start) / len(frames) * 1000
+
+
+def make_tasker(resource_dirs: List[Path]):
+    from maa.resource import Resource
+    from maa.tasker import Tasker
+
+    from stress_agent import StandInController  # type: ignore
+
+    resource = Resource()
+    for directory in resource_dirs:
+        resource.post_bundle(directory).wait()
+    controller = StandInController()
+    controller.post_connection().wait()
+    tasker = Tasker()
+    tasker.bind(resource, controller)
+    # 保持 resource / controller 的引用
+    return tasker, resource, controller
+
+
+def builtin_recognition(resource, name: str):
+    """
+    节点的 (识别类型, 参数)。FrameTargets 自定义识别换成等价的框架
+    TemplateMatch / ColorMatch，便于脱离 agent 运行。
+    """
+    from maa.pipeline import JColorMatch, JTemplateMatch
+
+    recognition = resource.get_node_object(name).recognition
+    param = recognition.param
+    if recognition.type != "Custom" or param.custom_recognition != "FrameTargets":
+        return recognition.type, param
+
+    custom = dict(param.custom_recognition_param)
+    if custom.pop("type", "TemplateMatch") == "ColorMatch":
+        lower, upper = custom["lower"], custom["upper"]
+        return "ColorMatch", JColorMatch(
+            lower=lower if isinstance(lower[0], list) else [lower],
+            upper=upper if isinstance(upper[0], list) else [upper],
+            roi=tuple(custom.get("roi", (0, 0, 0, 0))),
+            method=custom.get("method", 4),
+            count=custom.get("count", 1),
+            connected=custom.get("connected", False),
+        )
+    return "TemplateMatch", JTemplateMatch(
+        template=[custom["template"]],
+        threshold=[custom.get("threshold", 0.7)],
+        roi=tuple(custom.get("roi", (0, 0, 0, 0))),
+    )
+
+
+def bench_recognition(resource_dirs: List[Path], frames: List[np.ndarray], repeat: int) -> dict:
+    tasker, resource, _ = make_tasker(resource_dirs)
+    result = {}
+    for name in BENCH_NODES:
+        reco_type, reco_param = builtin_recognition(resource, name)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for frame in frames:
+                tasker.post_recognition(reco_type, reco_param, frame).wait()
+        result[name] = (time.perf_counter() - start) / (repeat * len(frames)) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="不同分辨率的单帧开销基准")
+    parser.add_argument("--session", type=str, default=None)
+    parser.add_argument("--images", type=str, default=None)
+    parser.add_argument("--max_frames", type=int, default=50)
+    parser.add_argument("--sides", type=int, nargs="*", default=[720, 540, 480, 360])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base_dir = assets_dir / "resource" / "base"
+    source = load_frames(args)
+    print(f"{len(source)} frames, source shape {source[0].shape}")
+
+    try:
+        import maa  # noqa: F401
+
+        has_maa = True
+    except ImportError:
+        has_maa = False
+        print("未安装 maafw，跳过识别耗时")
+
+    header = f"{'short side':>10}{'raw KB':>10}{'png ms':>10}"
+    if has_maa:
+        header += "".join(f"{name + ' ms':>22}" for name in BENCH_NODES)
+    print(header)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for side in args.sides:
+            frames = [resize(f, side) for f in source]
+            line = f"{side:>10}{frames[0].nbytes / 1024:>10.0f}{bench_encode(frames):>10.2f}"
+            if has_maa:
+                dirs = [base_dir]
+                if side != 720:
+                    dirs.append(Path(tmp) / f"lowres_{side}")
+                    generate_lowres(side, base_dir, dirs[-1])
+                cost = bench_recognition(dirs, frames, args.repeat)
+                line += "".join(f"{cost[name]:>22.3f}" for name in BENCH_NODES)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+金字塔模板匹配（agent/utils/pyramid.py，FrameTargets 的 TemplateMatch 目标使用）与框架 TemplateMatch 的对比。
+
+以框架 TemplateMatch 的结果为准，统计：
+- 命中一致率、漏检 / 误检数
+- 双方都命中时框左上角的最大偏移与得分差
+- 单帧平均耗时（框架为 Tasker.post_recognition 全程；金字塔为进程内耗时，不含 agent IPC）
+
+帧来源：--session 会话录制、--images PNG 目录，都不提供时合成一批带随机位置 / 亮度 / 噪声的帧，半数不含模板。
+
+用法:
+    python tools/bench_template_match.py [--session x.mysr | --images dir] [--node WaitBattleEnd]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.pyramid import PreparedTemplate, auto_factor, match, to_gray  # type: ignore
+from bench_resolution import builtin_recognition, load_frames, make_tasker  # type: ignore
+from utils import assets_dir  # type: ignore
+
+
+def synthetic_frames(template: np.ndarray, count: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(0)
+    frames = []
+    th, tw = template.shape[:2]
+    for i in range(count):
+        frame = rng.integers(0, 90, (1280, 720, 3), dtype=np.uint8)
+        if i % 2 == 0:
+            y, x = int(rng.integers(0, 1280 - th)), int(rng.integers(0, 720 - tw))
+            gain = rng.uniform(0.8, 1.2)
+            noise = rng.normal(0, 6, template.shape)
+            frame[y : y + th, x : x + tw] = np.clip(template * gain + noise, 0, 255).astype(np.uint8)
+        frames.append(frame)
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="金字塔模板匹配与框架 TemplateMatch 对比")
+    parser.add_argument("--session", type=str, default=None)
+    parser.add_argument("--images", type=str, default=None)
+    parser.add_argument("--max_frames", type=int, default=100)
+    parser.add_argument("--node", type=str, default="WaitBattleEnd")
+    args = parser.parse_args()
+
+    tasker, resource, _ = make_tasker([assets_dir / "resource" / "base"])
+    reco_type, param = builtin_recognition(resource, args.node)
+    if reco_type != "TemplateMatch":
+        print(f"{args.node} 不是模板匹配节点")
+        return
+    template_name = param.template[0]
+    threshold = param.threshold[0]
+
+    image = Image.open(assets_dir / "resource" / "base" / "image" / template_name).convert("RGB")
+    template_bgr = np.asarray(image)[:, :, ::-1].astype(np.float32)
+    gray = to_gray(template_bgr)
+    prepared = PreparedTemplate(gray, auto_factor(gray.shape))
+
+    if args.session or args.images:
+        frames = load_frames(args)
+    else:
+        frames = synthetic_frames(template_bgr, args.max_frames)
+    print(f"{len(frames)} frames, template {template_name} {gray.shape}, factor {prepared.factor}, threshold {threshold}")
+
+    agree = missed = extra = 0
+    max_offset, max_score_diff = 0, 0.0
+    framework_time = pyramid_time = 0.0
+    for frame in frames:
+        start = time.perf_counter()
+        detail = tasker.post_recognition(reco_type, param, frame).wait().get()
+        framework_time += time.perf_counter() - start
+        reco = detail.nodes[0].recognition if detail and detail.nodes else None
+        framework_hit = bool(reco and reco.hit)
+
+        start = time.perf_counter()
+        score, box = match(frame, prepared)
+        pyramid_time += time.perf_counter() - start
+        pyramid_hit = box is not None and score >= threshold
+
+        if framework_hit == pyramid_hit:
+            agree += 1
+        elif framework_hit:
+            missed += 1
+        else:
+            extra += 1
+
+        if framework_hit and pyramid_hit:
+            best = reco.best_result
+            max_offset = max(max_offset, abs(best.box[0] - box[0]), abs(best.box[1] - box[1]))
+            max_score_diff = max(max_score_diff, abs(best.score - score))
+
+    n = len(frames)
+    print(f"agreement: {agree}/{n} ({agree / n:.1%}), missed {missed}, extra {extra}")
+    print(f"max box offset: {max_offset} px, max score diff: {max_score_diff:.4f}")
+    print(f"framework TemplateMatch: {framework_time / n * 1000:.2f} ms/frame")
+    print(f"pyramid match:           {pyramid_time / n * 1000:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+从截图 / 会话录制构建带标注的小型帧语料库，供识别基准与调参工具使用。
+
+长时间录制中绝大多数帧是重复的。流程：
+1. 逐帧计算 64 位感知哈希（32×32 灰度 DCT 低频 8×8，按中位数二值化）；
+   与已保留帧的哈希做向量化汉明距离搜索（uint64 异或 + np.bitwise_count），
+   距离不超过 --max_distance 且识别结果相同的帧视为重复，只累加代表帧的权重
+2. 对每帧用与 FrameTargets 相同的单帧求值（agent/utils/frame_targets.py）标注 pipeline 中各识别节点的命中与框；
+   哈希相近但命中不同（如免费副本标记出现 / 消失）的帧会保留
+3. 按画面特征（16 × 9 网格颜色均值）做阈值聚类；
+   每个 (分组, 命中集合) 最多保留 --per_group 帧（最远点采样）
+
+输出目录：
+    frames/000000.png ...   可直接作为 bench_*.py 的 --images
+    labels.json             {"nodes": [...], "frames": [{"file", "source", "index", "phash", "weight",
+                             "cluster", "hits": {节点: [x, y, w, h]}}]}
+
+用法:
+    python tools/build_corpus.py --session a.mysr [--session b.mysr] [--images dir] --output corpus/
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.frame_targets import FrameFeatures, evaluate, fingerprint, target_key  # type: ignore
+from bench_frame_targets import node_target  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+GRID = (16, 9)  # 聚类特征网格，竖屏 (行, 列)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m.astype(np.float32)
+
+
+_DCT = _dct_matrix(DCT_SIZE)
+_BITS = (1 << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)).astype(np.uint64)
+
+
+def phash(image: np.ndarray) -> np.uint64:
+    """64 位感知哈希。"""
+    # 先按步长抽样到约 4 倍哈希网格，再按 32×32 网格分块求均值（裁到整数倍），比整帧插值缩放快得多
+    step = max(1, min(image.shape[:2]) // (DCT_SIZE * 4))
+    gray = image[::step, ::step, :3].mean(axis=2, dtype=np.float32)
+    fy, fx = gray.shape[0] // DCT_SIZE, gray.shape[1] // DCT_SIZE
+    small = gray[: fy * DCT_SIZE, : fx * DCT_SIZE].reshape(DCT_SIZE, fy, DCT_SIZE, fx).mean(axis=(1, 3))
+    low = (_DCT @ small @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    # 直流分量不参与中位数，避免整体亮度主导
+    bits = low > np.median(low[1:])
+    return np.uint64(np.bitwise_or.reduce(_BITS[bits])) if bits.any() else np.uint64(0)
+
+
+class HashIndex:
+    """uint64 哈希的线性索引，一次异或 + popcount 求出到所有条目的汉明距离。"""
+
+    def __init__(self, capacity: int = 1024):
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self.size = 0
+
+    def add(self, value: np.uint64) -> int:
+        if self.size == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+        self._hashes[self.size] = value
+        self.size += 1
+        return self.size - 1
+
+    def within(self, value: np.uint64, max_distance: int) -> np.ndarray:
+        """返回距离不超过 max_distance 的条目下标，按距离升序。"""
+        distances = np.bitwise_count(self._hashes[: self.size] ^ value)
+        near = np.flatnonzero(distances <= max_distance)
+        return near[np.argsort(distances[near], kind="stable")]
+
+
+def label_targets(pipeline: Dict[str, dict]) -> Dict[str, dict]:
+    """pipeline 中能用单帧求值标注的识别节点 -> 求值目标。"""
+    targets = {}
+    for name, node in pipeline.items():
+        recognition = node.get("recognition")
+        if isinstance(recognition, dict):
+            reco_type, param = recognition.get("type"), recognition.get("param") or {}
+        else:
+            reco_type, param = recognition, node
+        if reco_type == "Custom" and param.get("custom_recognition") == "FrameTargets":
+            targets[name] = node_target(node)
+        elif reco_type == "TemplateMatch" and isinstance(param.get("template"), str):
+            keys = ("template", "threshold", "roi")
+            targets[name] = {"type": "TemplateMatch", **{k: param[k] for k in keys if k in param}}
+        elif reco_type == "ColorMatch":
+            keys = ("lower", "upper", "roi", "method", "count", "connected")
+            targets[name] = {"type": "ColorMatch", **{k: param[k] for k in keys if k in param}}
+    return targets
+
+
+def iter_sources(sessions: List[str], images: List[str], step: int) -> Iterator[Tuple[str, int, np.ndarray]]:
+    """产出 (来源, 帧序号, BGR 帧)。"""
+    from agent.utils.session import SessionReader  # type: ignore
+
+    for path in sessions:
+        with SessionReader(Path(path)) as reader:
+            for index in range(0, reader.frame_count, step):
+                yield path, index, reader.frame(index)
+    for directory in images:
+        for index, file in enumerate(sorted(Path(directory).glob("*.png"))):
+            yield str(file), index, np.asarray(Image.open(file).convert("RGB"))[:, :, ::-1].copy()
+
+
+def screen_features(image: np.ndarray, grid: Tuple[int, int] = GRID) -> np.ndarray:
+    """网格各通道均值，去均值、归一化后得到 432 维向量，对亮度整体变化不敏感。"""
+    rows, cols = grid if image.shape[0] >= image.shape[1] else grid[::-1]
+    # 先按 4 跨步抽样再分块求均值，网格很粗，抽样带来的混叠可以忽略
+    small = image[::4, ::4, :3]
+    fy, fx = small.shape[0] // rows, small.shape[1] // cols
+    blocks = small[: rows * fy, : cols * fx].reshape(rows, fy, cols, fx, 3).mean(axis=(1, 3), dtype=np.float32)
+    vector = blocks.ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 1e-6 else vector
+
+
+def farthest_points(features: np.ndarray, count: int) -> np.ndarray:
+    """最远点采样，返回选中的下标。"""
+    if len(features) <= count:
+        return np.arange(len(features))
+    chosen = [0]
+    distance = np.linalg.norm(features - features[0], axis=1)
+    for _ in range(count - 1):
+        index = int(np.argmax(distance))
+        chosen.append(index)
+        distance = np.minimum(distance, np.linalg.norm(features - features[index], axis=1))
+    return np.array(chosen)
+
+
+def cluster(features: np.ndarray, threshold: float) -> List[int]:
+    """阈值（leader）聚类：离所有已有中心都超过 threshold 时新建一类。"""
+    centers: List[np.ndarray] = []
+    labels = []
+    for feature in features:
+        if centers:
+            distances = np.linalg.norm(np.stack(centers) - feature, axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] <= threshold:
+                labels.append(best)
+                continue
+        centers.append(feature)
+        labels.append(len(centers) - 1)
+    return labels
+
+
+def load_corpus(directory: Path) -> Tuple[List[np.ndarray], List[dict]]:
+    """读取本工具生成的语料库，返回 (BGR 帧列表, 标注列表)。"""
+    labels = json.loads((directory / "labels.json").read_text(encoding="utf-8"))["frames"]
+    frames = [np.asarray(Image.open(directory / item["file"]).convert("RGB"))[:, :, ::-1].copy() for item in labels]
+    return frames, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建去重、带标注的帧语料库")
+    parser.add_argument("--session", type=str, action="append", default=[])
+    parser.add_argument("--images", type=str, action="append", default=[])
+    parser.add_argument("--output", type=str, required=True)
+    parser.add_argument("--step", type=int, default=1, help="会话录制每隔几帧取一帧")
+    parser.add_argument("--max_distance", type=int, default=6, help="视为重复的最大汉明距离（64 位）")
+    parser.add_argument("--per_group", type=int, default=5, help="每个 (分组, 命中集合) 最多保留的帧数")
+    parser.add_argument("--cluster_threshold", type=float, default=0.35, help="无分类模型时的聚类距离阈值")
+    args = parser.parse_args()
+    if not args.session and not args.images:
+        parser.error("需要 --session 或 --images")
+
+    pipeline = load_pipeline()
+    targets = label_targets(pipeline)
+    unique = list({target_key(t): t for t in targets.values()}.values())
+    # 模板路径相对资源目录，与 agent 运行时一致
+    sources = [str(Path(p).resolve()) for p in args.session], [str(Path(p).resolve()) for p in args.images]
+    output = Path(args.output).resolve()
+    os.chdir(assets_dir)
+    print(f"{len(targets)} labelled nodes ({len(unique)} distinct targets)")
+
+    index = HashIndex()
+    kept: List[dict] = []
+    kept_frames: List[np.ndarray] = []
+    signatures: List[frozenset] = []
+    total = exact = near = 0
+    last_fingerprint: Optional[tuple] = None
+    hash_seconds = label_seconds = 0.0
+    start = time.perf_counter()
+
+    for source, frame_index, frame in iter_sources(sources[0], sources[1], args.step):
+        total += 1
+        # 连续完全相同的帧（静止画面）直接并入上一个保留帧
+        current = fingerprint(frame)
+        if current == last_fingerprint and kept:
+            kept[-1]["weight"] += 1
+            exact += 1
+            continue
+        last_fingerprint = current
+
+        t0 = time.perf_counter()
+        value = phash(frame)
+        candidates = index.within(value, args.max_distance)
+        t1 = time.perf_counter()
+        results = evaluate(FrameFeatures(frame), unique)
+        hits = {
+            name: [int(v) for v in results[target_key(t)][1]]
+            for name, t in targets.items()
+            if results[target_key(t)][0]
+        }
+        signature = frozenset(hits)
+        label_seconds += time.perf_counter() - t1
+        hash_seconds += t1 - t0
+
+        duplicate = next((int(i) for i in candidates if signatures[i] == signature), None)
+        if duplicate is not None:
+            kept[duplicate]["weight"] += 1
+            near += 1
+            continue
+
+        index.add(value)
+        signatures.append(signature)
+        kept_frames.append(frame)
+        kept.append({"source": source, "index": frame_index, "phash": f"{int(value):016x}", "weight": 1, "hits": hits})
+
+    if not kept:
+        print("没有可用的帧")
+        return
+
+    # 按画面特征聚类分组
+    features = np.stack([screen_features(frame) for frame in kept_frames])
+    for item, cluster_id in zip(kept, cluster(features, args.cluster_threshold)):
+        item["cluster"] = f"c{cluster_id}"
+
+    groups: Dict[Tuple[str, frozenset], List[int]] = defaultdict(list)
+    for i, item in enumerate(kept):
+        groups[(item["cluster"], signatures[i])].append(i)
+    selected = []
+    for members in groups.values():
+        chosen = farthest_points(features[members], args.per_group)
+        # 被淘汰帧的权重并入组内保留帧，权重总和仍等于输入帧数
+        weight = sum(kept[i]["weight"] for i in members)
+        # 画面完全相同时最远点采样会重复选中同一帧
+        picked = [members[c] for c in dict.fromkeys(chosen.tolist())]
+        share, rest = divmod(weight, len(picked))
+        for j, i in enumerate(picked):
+            kept[i]["weight"] = share + (j < rest)
+        selected += picked
+    selected.sort()
+
+    frames_dir = output / "frames"
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    records = []
+    for n, i in enumerate(selected):
+        file = f"frames/{n:06d}.png"
+        Image.fromarray(kept_frames[i][:, :, ::-1]).save(output / file)
+        records.append({"file": file, **kept[i]})
+    (output / "labels.json").write_text(
+        json.dumps({"nodes": sorted(targets), "frames": records}, ensure_ascii=False, indent=1), encoding="utf-8"
+    )
+
+    elapsed = time.perf_counter() - start
+    print(f"input: {total} frames ({exact} identical, {near} near-duplicate) in {elapsed:.1f}s")
+    print(f"  phash + search: {hash_seconds / max(total - exact, 1) * 1000:.2f} ms/frame, labelling: {label_seconds / max(total - exact, 1) * 1000:.2f} ms/frame")
+    print(f"unique: {len(kept)}, groups: {len(groups)}, corpus: {len(records)} frames -> {output}")
+    chosen = set(selected)
+    for (cluster_name, signature), members in sorted(groups.items(), key=lambda item: (item[0][0], sorted(item[0][1]))):
+        weight = sum(kept[i]["weight"] for i in members if i in chosen)
+        print(f"  {cluster_name:<18} hits={sorted(signature) or '-'}  frames={sum(i in chosen for i in members)}  weight={weight}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+在 tools/simulate_game.py 的模拟器上完整执行刷图入口，检查 pipeline 的终止状态。
+
+每个用例在新的模拟器上执行一次入口，要求：
+- 任务成功结束（地图清空后经 CheckTaskComplete 到达 TaskComplete）
+- 进入过的地图都已清空，且战斗数等于标记数（没有因误判失败而重复进入）
+
+agent 开启会话录制与动作后的稳定探测，任务器事件经 AgentClient.register_sink 转发给 agent；
+全部用例结束后用录制检查两个离线调优工具确实有输入：
+- tools/order_next_lists.py 的统计文件中有 ClickGoButton 的各轮（agent/custom/sink/node_stats.py）
+- tools/tune_delays.py 至少给出一个节点的建议值（agent/custom/sink/settle_probe.py）
+
+用法:
+    python tools/ci/check_simulation.py [--markers 2] [--speed 4]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from maa.agent_client import AgentClient
+from maa.resource import Resource
+from maa.tasker import Tasker
+
+from utils import working_dir  # type: ignore
+
+sys.path.append(str(working_dir / "tools"))
+
+from simulate_game import MAP_ROWS, GameSimulator, latest_session, start_agent, stop_agent  # type: ignore
+
+# (入口, 任务 override, 应当清空的地图)
+CASES: List[Tuple[str, dict, List[str]]] = [
+    ("FreeDungeonTask", {}, ["EastContinent"]),
+    ("EastContinent", {"EastContinent": {"attach": {"use_warrior": True}}}, ["EastContinent"]),
+    (
+        "FarmAllMaps",
+        {
+            "FarmAllMaps": {
+                "attach": {
+                    "use_warrior": True,
+                    **{f"map_{name}": name in ("EastContinent", "VoidRealm") for name in MAP_ROWS},
+                }
+            }
+        },
+        ["EastContinent", "VoidRealm"],
+    ),
+]
+
+
+def run_case(
+    client: AgentClient, registered: list, resource: Resource, entry: str, override: dict, maps: List[str], args
+) -> bool:
+    controller = GameSimulator(args.markers, args.battle_seconds, speed=args.speed)
+    controller.post_connection().wait()
+    tasker = Tasker()
+    tasker.bind(resource, controller)
+    if not tasker.inited:
+        print("Failed to init tasker")
+        return False
+    if not client.register_sink(resource, controller, tasker):
+        print("Failed to register sinks")
+        return False
+    # 之前注册的任务器须在客户端断开前一直存活，见 tools/simulate_game.py
+    registered.append((controller, tasker))
+
+    start = time.perf_counter()
+    detail = tasker.post_task(entry, override).wait().get()
+    elapsed = time.perf_counter() - start
+    succeeded = detail is not None and detail.status.succeeded
+    stats = controller.stats
+    errors = []
+    if not succeeded:
+        errors.append("task failed")
+    if sorted(controller.markers) != sorted(maps):
+        errors.append(f"entered maps {sorted(controller.markers)}, expected {sorted(maps)}")
+    if controller.remaining_markers():
+        errors.append(f"{controller.remaining_markers()} markers left")
+    if stats["battles"] != args.markers * len(maps):
+        errors.append(f"{stats['battles']} battles, expected {args.markers * len(maps)}")
+
+    print(f"{entry}: {'ok' if not errors else 'FAILED'} in {elapsed:.1f}s, {stats['battles']} battles")
+    for error in errors:
+        print(f"  {error}")
+    if errors and detail is not None:
+        print("  " + " -> ".join(f"{node.name}{'' if node.completed else '(x)'}" for node in detail.nodes if node))
+    return not errors
+
+
+def run_tool(script: str, *args: str):
+    subprocess.run([sys.executable, str(working_dir / "tools" / script), *args], cwd=working_dir, capture_output=True)
+
+
+def check_next_stats(session: Path, directory: Path) -> bool:
+    stats_path = directory / "next_stats.json"
+    run_tool(
+        "order_next_lists.py", str(session), "--output", str(directory / "next_order.json"), "--stats", str(stats_path)
+    )
+    stats = json.loads(stats_path.read_text(encoding="utf-8")) if stats_path.exists() else {}
+
+    rounds = stats.get("ClickGoButton", {}).get("rounds", 0)
+    print(f"next stats: {'ok' if rounds else 'FAILED'}, {rounds} ClickGoButton rounds over {len(stats)} node(s)")
+    if not rounds:
+        print(f"  no next-list statistics in {session} (node_stats sink received no events)")
+    return bool(rounds)
+
+
+def check_tuned_delays(session: Path, directory: Path) -> bool:
+    tuned_path = directory / "tuned_delays.json"
+    run_tool("tune_delays.py", str(session), "--output", str(tuned_path))
+    tuned = json.loads(tuned_path.read_text(encoding="utf-8")) if tuned_path.exists() else {}
+
+    print(f"tuned delays: {'ok' if tuned else 'FAILED'}, {len(tuned)} node(s) with suggestions")
+    if not tuned:
+        print(f"  no post_delay / rate_limit suggestion from {session} (settle_probe sink recorded nothing)")
+    return bool(tuned)
+
+
+def check_session(started: float) -> List[bool]:
+    session = latest_session(started)
+    if session is None:
+        print("session: FAILED, no recording")
+        return [False]
+    with tempfile.TemporaryDirectory() as directory:
+        return [check_next_stats(session, Path(directory)), check_tuned_delays(session, Path(directory))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟器端到端检查")
+    parser.add_argument("--markers", type=int, default=2, help="每张地图的免费副本标记数")
+    parser.add_argument("--battle_seconds", type=float, default=2.0)
+    parser.add_argument("--speed", type=float, default=4.0, help="加载与战斗时间除以该倍数")
+    args = parser.parse_args()
+
+    resource = Resource()
+    resource.post_bundle(working_dir / "assets" / "resource" / "base").wait()
+    client = AgentClient()
+    client.bind(resource)
+    started = time.time()
+    agent = start_agent(client, record=True, probe_settle=True)
+    registered: list = []
+
+    try:
+        if not client.connect():
+            print("Failed to connect to agent")
+            sys.exit(1)
+        results = [
+            run_case(client, registered, resource, entry, override, maps, args) for entry, override, maps in CASES
+        ]
+    finally:
+        stop_agent(client, agent)
+
+    results += check_session(started)
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
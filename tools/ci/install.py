@@ -2,6 +2,7 @@ import platform
 from pathlib import Path
 import os
 import shutil
+import subprocess
 import sys
 
 import jsonc
@@ -85,6 +86,17 @@ def install_resource(version):
         ) as f:
             jsonc.dump(pipeline_merged, f, ensure_ascii=False, indent=4)
 
+    # 预编译 map × job pipeline 变体，运行时直接调用对应入口而不再逐职业 override
+    subprocess.run(
+        [sys.executable, str(working_dir / "tools" / "generate_variants.py")],
+        check=True,
+    )
+    # 低分辨率快速模式资源（坐标、ColorMatch 面积与模板图按短边 480 缩放）
+    subprocess.run(
+        [sys.executable, str(working_dir / "tools" / "generate_lowres.py"), "--short_side", "480"],
+        check=True,
+    )
+
     if Path(".vscode").exists() or Path(".venv").exists() or Path(".nicegui").exists():
         print("开发环境安装，跳过资源合并")
     else:
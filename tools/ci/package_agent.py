@@ -0,0 +1,165 @@
+"""
+把 agent 与其纯 Python 依赖打包为预编译的 zipapp（agent.pyz），缩短嵌入式 Python 的 agent 冷启动。
+
+散装的 agent/*.py 每次启动都要在 sys.path 的各目录中逐个 stat 查找模块，
+__pycache__ 不可写或首次启动时还要编译。打包后：
+- 所有模块以 .pyc（optimize=1，unchecked-hash，不再比对源码时间戳）与源码一起放入 zip，
+  源码只用于回溯显示；运行时 Python 版本与打包时不同导致 .pyc 不可用时自动退回源码
+- zip 不压缩（ZIP_STORED），导入时直接读取；zip 的中央目录就是模块索引，
+  首次导入时一次读入，之后查找模块不再访问文件系统
+- 依赖中含二进制扩展（numpy、pillow、maafw 等）或不存在的包不打包，仍从 site-packages 导入
+
+agent.pyz 放在原 agent 目录的同级，main.py 中按 __file__ 推算项目根目录的逻辑不变。
+install.py 默认仍以 agent/main.py 启动：本机实测 __pycache__ 已生成时 agent.pyz 并不更快
+（252 ms 对 239 ms），只在首次启动或 __pycache__ 不可写时省去编译（散装 292 ms）。
+需要时把 interface.json 的 agent.child_args 改为 ["-u", "agent.pyz"]，并先用 --measure
+在目标嵌入式 Python 上确认冷启动确有收益。
+
+用法:
+    python tools/ci/package_agent.py [--output install/agent.pyz] [--deps loguru colorama] [--measure 10]
+"""
+
+import argparse
+import importlib.util
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+
+from utils import working_dir  # type: ignore
+
+# requirements.txt 中 agent 运行时会导入的纯 Python 依赖（win32_setctime 只在 Windows 上被 loguru 导入）
+DEFAULT_DEPS = ["loguru", "colorama", "win32_setctime", "strenum"]
+BINARY_SUFFIXES = {".so", ".pyd", ".dll", ".dylib"}
+
+MAIN = """\
+import runpy
+
+runpy.run_module("main", run_name="__main__", alter_sys=True)
+"""
+
+
+def compile_source(source: Path, arcname: str) -> bytes:
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "module.pyc"
+        py_compile.compile(
+            str(source),
+            cfile=str(target),
+            dfile=arcname,
+            doraise=True,
+            optimize=1,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        return target.read_bytes()
+
+
+def collect_tree(root: Path, prefix: str) -> Dict[str, Path]:
+    """root 下的 .py 文件 -> 包内路径（prefix 为包名，空串表示放在 zip 根目录）。"""
+    files = {}
+    for path in sorted(root.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        relative = path.relative_to(root).as_posix()
+        files[f"{prefix}/{relative}" if prefix else relative] = path
+    return files
+
+
+def collect_dependency(name: str) -> Dict[str, Path]:
+    """纯 Python 依赖的源码；含二进制扩展或找不到时返回空。"""
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        print(f"  skip {name}: not installed")
+        return {}
+    origin = Path(spec.origin)
+    if spec.submodule_search_locations:
+        root = origin.parent
+        if any(p.suffix in BINARY_SUFFIXES for p in root.rglob("*")):
+            print(f"  skip {name}: contains binary extensions")
+            return {}
+        return collect_tree(root, name)
+    if origin.suffix != ".py":
+        print(f"  skip {name}: binary module")
+        return {}
+    return {origin.name: origin}
+
+
+def build(output: Path, deps: List[str]) -> dict:
+    files = collect_tree(working_dir / "agent", "")
+    for name in deps:
+        dependency = collect_dependency(name)
+        overlap = files.keys() & dependency.keys()
+        if overlap:
+            print(f"  skip {name}: conflicts with {sorted(overlap)[:3]}")
+            continue
+        files.update(dependency)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("__main__.py", MAIN)
+        for arcname, source in sorted(files.items()):
+            archive.write(source, arcname)
+            archive.writestr(arcname + "c", compile_source(source, arcname))
+    tmp.replace(output)
+    return {"modules": len(files), "bytes": output.stat().st_size}
+
+
+def launch_seconds(command: List[str], cwd: Path) -> float:
+    """启动到 agent 因缺少 socket_id 退出的耗时：此时已完成全部模块导入与 custom 注册。"""
+    # 与嵌入式 Python 的默认行为一致：允许写 __pycache__
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def measure(repeat: int, deps: List[str]):
+    """在临时安装目录中比较散装 agent（无 / 有 __pycache__）与 agent.pyz 的启动耗时。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        shutil.copytree(working_dir / "agent", root / "agent", ignore=shutil.ignore_patterns("__pycache__"))
+        build(root / "agent.pyz", deps)
+        loose = [sys.executable, str(root / "agent" / "main.py")]
+        packed = [sys.executable, str(root / "agent.pyz")]
+
+        def clear_cache():
+            for cache in (root / "agent").rglob("__pycache__"):
+                shutil.rmtree(cache)
+
+        cases = {"loose, no __pycache__": [], "loose, __pycache__": [], "agent.pyz": []}
+        launch_seconds(packed, root)  # 预热文件系统缓存与共享库
+        for _ in range(repeat):
+            clear_cache()
+            cases["loose, no __pycache__"].append(launch_seconds(loose, root))
+            cases["loose, __pycache__"].append(launch_seconds(loose, root))
+            cases["agent.pyz"].append(launch_seconds(packed, root))
+
+    print(f"\ncold start to imports done, median of {repeat}:")
+    baseline = statistics.median(cases["loose, __pycache__"])
+    for name, values in cases.items():
+        median = statistics.median(values)
+        print(f"  {name:<24}{median * 1000:>8.0f} ms  ({median / baseline:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打包 agent 为预编译 zipapp")
+    parser.add_argument("--output", type=str, default=str(working_dir / "install" / "agent.pyz"))
+    parser.add_argument("--deps", type=str, nargs="*", default=DEFAULT_DEPS)
+    parser.add_argument("--measure", type=int, default=0, help="比较冷启动耗时的重复次数，0 为不比较")
+    args = parser.parse_args()
+
+    result = build(Path(args.output), args.deps)
+    print(f"{args.output}: {result['modules']} modules, {result['bytes'] / 1024:.0f} KiB")
+    if args.measure:
+        measure(args.measure, args.deps)
+
+
+if __name__ == "__main__":
+    main()
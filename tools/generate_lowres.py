@@ -0,0 +1,122 @@
+"""
+生成低分辨率快速模式的资源覆盖包。
+
+pipeline 中的坐标、ROI、ColorMatch 像素数与模板图均按短边 720 设计。
+本工具按目标短边（默认 480）统一缩放后写入 assets/resource/lowres_<side>，
+与 base 一起加载（见 interface.json 的低分辨率资源），配合 display_short_side 相同的控制器使用：
+- roi / roi_offset / target / target_offset / begin / end 等 [x, y, w, h] 或 [x, y] 坐标
+- ColorMatch 的 count（面积，按比例平方缩放）
+- image 目录下的所有模板图
+
+自定义动作中的坐标由 agent/utils/coords.py 在运行时换算，不在这里处理。
+
+用法:
+    python tools/generate_lowres.py [--short_side 480]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.coords import BASE_SHORT_SIDE, scale_point, scale_rect  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+COORD_KEYS = {"roi", "roi_offset", "target", "target_offset", "begin", "begin_offset", "end", "end_offset"}
+
+
+def recognition_type(node: dict) -> Optional[str]:
+    reco = node.get("recognition")
+    if isinstance(reco, dict):
+        return reco.get("type")
+    return reco
+
+
+def scale_value(value, scale: float):
+    if isinstance(value, list) and len(value) == 4 and all(isinstance(v, int) for v in value):
+        return scale_rect(value, scale)
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(v, int) for v in value):
+        return list(scale_point(value[0], value[1], scale))
+    # True / 节点名等引用不缩放
+    return value
+
+
+def scale_fields(fields: dict, scale: float, is_color_match: bool) -> bool:
+    """原地缩放一层字段（v1 节点本身或 v2 的 param），返回是否有改动。"""
+    changed = False
+    for key in list(fields):
+        if key in COORD_KEYS:
+            scaled = scale_value(fields[key], scale)
+            changed |= scaled != fields[key]
+            fields[key] = scaled
+        elif key == "count" and is_color_match:
+            fields[key] = max(1, round(fields[key] * scale * scale))
+            changed = True
+    return changed
+
+
+def scale_node(node: dict, scale: float) -> Optional[dict]:
+    """返回缩放后的节点副本；没有需要缩放的字段时返回 None。"""
+    node = json.loads(json.dumps(node))
+    is_color_match = recognition_type(node) == "ColorMatch"
+
+    changed = scale_fields(node, scale, is_color_match)
+    for key in ("recognition", "action"):
+        if isinstance(node.get(key), dict) and isinstance(node[key].get("param"), dict):
+            changed |= scale_fields(node[key]["param"], scale, is_color_match and key == "recognition")
+    return node if changed else None
+
+
+def scale_images(src: Path, dst: Path, scale: float) -> int:
+    from PIL import Image
+
+    count = 0
+    for file in src.rglob("*.png"):
+        target = dst / file.relative_to(src)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with Image.open(file) as image:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image.resize(size, Image.Resampling.BOX).save(target)
+        count += 1
+    return count
+
+
+def generate_lowres(short_side: int, base_dir: Path, output_dir: Path) -> Dict[str, int]:
+    scale = short_side / BASE_SHORT_SIDE
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    (output_dir / "pipeline").mkdir(parents=True)
+
+    pipeline = load_pipeline(base_dir / "pipeline")
+    scaled = {}
+    for name, node in pipeline.items():
+        new_node = scale_node(node, scale)
+        if new_node is not None:
+            scaled[name] = new_node
+
+    with open(output_dir / "pipeline" / "lowres.json", "w", encoding="utf-8") as f:
+        json.dump(scaled, f, ensure_ascii=False, indent=4)
+
+    images = scale_images(base_dir / "image", output_dir / "image", scale) if (base_dir / "image").exists() else 0
+    return {"nodes": len(scaled), "images": images}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成低分辨率快速模式资源")
+    parser.add_argument("--short_side", type=int, default=480)
+    parser.add_argument("--base_dir", type=str, default=str(assets_dir / "resource" / "base"))
+    parser.add_argument("--output_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir) if args.output_dir else assets_dir / "resource" / f"lowres_{args.short_side}"
+    result = generate_lowres(args.short_side, Path(args.base_dir), output_dir)
+    print(f"Scaled {result['nodes']} nodes and {result['images']} images to short side {args.short_side} -> {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
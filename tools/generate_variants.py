@@ -0,0 +1,179 @@
+"""
+预编译 map × job pipeline 变体。
+
+MapCleanup / FarmAllMaps 在每个职业前都要构造 pipeline_override 并交给框架合并。
+本工具在安装时把所有组合预先展开为独立入口：
+- MapJobCommon_<map>_<job>
+- FreeDungeonSwitchMap_<map>
+
+只克隆能到达参数化节点（RecognizeJobCharacter / SelectMapByParam）的节点，
+节点名后缀只包含其下游实际依赖的参数，因此同一地图的公共部分在各职业间共享，
+FindFreeDungeon 之后的战斗循环完全复用原节点。
+
+用法:
+    python tools/generate_variants.py [--output <file>]
+"""
+
+import argparse
+import copy
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+
+from utils import assets_dir, load_jsonc, load_pipeline, pipeline_dir  # type: ignore
+
+VARIANTS_FILE_NAME = "map_job_variants.json"
+
+# 参数化节点 -> (参数名, 自定义动作, 参数键)，与 MapCleanup._run_one_job 注入的 override 一致
+PARAM_NODES: Dict[str, Tuple[str, str, str]] = {
+    "SelectMapByParam": ("map", "SelectMap", "map"),
+    "RecognizeJobCharacter": ("job", "SelectJob", "job"),
+}
+# 变体名后缀中参数的顺序
+PARAM_ORDER = ["map", "job"]
+
+# 需要展开的入口 -> 其依赖的参数
+BASE_ENTRIES: Dict[str, List[str]] = {
+    "MapJobCommon": ["map", "job"],
+    "FreeDungeonSwitchMap": ["map"],
+}
+
+
+def variant_name(name: str, values: Dict[str, str], deps: Set[str]) -> str:
+    if not deps:
+        return name
+    return "_".join([name] + [values[p] for p in PARAM_ORDER if p in deps])
+
+
+def successors(node: dict) -> List[str]:
+    result = []
+    for kind in ("next", "on_error"):
+        targets = node.get(kind, [])
+        result += [targets] if isinstance(targets, str) else targets
+    return result
+
+
+def param_deps(pipeline: Dict[str, dict]) -> Dict[str, Set[str]]:
+    """每个节点（含自身）下游可到达的参数化节点所对应的参数集合。"""
+    deps: Dict[str, Set[str]] = {}
+    for name in pipeline:
+        seen: Set[str] = set()
+        stack = [name]
+        found: Set[str] = set()
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in pipeline:
+                continue
+            seen.add(current)
+            if current in PARAM_NODES:
+                found.add(PARAM_NODES[current][0])
+            stack += successors(pipeline[current])
+        deps[name] = found
+    return deps
+
+
+def clone_variant(
+    pipeline: Dict[str, dict],
+    deps: Dict[str, Set[str]],
+    entry: str,
+    values: Dict[str, str],
+    out: Dict[str, dict],
+):
+    stack = [entry]
+    while stack:
+        name = stack.pop()
+        if not deps.get(name):
+            continue
+        new_name = variant_name(name, values, deps[name])
+        if new_name in out:
+            continue
+
+        node = copy.deepcopy(pipeline[name])
+        for kind in ("next", "on_error"):
+            if kind in node:
+                targets = [node[kind]] if isinstance(node[kind], str) else node[kind]
+                node[kind] = [variant_name(t, values, deps.get(t, set())) for t in targets]
+                stack += targets
+
+        if name in PARAM_NODES:
+            param, custom_action, key = PARAM_NODES[name]
+            node["action"] = {
+                "type": "Custom",
+                "param": {
+                    "custom_action": custom_action,
+                    "custom_action_param": {key: values[param]},
+                },
+            }
+        suffix = ", ".join(values[p] for p in PARAM_ORDER if p in deps[name])
+        node["doc"] = f"{node.get('doc', name)}（预编译变体 {suffix}）"
+        out[new_name] = node
+
+
+def collect_maps(pipeline: Dict[str, dict], interface: dict) -> List[str]:
+    """interface.json 中所有调用 MapCleanup 的地图入口。"""
+    maps = []
+    for task in interface.get("task", []):
+        action = pipeline.get(task["entry"], {}).get("action")
+        if isinstance(action, dict) and action.get("param", {}).get("custom_action") == "MapCleanup":
+            maps.append(task["entry"])
+    return maps
+
+
+def collect_jobs(interface: dict) -> List[str]:
+    """interface.json 职业选项中出现的 use_xxx 字段。"""
+    jobs = []
+    for option in interface.get("option", {}).values():
+        for case in option.get("cases", []):
+            for node in case.get("pipeline_override", {}).values():
+                for key in node.get("attach", {}):
+                    if key.startswith("use_"):
+                        jobs.append(key[len("use_") :])
+    return list(dict.fromkeys(jobs))
+
+
+def generate_variants(pipeline: Dict[str, dict], maps: List[str], jobs: List[str]) -> Dict[str, dict]:
+    deps = param_deps(pipeline)
+    out: Dict[str, dict] = {}
+    for entry, params in BASE_ENTRIES.items():
+        if entry not in pipeline:
+            continue
+        for map_name in maps:
+            for job_name in jobs if "job" in params else [None]:
+                values = {"map": map_name}
+                if job_name:
+                    values["job"] = job_name
+                clone_variant(pipeline, deps, entry, values, out)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预编译 map × job pipeline 变体")
+    parser.add_argument("--pipeline_dir", type=str, default=str(pipeline_dir))
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    directory = Path(args.pipeline_dir)
+    output = Path(args.output) if args.output else directory / VARIANTS_FILE_NAME
+
+    pipeline = load_pipeline(directory)
+    # 重新生成时排除上一次生成的变体
+    if output.exists():
+        for name in load_jsonc(output):
+            pipeline.pop(name, None)
+
+    interface = load_jsonc(assets_dir / "interface.json")
+    maps = collect_maps(pipeline, interface)
+    jobs = collect_jobs(interface)
+    variants = generate_variants(pipeline, maps, jobs)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(variants, f, ensure_ascii=False, indent=4)
+
+    print(f"Generated {len(variants)} nodes for {len(maps)} maps x {len(jobs)} jobs -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+根据会话录制中的识别统计，为各节点的 next 列表生成按期望识别耗时最小排序的 pipeline_override。
+
+数据来源：开启会话录制（MAA_RECORD_SESSION=1）时 agent/custom/sink/node_stats.py 写入的
+next_list / node_recognition 事件。每次 next 列表求值为一轮，轮内按截图循环逐个识别候选，
+直到某个候选命中。
+
+排序：各候选命中率 p、平均识别耗时 c，候选互斥时按 p / c 降序排列可使期望耗时最小。
+- 无识别（DirectHit）的候选及其后的候选保持原位：它们之后的项本来就不会被尝试
+- --pin 指定的节点保持原下标（同一画面可能同时命中多个候选、且先后有业务含义时使用）
+- 轮数少于 --min_rounds 的节点不调整
+
+校验：用录制的每一轮回放新顺序（未被尝试过的候选按不命中、平均耗时计），
+输出调整前后每次跳转的识别耗时；生成的文件可用 analyze_pipeline.py --override 检查引用。
+--stats 另存各节点的统计 {父节点: {"rounds": 轮数, "candidates": {候选: {"p", "ms", "n"}}}}。
+
+next_list / node_recognition 事件来自任务器事件，客户端必须调用 AgentClient.register_sink
+转发给 agent，否则录制中没有这些事件。tools/simulate_game.py --record 即按此录制。
+
+用法:
+    python tools/order_next_lists.py a.mysr [b.mysr ...] [--output next_order.json] [--pin NodeA NodeB]
+                                          [--override extra.json ...] [--stats next_stats.json]
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.session import SessionReader  # type: ignore
+from analyze_pipeline import RUNTIME_OVERRIDES, apply_override, parse_target  # type: ignore
+from utils import load_jsonc, load_pipeline  # type: ignore
+
+# 一轮：[(候选, 是否命中, 耗时 ms), ...]，按识别顺序，最后一项为命中项（若有）
+Round = List[Tuple[str, bool, float]]
+
+
+def collect_rounds(sessions: List[Path]) -> Dict[str, List[Round]]:
+    """把录制事件按 (task_id) 切成 {父节点: [轮, ...]}。没有命中就结束的轮（任务超时 / 停止）丢弃。"""
+    rounds: Dict[str, List[Round]] = defaultdict(list)
+    for path in sessions:
+        with SessionReader(path) as reader:
+            # task_id -> (父节点, 候选集合, 当前轮)
+            current: Dict[int, Tuple[str, Set[str], Round]] = {}
+            for _, event in reader.events():
+                kind = event.get("type")
+                if kind == "next_list":
+                    current[event["task_id"]] = (event["node"], set(event["candidates"]), [])
+                elif kind == "node_recognition":
+                    state = current.get(event["task_id"])
+                    # 自定义动作内 run_recognition 等识别不在候选中，忽略
+                    if state is None or event["node"] not in state[1]:
+                        continue
+                    state[2].append((event["node"], bool(event["hit"]), float(event["ms"])))
+                    if event["hit"]:
+                        rounds[state[0]].append(state[2])
+                        del current[event["task_id"]]
+    return rounds
+
+
+def candidate_stats(rounds: List[Round]) -> Dict[str, Tuple[float, float, int]]:
+    """{候选: (命中率, 平均耗时 ms, 识别次数)}"""
+    hits: Dict[str, int] = defaultdict(int)
+    costs: Dict[str, List[float]] = defaultdict(list)
+    for r in rounds:
+        for name, hit, ms in r:
+            costs[name].append(ms)
+            hits[name] += hit
+    return {name: (hits[name] / len(values), sum(values) / len(values), len(values)) for name, values in costs.items()}
+
+
+def always_hits(node: Optional[dict]) -> bool:
+    if node is None:
+        return False
+    recognition = node.get("recognition")
+    if isinstance(recognition, dict):
+        recognition = recognition.get("type")
+    return recognition in (None, "DirectHit")
+
+
+def reorder(
+    candidates: List[str],
+    stats: Dict[str, Tuple[float, float, int]],
+    pipeline: Dict[str, dict],
+    pinned: Set[str],
+) -> List[str]:
+    """按 p / c 降序重排可调整的候选；DirectHit 及其后的候选、pinned 候选保持原位。"""
+    limit = next((i for i, name in enumerate(candidates) if always_hits(pipeline.get(name))), len(candidates))
+    movable = [i for i in range(limit) if candidates[i] not in pinned]
+
+    def key(index: int):
+        p, c, _ = stats.get(candidates[index], (0.0, 0.0, 0))
+        return (-p / max(c, 0.01), index)
+
+    ordered = list(candidates)
+    for slot, index in zip(movable, sorted(movable, key=key)):
+        ordered[slot] = candidates[index]
+    return ordered
+
+
+def split_scans(r: Round) -> List[Round]:
+    """把一轮按截图循环切开：候选重复出现即进入下一次截图。"""
+    scans: List[Round] = [[]]
+    for item in r:
+        if any(item[0] == name for name, _, _ in scans[-1]):
+            scans.append([])
+        scans[-1].append(item)
+    return scans
+
+
+def replay_cost(rounds: List[Round], order: List[str], stats: Dict[str, Tuple[float, float, int]]) -> float:
+    """按给定顺序回放各轮，返回每次跳转的平均识别耗时 ms。"""
+    total = 0.0
+    for r in rounds:
+        *missed, final = split_scans(r)
+        # 命中前的截图循环里每个候选都识别一次，耗时与顺序无关
+        total += sum(ms for scan in missed for _, _, ms in scan)
+        observed = {name: ms for name, _, ms in final}
+        winner = final[-1][0]
+        for name in order:
+            if name == winner:
+                total += observed[name]
+                break
+            total += observed[name] if name in observed else stats.get(name, (0.0, 0.0, 0))[1]
+    return total / max(len(rounds), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按识别统计重排 next 列表")
+    parser.add_argument("sessions", type=str, nargs="+", help="会话录制 .mysr")
+    parser.add_argument("--output", type=str, default="next_order.json")
+    parser.add_argument("--pin", type=str, nargs="*", default=[], help="保持原位的候选节点")
+    parser.add_argument("--min_rounds", type=int, default=20, help="参与调整的最少轮数")
+    parser.add_argument(
+        "--override", type=str, action="append", default=[], help="录制时额外叠加的 pipeline_override 文件"
+    )
+    parser.add_argument("--stats", type=str, default=None, help="另存各节点候选的命中率 / 耗时统计")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline()
+    apply_override(pipeline, RUNTIME_OVERRIDES)
+    for file in args.override:
+        apply_override(pipeline, load_jsonc(Path(file)))
+    rounds = collect_rounds([Path(s) for s in args.sessions])
+    if not rounds:
+        print(
+            "录制中没有 next_list / node_recognition 事件：需设置 MAA_RECORD_SESSION=1，"
+            "且客户端调用 AgentClient.register_sink 转发任务器事件"
+        )
+        sys.exit(1)
+
+    override: Dict[str, dict] = {}
+    node_stats: Dict[str, dict] = {}
+    before_total = after_total = 0.0
+    transitions = 0
+    print(f"{'node':<32}{'rounds':>8}{'before ms':>11}{'after ms':>10}  order")
+    for parent in sorted(rounds):
+        items = (pipeline.get(parent) or {}).get("next", [])
+        items = items if isinstance(items, list) else [items]
+        candidates = [parse_target(item) for item in items]
+        node_rounds = [r for r in rounds[parent] if all(name in candidates for name, _, _ in r)]
+        if len(candidates) < 2 or not node_rounds:
+            continue
+
+        stats = candidate_stats(node_rounds)
+        node_stats[parent] = {
+            "rounds": len(node_rounds),
+            "candidates": {name: {"p": p, "ms": c, "n": n} for name, (p, c, n) in stats.items()},
+        }
+        ordered = candidates
+        if len(node_rounds) >= args.min_rounds:
+            ordered = reorder(candidates, stats, pipeline, set(args.pin))
+        before = replay_cost(node_rounds, candidates, stats)
+        after = replay_cost(node_rounds, ordered, stats)
+        before_total += before * len(node_rounds)
+        after_total += after * len(node_rounds)
+        transitions += len(node_rounds)
+
+        changed = ordered != candidates
+        print(f"{parent:<32}{len(node_rounds):>8}{before:>11.2f}{after:>10.2f}  {' > '.join(ordered) if changed else '-'}")
+        for name in candidates:
+            p, c, n = stats.get(name, (0.0, 0.0, 0))
+            print(f"    {name:<28}p={p:.2f}  c={c:.2f} ms  n={n}")
+        if changed:
+            # 保留原列表项写法（[JumpBack] 前缀等）
+            by_name = dict(zip(candidates, items))
+            override[parent] = {"next": [by_name[name] for name in ordered]}
+
+    if transitions:
+        print(
+            f"\ntotal: {transitions} transitions, {before_total / transitions:.2f} -> "
+            f"{after_total / transitions:.2f} ms/transition"
+        )
+    Path(args.output).write_text(json.dumps(override, ensure_ascii=False, indent=4), encoding="utf-8")
+    print(f"{len(override)} node(s) reordered, saved to {args.output}")
+    if args.stats:
+        Path(args.stats).write_text(json.dumps(node_stats, ensure_ascii=False, indent=4), encoding="utf-8")
+        print(f"statistics of {len(node_stats)} node(s) saved to {args.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+按时间预算预览刷图计划（agent/utils/farm_planner.py），不连接设备。
+
+历史来自 agent 运行时记录的 debug/custom/farm_history.json；--reward 可临时指定地图的每场战斗收益权重。
+输出选中的 (地图, 职业) 执行顺序、每项预计代价与收益，以及放不下被跳过的项。
+
+用法:
+    python tools/plan_farm.py --budget 40 [--maps EastContinent VoidRealm] [--jobs warrior mage]
+        [--reward VoidRealm=2] [--history debug/custom/farm_history.json] [--share_navigation]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.farm_planner import HISTORY_PATH, FarmHistory, FarmPlanner  # type: ignore
+
+MAPS = [
+    "EastContinent",
+    "VoidRealm",
+    "FrozenContinent",
+    "ElementalLand",
+    "MistyContinent",
+    "ShadowContinent",
+    "LegionDomain",
+    "StormIsles",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按时间预算预览刷图计划")
+    parser.add_argument("--budget", type=float, required=True, help="时间预算（分钟）")
+    parser.add_argument("--maps", type=str, nargs="+", default=MAPS)
+    parser.add_argument("--jobs", type=str, nargs="+", default=["warrior"])
+    parser.add_argument("--reward", type=str, nargs="*", default=[], help="地图=每场战斗收益权重")
+    parser.add_argument("--history", type=str, default=str(HISTORY_PATH))
+    parser.add_argument("--full_nav", type=float, default=11.5, help="完整入口导航秒数（默认取 pipeline 的 post_delay 之和）")
+    parser.add_argument("--switch_nav", type=float, default=2.5, help="同职业切换地图的导航秒数")
+    parser.add_argument("--share_navigation", action="store_true", help="按 FarmAllMaps 计算（同职业只切换地图）")
+    args = parser.parse_args()
+
+    history = FarmHistory(Path(args.history))
+    for item in args.reward:
+        name, weight = item.split("=")
+        history.reward_per_battle[name] = float(weight)
+    switch = args.switch_nav if args.share_navigation else args.full_nav
+    planner = FarmPlanner(args.budget * 60, args.full_nav, switch, history)
+
+    items = [(m, j) for j in args.jobs for m in args.maps]
+    plan = planner.plan(items)
+    known = sum(1 for m, j in items if FarmHistory.key(m, j) in history.items)
+    print(f"{len(items)} items ({known} with history), budget {args.budget:.0f} min")
+
+    jobs: set = set()
+    elapsed = reward_total = 0.0
+    print(f"{'#':>3}  {'map/job':<30}{'cost s':>8}{'reward':>8}{'reward/min':>12}{'end min':>9}")
+    for index, item in enumerate(plan):
+        cost, reward = planner.cost(item, jobs)
+        jobs.add(item[1])
+        elapsed += cost
+        reward_total += reward
+        print(f"{index:>3}  {item[0] + '/' + item[1]:<30}{cost:>8.0f}{reward:>8.1f}{reward / cost * 60:>12.2f}{elapsed / 60:>9.1f}")
+    skipped = [i for i in items if i not in plan]
+    print(f"expected reward {reward_total:.1f} in {elapsed / 60:.1f} min")
+    if skipped:
+        print("skipped: " + ", ".join(f"{m}/{j}" for m, j in skipped))
+
+
+if __name__ == "__main__":
+    main()
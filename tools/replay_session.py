@@ -0,0 +1,94 @@
+"""
+会话录制（.mysr，见 agent/utils/session.py）的查看、导出与解码基准。
+
+用法:
+    python tools/replay_session.py <session.mysr>                  # 概要
+    python tools/replay_session.py <session.mysr> --timeline       # 帧与事件时间线
+    python tools/replay_session.py <session.mysr> --export <dir> [--start 0 --end 100]
+    python tools/replay_session.py <session.mysr> --bench          # 顺序 / 随机解码速度
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.session import KIND_KEYFRAME, SessionReader  # type: ignore
+
+
+def print_summary(reader: SessionReader):
+    frames = reader.frame_count
+    keyframes = sum(1 for _, kind, _ in reader.frames if kind == KIND_KEYFRAME)
+    events = len(reader.event_offsets)
+    size = reader.path.stat().st_size
+    print(f"file: {reader.path} ({size / 1024 / 1024:.2f} MB)")
+    print(f"frames: {frames} (keyframes {keyframes}), events: {events}")
+    if frames:
+        shape = reader.frame(0).shape
+        raw = shape[0] * shape[1] * shape[2] * frames
+        duration = reader.timestamp(frames - 1) - reader.timestamp(0)
+        print(f"frame shape: {shape}, duration: {duration:.1f}s, compression: {raw / max(size, 1):.1f}x")
+
+
+def print_timeline(reader: SessionReader):
+    start = None
+    for timestamp, kind, item in reader.timeline():
+        start = timestamp if start is None else start
+        print(f"{timestamp - start:>10.3f}  {kind:<6} {item}")
+
+
+def export(reader: SessionReader, directory: Path, start: int, end: int):
+    from PIL import Image
+
+    directory.mkdir(parents=True, exist_ok=True)
+    end = min(end, reader.frame_count) if end >= 0 else reader.frame_count
+    for i in range(start, end):
+        # BGR -> RGB
+        Image.fromarray(reader.frame(i)[:, :, ::-1]).save(directory / f"{i:06d}.png")
+    print(f"exported {end - start} frames to {directory}")
+
+
+def bench(reader: SessionReader, samples: int = 200):
+    if not reader.frame_count:
+        print("no frames")
+        return
+
+    start = time.perf_counter()
+    for _ in reader.iter_frames():
+        pass
+    sequential = time.perf_counter() - start
+    print(f"sequential: {reader.frame_count / sequential:.1f} fps")
+
+    indices = [random.randrange(reader.frame_count) for _ in range(samples)]
+    start = time.perf_counter()
+    for i in indices:
+        reader.frame(i)
+    random_access = (time.perf_counter() - start) / samples
+    print(f"random access: {random_access * 1000:.2f} ms/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话录制查看 / 导出 / 基准")
+    parser.add_argument("session", type=str)
+    parser.add_argument("--timeline", action="store_true")
+    parser.add_argument("--export", type=str, default=None)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--end", type=int, default=-1)
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+
+    with SessionReader(Path(args.session)) as reader:
+        print_summary(reader)
+        if args.timeline:
+            print_timeline(reader)
+        if args.export:
+            export(reader, Path(args.export), args.start, args.end)
+        if args.bench:
+            bench(reader)
+
+
+if __name__ == "__main__":
+    main()
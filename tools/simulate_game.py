@@ -0,0 +1,445 @@
+"""
+无界面游戏模拟器：把游戏界面建模为状态机，用合成画面驱动完整的 pipeline 做端到端性能测试。
+
+会话录制的画面不会响应点击，无法离线跑通 FreeDungeonTask / MapJobCommon 的完整循环。
+GameSimulator 是一个 CustomController，截图返回当前界面的合成画面，点击按 pipeline
+与自定义动作使用的坐标（720 短边竖屏）驱动界面跳转：
+
+    home ──(360,50)──> map ──(360,1065)──> map_selector ──(SelectMap 坐标)──> map
+    map ──(绿色标记)──> dungeon ──(360,920)──> battle ──(战斗结束)──> result（出现礼包图标）
+    result ──(360,50)──> map（该标记消失）
+    home / map ──(50,50)──> character_select ──(任意角色)──(360,800)──> home
+
+每次跳转先显示 --latency 秒的加载画面，期间点击被忽略（计入 ignored_clicks）。
+可注入两类故障检验恢复流程（均由 --seed 决定，结果可复现）：
+- --popup_rate：战斗结束后弹窗遮住结算界面，需返回键关闭
+- --stuck_rate：战斗卡死，画面静止且不会结束，需返回键退出（标记保留）
+
+以 AgentClient 身份启动 agent/main.py 子进程，按 --runs 次执行 --entry 任务，输出每次的耗时、
+战斗数、清除的标记数与故障恢复情况，以及汇总的每小时战斗数。
+可用 --override 叠加 pipeline 覆盖（如 tools/tune_delays.py 的输出），比较调参前后的整轮吞吐。
+
+--record 开启 agent 的会话录制，并通过 AgentClient.register_sink 把任务器事件转发给 agent，
+录制中因此带有 next 列表的命中 / 耗时统计（agent/custom/sink/node_stats.py），
+结束时输出录制文件路径，可直接交给 tools/order_next_lists.py。
+--probe_settle 另外开启动作后的稳定探测（agent/custom/sink/settle_probe.py），录制可交给 tools/tune_delays.py。
+
+用法:
+    python tools/simulate_game.py [--entry FreeDungeonTask] [--map EastContinent] [--markers 3]
+        [--battle_seconds 5] [--popup_rate 0.2] [--stuck_rate 0.1] [--runs 3] [--override x.json] [--record] [--probe_settle]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+
+from maa.agent_client import AgentClient
+from maa.resource import Resource
+from maa.tasker import Tasker
+
+from stress_agent import StandInController, project_dir  # type: ignore
+
+WIDTH, HEIGHT = 720, 1280
+KEY_BACK = 4
+
+# agent/main.py 开启 MAA_RECORD_SESSION 时的录制目录（agent/utils/logger.py 的 log_dir / "sessions"）
+SESSION_DIR = project_dir / "debug" / "custom" / "sessions"
+
+# 地图选择界面中各地图的位置，与 agent/custom/action/select_map.py 的默认坐标一致
+MAP_ROWS = {
+    "EastContinent": 665,
+    "VoidRealm": 710,
+    "FrozenContinent": 755,
+    "ElementalLand": 800,
+    "MistyContinent": 847,
+    "ShadowContinent": 893,
+    "LegionDomain": 940,
+    "StormIsles": 989,
+}
+
+# 按钮区域 (x, y, w, h)，覆盖对应 DirectHit 节点的 target
+TOP_ENTRY = (300, 20, 120, 60)  # ClickMapEntry / BackToMap / RecoverBackToMap
+SETTINGS = (20, 20, 60, 60)  # ClickSettingsButton
+MAP_SELECTOR = (300, 1040, 120, 50)  # ClickMapSelector
+GO_BUTTON = (300, 895, 120, 50)  # ClickGoButton
+ENTER_BUTTON = (300, 775, 120, 50)  # ClickEnterButton
+
+# 进入各界面的默认加载时间（秒）
+DEFAULT_LATENCY = {
+    "home": 3.0,
+    "map": 0.8,
+    "map_selector": 0.5,
+    "dungeon": 0.4,
+    "battle": 1.0,
+    "result": 0.5,
+    "popup": 0.2,
+    "character_select": 0.8,
+}
+
+# 各界面的背景色 (BGR)
+SCREEN_COLORS = {
+    "home": (90, 60, 40),
+    "map": (60, 110, 70),
+    "map_selector": (120, 90, 60),
+    "dungeon": (70, 70, 120),
+    "battle": (40, 40, 160),
+    "result": (150, 130, 50),
+    "popup": (200, 200, 200),
+    "character_select": (110, 60, 110),
+    "loading": (15, 15, 15),
+}
+
+MARKER_BGR = (123, 219, 57)  # FindFreeDungeon 的 [57, 219, 123] RGB
+MARKER_SIZE = 12
+GIFT_POSITION = (600, 40)
+
+
+def inside(x: int, y: int, rect: Tuple[int, int, int, int]) -> bool:
+    return rect[0] <= x < rect[0] + rect[2] and rect[1] <= y < rect[1] + rect[3]
+
+
+class GameSimulator(StandInController):
+    """
+    按状态机响应点击的替身控制器。
+
+    界面跳转与故障注入只依赖 seed 和调用顺序；加载时间、战斗时长是真实等待，除以 speed。
+    """
+
+    def __init__(
+        self,
+        markers: int = 3,
+        battle_seconds: float = 5.0,
+        latency: Optional[Dict[str, float]] = None,
+        popup_rate: float = 0.0,
+        stuck_rate: float = 0.0,
+        speed: float = 1.0,
+        seed: int = 0,
+    ):
+        super().__init__(WIDTH, HEIGHT)
+        self.marker_count = markers
+        self.battle_seconds = battle_seconds / speed
+        self.latency = {k: v / speed for k, v in {**DEFAULT_LATENCY, **(latency or {})}.items()}
+        self.popup_rate = popup_rate
+        self.stuck_rate = stuck_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._frames: Dict[tuple, np.ndarray] = {}
+        gift = Image.open(project_dir / "assets" / "resource" / "base" / "image" / "gift.png").convert("RGB")
+        self._gift = np.asarray(gift)[:, :, ::-1]
+
+        self.screen = "home"
+        self.current_map = "EastContinent"
+        # 地图 -> 剩余标记的左上角坐标
+        self.markers: Dict[str, List[Tuple[int, int]]] = {}
+        self._loading_until = 0.0
+        self._battle_end = 0.0
+        self._battle_marker: Optional[Tuple[int, int]] = None
+        self._stuck = False
+        self._character_chosen = False
+        self.stats = {
+            "clicks": 0,
+            "ignored_clicks": 0,
+            "battles": 0,
+            "markers_cleared": 0,
+            "popups": 0,
+            "stuck": 0,
+            "recovered": 0,
+            "transitions": 0,
+        }
+
+    # ---------- 状态机 ----------
+
+    def map_markers(self, name: str) -> List[Tuple[int, int]]:
+        if name not in self.markers:
+            rng = random.Random(f"{self.seed}:{name}")
+            # 标记放在按钮之外的中部区域，间隔足够大，点击偏移不会落到相邻标记
+            slots = [(x, y) for y in range(200, 1000, 110) for x in range(120, 600, 120)]
+            self.markers[name] = rng.sample(slots, min(self.marker_count, len(slots)))
+        return self.markers[name]
+
+    def remaining_markers(self) -> int:
+        """已进入过的地图上剩余的标记数。"""
+        return sum(len(markers) for markers in self.markers.values())
+
+    def _go(self, screen: str):
+        self.screen = screen
+        self._loading_until = time.monotonic() + self.latency.get(screen, 0.0)
+        self.stats["transitions"] += 1
+        if screen == "battle":
+            self._battle_end = self._loading_until + self.battle_seconds
+            self._stuck = self._rng.random() < self.stuck_rate
+            self.stats["stuck"] += self._stuck
+
+    def _advance(self, now: float):
+        if self.screen == "battle" and not self._stuck and now >= self._battle_end:
+            self.stats["battles"] += 1
+            self.markers[self.current_map].remove(self._battle_marker)
+            self.stats["markers_cleared"] += 1
+            if self._rng.random() < self.popup_rate:
+                self.stats["popups"] += 1
+                self._go("popup")
+            else:
+                self._go("result")
+
+    def _click(self, x: int, y: int):
+        now = time.monotonic()
+        self._advance(now)
+        self.stats["clicks"] += 1
+        if now < self._loading_until or self.screen in ("battle", "popup"):
+            self.stats["ignored_clicks"] += 1
+            return
+
+        screen = self.screen
+        if screen in ("home", "map") and inside(x, y, SETTINGS):
+            self._character_chosen = False
+            self._go("character_select")
+        elif screen in ("home", "map_selector", "dungeon", "result") and inside(x, y, TOP_ENTRY):
+            self._go("map")
+        elif screen == "map" and inside(x, y, MAP_SELECTOR):
+            self._go("map_selector")
+        elif screen == "map_selector":
+            row = next((m for m, row_y in MAP_ROWS.items() if 200 <= x < 520 and abs(y - row_y) <= 20), None)
+            if row is None:
+                self.stats["ignored_clicks"] += 1
+                return
+            self.current_map = row
+            self._go("map")
+        elif screen == "map":
+            # FindFreeDungeon 点击标记框偏移 (-30, +20) 的位置
+            marker = next(
+                (m for m in self.map_markers(self.current_map) if abs(x - m[0]) <= 50 and abs(y - m[1]) <= 50),
+                None,
+            )
+            if marker is None:
+                self.stats["ignored_clicks"] += 1
+                return
+            self._battle_marker = marker
+            self._go("dungeon")
+        elif screen == "dungeon" and inside(x, y, GO_BUTTON):
+            self._go("battle")
+        elif screen == "character_select":
+            if inside(x, y, ENTER_BUTTON):
+                if self._character_chosen:
+                    self._go("home")
+                else:
+                    self.stats["ignored_clicks"] += 1
+            else:
+                # 角色列表铺满界面，SelectJob 的坐标都落在某个角色上
+                self._character_chosen = True
+        else:
+            self.stats["ignored_clicks"] += 1
+
+    def _back(self):
+        now = time.monotonic()
+        self._advance(now)
+        if now < self._loading_until:
+            return
+        if self.screen == "popup":
+            self.stats["recovered"] += 1
+            self._go("result")
+        elif self.screen == "battle" and self._stuck:
+            # 退出卡死的战斗，标记保留
+            self.stats["recovered"] += 1
+            self._stuck = False
+            self._go("map")
+
+    # ---------- 画面 ----------
+
+    def _render(self, screen: str) -> np.ndarray:
+        markers = tuple(self.map_markers(self.current_map)) if screen == "map" else ()
+        key = (screen, markers)
+        if key not in self._frames:
+            frame = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+            frame[:] = SCREEN_COLORS[screen]
+            if screen != "loading":
+                # 顶栏与界面特有的色块，使各界面的画面特征互相区分
+                frame[:100] = np.array(SCREEN_COLORS[screen]) // 2
+                index = list(SCREEN_COLORS).index(screen)
+                frame[300 + index * 60 : 360 + index * 60, 40:680] = 255 - np.array(SCREEN_COLORS[screen])
+            if screen == "map_selector":
+                for row_y in MAP_ROWS.values():
+                    frame[row_y - 15 : row_y + 15, 200:520] = (200, 180, 150)
+            for mx, my in markers:
+                frame[my : my + MARKER_SIZE, mx : mx + MARKER_SIZE] = MARKER_BGR
+            if screen == "result":
+                gx, gy = GIFT_POSITION
+                frame[gy : gy + self._gift.shape[0], gx : gx + self._gift.shape[1]] = self._gift
+            frame.setflags(write=False)
+            self._frames[key] = frame
+        return self._frames[key]
+
+    def screencap(self) -> np.ndarray:
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            if now < self._loading_until:
+                return self._render("loading")
+            frame = self._render(self.screen)
+            if self.screen == "battle" and not self._stuck:
+                # 战斗动画：移动的色带，避免被看门狗判定为画面静止
+                frame = frame.copy()
+                offset = int(now * 400) % (HEIGHT - 200)
+                frame[offset : offset + 200] = 255 - frame[offset : offset + 200]
+            return frame
+
+    def click(self, x: int, y: int) -> bool:
+        with self._lock:
+            self._click(x, y)
+        return True
+
+    def touch_down(self, contact: int, x: int, y: int, pressure: int) -> bool:
+        # 框架的 Click 动作走 touch_down / touch_up
+        return self.click(x, y)
+
+    def click_key(self, keycode: int) -> bool:
+        if keycode == KEY_BACK:
+            with self._lock:
+                self._back()
+        return True
+
+    def key_down(self, keycode: int) -> bool:
+        return self.click_key(keycode)
+
+
+def load_overrides(paths: List[str]) -> Dict[str, dict]:
+    override: Dict[str, dict] = {}
+    for path in paths:
+        for node, fields in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            override.setdefault(node, {}).update(fields)
+    return override
+
+
+def start_agent(client: AgentClient, record: bool = False, probe_settle: bool = False) -> subprocess.Popen:
+    env = dict(os.environ)
+    if record or probe_settle:
+        env["MAA_RECORD_SESSION"] = "1"
+    if probe_settle:
+        env["MAA_PROBE_SETTLE"] = "1"
+    return subprocess.Popen(
+        [sys.executable, str(project_dir / "agent" / "main.py"), client.identifier],
+        cwd=project_dir,
+        env=env,
+    )
+
+
+def stop_agent(client: AgentClient, agent: subprocess.Popen):
+    """断开后等待 agent 自行退出（关闭录制文件），超时再强制结束。"""
+    client.disconnect()
+    try:
+        agent.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        agent.terminate()
+        agent.wait(timeout=10)
+
+
+def latest_session(since: float) -> Optional[Path]:
+    """since（time.time()）之后创建的最新录制文件。"""
+    sessions = [p for p in SESSION_DIR.glob("*.mysr") if p.stat().st_mtime >= since] if SESSION_DIR.exists() else []
+    return max(sessions, key=lambda p: p.stat().st_mtime, default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面游戏模拟器端到端测试")
+    parser.add_argument("--entry", type=str, default="FreeDungeonTask")
+    parser.add_argument("--map", type=str, default="EastContinent", choices=list(MAP_ROWS))
+    parser.add_argument("--job", type=str, default="warrior")
+    parser.add_argument("--markers", type=int, default=3, help="每张地图的免费副本标记数")
+    parser.add_argument("--battle_seconds", type=float, default=5.0)
+    parser.add_argument("--latency", type=str, default=None, help='JSON，覆盖界面加载时间，如 {"map": 1.5}')
+    parser.add_argument("--popup_rate", type=float, default=0.0)
+    parser.add_argument("--stuck_rate", type=float, default=0.0)
+    parser.add_argument("--speed", type=float, default=1.0, help="加载与战斗时间除以该倍数")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--override", type=str, action="append", default=[], help="叠加的 pipeline 覆盖 JSON")
+    parser.add_argument("--record", action="store_true", help="开启会话录制并转发任务器事件，供 order_next_lists.py 使用")
+    parser.add_argument(
+        "--probe_settle", action="store_true", help="同 --record，并在每个动作后探测画面稳定时间，供 tune_delays.py 使用"
+    )
+    args = parser.parse_args()
+
+    resource = Resource()
+    resource.post_bundle(project_dir / "assets" / "resource" / "base").wait()
+    override = load_overrides(args.override)
+    if override:
+        resource.override_pipeline(override)
+    task_override = {
+        "SelectMapByParam": {"action": {"param": {"custom_action_param": {"map": args.map}}}},
+        "RecognizeJobCharacter": {"action": {"param": {"custom_action_param": {"job": args.job}}}},
+        # 地图入口（MapCleanup / FarmAllMaps）按 attach 中的 use_<职业> 选择职业
+        args.entry: {"attach": {f"use_{args.job}": True}},
+    }
+
+    client = AgentClient()
+    client.bind(resource)
+    started = time.time()
+    record = args.record or args.probe_settle
+    agent = start_agent(client, record, args.probe_settle)
+
+    try:
+        if not client.connect():
+            print("Failed to connect to agent")
+            sys.exit(1)
+
+        latency = json.loads(args.latency) if args.latency else None
+        print(
+            f"{'run':>4}{'result':>9}{'seconds':>9}{'battles':>9}{'cleared':>9}{'remaining':>11}"
+            f"{'faults':>8}{'recovered':>11}{'ignored':>9}"
+        )
+        total_seconds = total_battles = 0.0
+        registered = []
+        for run in range(args.runs):
+            controller = GameSimulator(
+                args.markers, args.battle_seconds, latency, args.popup_rate, args.stuck_rate, args.speed, args.seed + run
+            )
+            controller.post_connection().wait()
+            tasker = Tasker()
+            tasker.bind(resource, controller)
+            if not tasker.inited:
+                print("Failed to init tasker")
+                sys.exit(1)
+            if record and not client.register_sink(resource, controller, tasker):
+                print("Failed to register sinks")
+                sys.exit(1)
+            # 客户端只引用最近一次注册的对象，之前注册的任务器被释放后仍会收到转发而崩溃，运行期间都保留
+            registered.append((controller, tasker))
+
+            start = time.perf_counter()
+            detail = tasker.post_task(args.entry, task_override).wait().get()
+            elapsed = time.perf_counter() - start
+            succeeded = detail is not None and detail.status.succeeded
+            s = controller.stats
+            total_seconds += elapsed
+            total_battles += s["battles"]
+            print(
+                f"{run:>4}{'ok' if succeeded else 'failed':>9}{elapsed:>9.1f}{s['battles']:>9}"
+                f"{s['markers_cleared']:>9}{controller.remaining_markers():>11}{s['popups'] + s['stuck']:>8}{s['recovered']:>11}{s['ignored_clicks']:>9}"
+            )
+            if detail is not None and args.runs == 1:
+                print("  " + " -> ".join(f"{node.name}{'' if node.completed else '(x)'}" for node in detail.nodes if node))
+
+        if total_seconds:
+            print(f"\n{total_battles / total_seconds * 3600:.1f} battles/hour over {total_seconds:.1f}s")
+    finally:
+        stop_agent(client, agent)
+
+    if record:
+        session = latest_session(started)
+        print(f"\nsession: {session}" if session else "\nno session recorded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+agent 长时间浸泡测试：检查内存与延迟是否随运行时间漂移。
+
+以 AgentClient 身份启动 agent/main.py 子进程（开启 MAA_MEMORY_PROBE，见 agent/utils/memory_probe.py），
+在 --minutes 分钟内循环：
+- 每个 stress_agent.py 的压测节点（SelectMap / SelectJob / FrameTargets / 看门狗识别）
+  在替身控制器上各执行 --calls 次
+- 每 --flow_every 轮在 simulate_game.py 的模拟器上完整执行一次 --flow 入口（默认 EastContinent，
+  经过 MapCleanup 的 override 与重试、截图拷贝等整条链路），0 为不执行
+
+agent 每 --interval 秒采样一次 RSS、tracemalloc 增长最多的分配位置与 GC 统计；
+本进程按同样的间隔统计每个入口的延迟分位数。跳过开头 --warmup 比例的时间（模板缓存、JIT 式的首次分配）后：
+- RSS、tracemalloc 跟踪内存、GC 对象数的稳健斜率，折算为每天的增长
+- 每个入口最后 3 个窗口与最初 3 个窗口的 p50 延迟之比
+超过阈值时退出码为 1。采样、延迟窗口与报告写入 --output 目录。
+
+用法:
+    python tools/soak_agent.py [--minutes 1440] [--interval 60] [--calls 20] [--flow EastContinent]
+        [--max_rss_mb_per_day 50] [--max_traced_mb_per_day 20] [--max_latency_growth 1.5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+
+from maa.agent_client import AgentClient
+from maa.resource import Resource
+from maa.tasker import Tasker
+
+from simulate_game import GameSimulator  # type: ignore
+from stress_agent import STRESS_NODES, StandInController, percentile, project_dir  # type: ignore
+
+SOAK_ENTRIES = [
+    "StressSelectMap",
+    "StressSelectJob",
+    "StressFrameTargets",
+    "StressRecognition",
+]
+# 延迟比较取首尾各几个窗口的中位数
+EDGE_WINDOWS = 3
+
+
+def make_tasker(resource: Resource, controller) -> Tasker:
+    controller.post_connection().wait()
+    tasker = Tasker()
+    tasker.bind(resource, controller)
+    if not tasker.inited:
+        raise RuntimeError("Failed to init tasker")
+    return tasker
+
+
+def read_samples(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def per_day(times: List[float], values: List[float]) -> float:
+    """Theil-Sen 斜率（所有样本对斜率的中位数，不受偶发的内存尖峰影响），折算为每天的增长。"""
+    if len(times) < 2:
+        return 0.0
+    t, v = np.array(times), np.array(values, dtype=float)
+    i, j = np.triu_indices(len(t), 1)
+    dt = t[j] - t[i]
+    keep = dt > 0
+    return float(np.median((v[j] - v[i])[keep] / dt[keep])) * 86400
+
+
+def drift_report(samples: List[dict], windows: List[dict], args) -> dict:
+    warmup = args.minutes * 60 * args.warmup
+    steady = [s for s in samples if s["time"] >= warmup]
+    report: dict = {"samples": len(samples), "steady_samples": len(steady), "checks": {}}
+    checks = report["checks"]
+    if len(steady) >= 2:
+        times = [s["time"] for s in steady]
+        rss = per_day(times, [s["rss"] for s in steady]) / 2**20
+        traced = per_day(times, [s["traced"] for s in steady]) / 2**20
+        checks["rss_mb_per_day"] = {"value": rss, "limit": args.max_rss_mb_per_day, "ok": rss <= args.max_rss_mb_per_day}
+        checks["traced_mb_per_day"] = {
+            "value": traced,
+            "limit": args.max_traced_mb_per_day,
+            "ok": traced <= args.max_traced_mb_per_day,
+        }
+        report["objects_per_day"] = per_day(times, [s["objects"] for s in steady])
+        hours = (steady[-1]["time"] - steady[0]["time"]) / 3600
+        if hours > 0:
+            report["gc_collections_per_hour"] = [
+                (b - a) / hours for a, b in zip(steady[0]["gc_collections"], steady[-1]["gc_collections"])
+            ]
+
+        # 稳定期内增长最多的分配位置：首个稳定采样中没有出现的位置按其相对启动的增长计
+        first = {t["where"]: t["size"] for t in steady[0]["top"]}
+        growth = [
+            {"where": t["where"], "growth": t["size"] - first.get(t["where"], t["size"] - t["diff"]), "size": t["size"]}
+            for t in steady[-1]["top"]
+        ]
+        report["top_growth"] = sorted(growth, key=lambda g: g["growth"], reverse=True)[:10]
+
+    steady_windows = [w for w in windows if w["time"] >= warmup]
+    for entry in sorted({e for w in steady_windows for e in w["entries"]}):
+        p50s = [w["entries"][entry]["p50"] for w in steady_windows if entry in w["entries"]]
+        if len(p50s) < 2 * EDGE_WINDOWS:
+            continue
+        head = float(np.median(p50s[:EDGE_WINDOWS]))
+        tail = float(np.median(p50s[-EDGE_WINDOWS:]))
+        ratio = tail / head if head > 0 else 1.0
+        checks[f"latency_growth:{entry}"] = {
+            "value": ratio,
+            "limit": args.max_latency_growth,
+            "ok": ratio <= args.max_latency_growth,
+            "head_ms": head,
+            "tail_ms": tail,
+        }
+    report["passed"] = all(c["ok"] for c in checks.values())
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{report['samples']} memory samples ({report['steady_samples']} after warmup)")
+    for name, check in report["checks"].items():
+        extra = f"  ({check['head_ms']:.1f} -> {check['tail_ms']:.1f} ms)" if "head_ms" in check else ""
+        print(f"  {'ok  ' if check['ok'] else 'FAIL'} {name:<40}{check['value']:>10.2f} / {check['limit']:g}{extra}")
+    if "objects_per_day" in report:
+        print(f"  gc objects per day: {report['objects_per_day']:+.0f}")
+    if "gc_collections_per_hour" in report:
+        print("  gc collections per hour: " + ", ".join(f"{c:.0f}" for c in report["gc_collections_per_hour"]))
+    if report.get("top_growth"):
+        print("  top growing allocators since warmup:")
+        for g in report["top_growth"]:
+            print(f"    {g['growth'] / 1024:>+10.1f} KiB  {g['where']}")
+    print("PASSED" if report["passed"] else "FAILED")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="agent 长时间浸泡测试")
+    parser.add_argument("--minutes", type=float, default=1440)
+    parser.add_argument("--interval", type=float, default=60, help="内存采样与延迟统计间隔（秒）")
+    parser.add_argument("--calls", type=int, default=20, help="每轮每个入口的调用次数")
+    parser.add_argument("--entries", type=str, nargs="*", default=SOAK_ENTRIES)
+    parser.add_argument("--flow", type=str, default="EastContinent", help="在模拟器上完整执行的入口")
+    parser.add_argument("--flow_every", type=int, default=10, help="每几轮执行一次 --flow，0 为不执行")
+    parser.add_argument("--job", type=str, default="warrior")
+    parser.add_argument("--warmup", type=float, default=0.1, help="不计入漂移的开头时间比例")
+    parser.add_argument("--max_rss_mb_per_day", type=float, default=50)
+    parser.add_argument("--max_traced_mb_per_day", type=float, default=20)
+    parser.add_argument("--max_latency_growth", type=float, default=1.5)
+    parser.add_argument("--output", type=str, default=str(project_dir / "debug" / "soak" / time.strftime("%Y%m%d-%H%M%S")))
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve()
+    output.mkdir(parents=True, exist_ok=True)
+    memory_path = output / "memory.jsonl"
+
+    resource = Resource()
+    resource.post_bundle(project_dir / "assets" / "resource" / "base").wait()
+    override = dict(STRESS_NODES)
+    if args.flow:
+        # 地图入口（MapCleanup）按 attach 中的 use_<职业> 选择职业
+        override[args.flow] = {"attach": {f"use_{args.job}": True}}
+    resource.override_pipeline(override)
+
+    client = AgentClient()
+    client.bind(resource)
+    env = {**os.environ, "MAA_MEMORY_PROBE": str(memory_path), "MAA_MEMORY_PROBE_INTERVAL": str(args.interval)}
+    agent = subprocess.Popen(
+        [sys.executable, str(project_dir / "agent" / "main.py"), client.identifier],
+        cwd=project_dir,
+        env=env,
+    )
+
+    windows: List[dict] = []
+    try:
+        if not client.connect():
+            print("Failed to connect to agent")
+            sys.exit(1)
+
+        tasker = make_tasker(resource, StandInController())
+        start = time.monotonic()
+        deadline = start + args.minutes * 60
+        window_start = start
+        latencies: Dict[str, List[float]] = {}
+        cycle = 0
+        print(f"soak {args.minutes:g} min, output {output}")
+        while time.monotonic() < deadline:
+            for entry in args.entries:
+                for _ in range(args.calls):
+                    begin = time.perf_counter()
+                    tasker.post_task(entry).wait()
+                    latencies.setdefault(entry, []).append(time.perf_counter() - begin)
+            if args.flow and args.flow_every and cycle % args.flow_every == 0:
+                simulator = GameSimulator(markers=1, battle_seconds=2, speed=4, seed=cycle)
+                begin = time.perf_counter()
+                make_tasker(resource, simulator).post_task(args.flow).wait()
+                latencies.setdefault(f"flow:{args.flow}", []).append(time.perf_counter() - begin)
+            cycle += 1
+
+            now = time.monotonic()
+            if now - window_start >= args.interval:
+                window = {"time": round(now - start, 1), "entries": {}}
+                for entry, values in latencies.items():
+                    values.sort()
+                    window["entries"][entry] = {
+                        "calls": len(values),
+                        "p50": percentile(values, 50) * 1000,
+                        "p99": percentile(values, 99) * 1000,
+                    }
+                windows.append(window)
+                with open(output / "latency.jsonl", "a", encoding="utf-8") as f:
+                    f.write(json.dumps(window) + "\n")
+                samples = read_samples(memory_path)
+                rss = samples[-1]["rss"] / 2**20 if samples else 0.0
+                calls = sum(e["calls"] for e in window["entries"].values())
+                print(f"  {window['time'] / 60:>7.1f} min  cycles {cycle:>6}  calls {calls:>6}  agent rss {rss:>7.1f} MiB")
+                latencies.clear()
+                window_start = now
+    finally:
+        client.disconnect()
+        agent.terminate()
+        agent.wait(timeout=10)
+
+    report = drift_report(read_samples(memory_path), windows, args)
+    (output / "report.json").write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+    print_report(report)
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
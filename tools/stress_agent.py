@@ -0,0 +1,229 @@
+"""
+AgentServer 自定义动作 / 识别调用的 IPC 压测。
+
+以 AgentClient 身份启动 agent/main.py 子进程，用一个假的 CustomController
+（固定画面、点击立即返回）驱动 Tasker，反复执行只包含单个节点的任务：
+- baseline：DoNothing，不经过 agent，作为框架自身开销的基线
+- action：自定义动作（MyAction111 / SelectMap / SelectJob），经过 AgentServer IPC
+- recognition：自定义识别（WatchdogCheck），经过 AgentServer IPC
+
+节点的 pre_delay / post_delay 均置 0，输出每类调用的延迟分位数与吞吐。
+
+用法:
+    python tools/stress_agent.py [--calls 2000] [--concurrency 4]
+"""
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from maa.agent_client import AgentClient
+from maa.controller import CustomController
+from maa.resource import Resource
+from maa.tasker import Tasker
+
+project_dir = Path(__file__).parent.parent.resolve()
+
+
+class StandInController(CustomController):
+    """固定画面、所有操作立即成功的替身控制器。"""
+
+    def __init__(self, width: int = 1280, height: int = 720):
+        super().__init__()
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.clicks = 0
+
+    def connect(self) -> bool:
+        return True
+
+    def request_uuid(self) -> str:
+        return "stand-in"
+
+    def start_app(self, intent: str) -> bool:
+        return True
+
+    def stop_app(self, intent: str) -> bool:
+        return True
+
+    def screencap(self) -> np.ndarray:
+        return self.frame
+
+    def click(self, x: int, y: int) -> bool:
+        self.clicks += 1
+        return True
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration: int) -> bool:
+        return True
+
+    def touch_down(self, contact: int, x: int, y: int, pressure: int) -> bool:
+        return True
+
+    def touch_move(self, contact: int, x: int, y: int, pressure: int) -> bool:
+        return True
+
+    def touch_up(self, contact: int) -> bool:
+        return True
+
+    def click_key(self, keycode: int) -> bool:
+        return True
+
+    def input_text(self, text: str) -> bool:
+        return True
+
+    def key_down(self, keycode: int) -> bool:
+        return True
+
+    def key_up(self, keycode: int) -> bool:
+        return True
+
+    def scroll(self, dx: int, dy: int) -> bool:
+        return True
+
+
+def custom_action_node(name: str, param: dict = {}) -> dict:
+    return {
+        "action": {"type": "Custom", "param": {"custom_action": name, "custom_action_param": param}},
+        "pre_delay": 0,
+        "post_delay": 0,
+    }
+
+
+# 压测用节点，通过 override_pipeline 注入资源
+STRESS_NODES: Dict[str, dict] = {
+    "StressBaseline": {"action": "DoNothing", "pre_delay": 0, "post_delay": 0},
+    "StressNoopAction": custom_action_node("MyAction111"),
+    "StressSelectMap": custom_action_node("SelectMap", {"map": "EastContinent"}),
+    "StressSelectJob": custom_action_node("SelectJob", {"job": "warrior"}),
+    "StressRecognition": {
+        "recognition": {
+            "type": "Custom",
+            "param": {"custom_recognition": "WatchdogCheck", "custom_recognition_param": {}},
+        },
+        "action": "DoNothing",
+        "pre_delay": 0,
+        "post_delay": 0,
+        "timeout": 0,
+    },
+    "StressFrameTargets": {
+        "recognition": {
+            "type": "Custom",
+            "param": {
+                "custom_recognition": "FrameTargets",
+                "custom_recognition_param": {"group": "FreeDungeon", "type": "TemplateMatch", "template": "gift.png"},
+            },
+        },
+        "action": "DoNothing",
+        "pre_delay": 0,
+        "post_delay": 0,
+        "timeout": 0,
+    },
+}
+
+
+# 识别类节点在替身控制器的空白截图上不命中，任务以失败结束，不计入错误
+MISS_EXPECTED = {"StressRecognition", "StressFrameTargets"}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_worker(resource: Resource, entry: str, calls: int, latencies: List[float], errors: List[int]):
+    controller = StandInController()
+    controller.post_connection().wait()
+    tasker = Tasker()
+    tasker.bind(resource, controller)
+    if not tasker.inited:
+        errors.append(calls)
+        return
+
+    for _ in range(calls):
+        start = time.perf_counter()
+        detail = tasker.post_task(entry).wait().get()
+        latencies.append(time.perf_counter() - start)
+        if entry not in MISS_EXPECTED and (detail is None or not detail.status.succeeded):
+            errors.append(1)
+
+
+def stress(resource: Resource, entry: str, calls: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors: List[int] = []
+    per_worker = max(1, calls // concurrency)
+    threads = [
+        threading.Thread(target=run_worker, args=(resource, entry, per_worker, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "errors": sum(errors),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p90": percentile(latencies, 90) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "max": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentServer IPC 压测")
+    parser.add_argument("--calls", type=int, default=2000, help="每类调用的总次数")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发 Tasker 数")
+    parser.add_argument("--entries", type=str, nargs="*", default=list(STRESS_NODES))
+    args = parser.parse_args()
+
+    resource = Resource()
+    resource.post_bundle(project_dir / "assets" / "resource" / "base").wait()
+    resource.override_pipeline(STRESS_NODES)
+
+    client = AgentClient()
+    client.bind(resource)
+    agent = subprocess.Popen(
+        [sys.executable, str(project_dir / "agent" / "main.py"), client.identifier],
+        cwd=project_dir,
+    )
+
+    try:
+        if not client.connect():
+            print("Failed to connect to agent")
+            sys.exit(1)
+
+        print(f"{'entry':<22}{'calls':>8}{'errors':>8}{'calls/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        results = {}
+        for entry in args.entries:
+            r = results[entry] = stress(resource, entry, args.calls, args.concurrency)
+            print(
+                f"{entry:<22}{r['calls']:>8}{r['errors']:>8}{r['throughput']:>10.1f}"
+                f"{r['p50']:>10.2f}{r['p90']:>10.2f}{r['p99']:>10.2f}{r['max']:>10.2f}"
+            )
+
+        if "StressBaseline" in results:
+            baseline = results["StressBaseline"]["p50"]
+            print("\nIPC 开销（p50 减去 baseline）:")
+            for entry, r in results.items():
+                if entry != "StressBaseline":
+                    print(f"  {entry:<22}{r['p50'] - baseline:>8.2f} ms")
+    finally:
+        client.disconnect()
+        agent.terminate()
+        agent.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
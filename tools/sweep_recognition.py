@@ -0,0 +1,227 @@
+"""
+识别参数扫描：在带标注的帧语料库（tools/build_corpus.py）上比较各识别节点不同参数的准确率与耗时。
+
+对语料库中标注过的每个节点，按参数网格生成变体：
+- TemplateMatch：threshold
+- ColorMatch：颜色容差（lower / upper 各向外扩展）、count 倍数
+- 两者共有：ROI（原始 / 向四周扩大 50% / 整帧）、截图短边（缩放后求值，模板与 ROI 同比缩放）
+
+每个变体在全部帧上用单帧求值（agent/utils/frame_targets.py）识别，与标注比较：
+命中且框中心落在标注框内为 TP，标注之外的命中为 FP（命中位置不对同时计 FP 与 FN），漏识别为 FN。
+统计按帧权重（语料库去重前代表的原始帧数）加权。变体分发到进程池并行求值，
+耗时取每个变体 --repeat 次中的最小值，并行时各进程互相争用 CPU，耗时只适合横向比较。
+
+输出每个节点的 Pareto 表（没有其他变体同时更快、精确率与召回率都不更低），
+当前参数标 *，满足 --min_precision / --min_recall 的最快变体标 →。
+
+注意：语料库标注由当前参数生成，准确率是相对当前参数的一致性；标注经人工修正后才是真实准确率。
+
+用法:
+    python tools/sweep_recognition.py --corpus corpus/ [--node FindFreeDungeon] [--output sweep.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.coords import BASE_SHORT_SIDE  # type: ignore
+from agent.utils.frame_targets import FrameFeatures, evaluate, target_key  # type: ignore
+from bench_resolution import resize  # type: ignore
+from build_corpus import label_targets, load_corpus  # type: ignore
+from utils import assets_dir, load_pipeline  # type: ignore
+
+THRESHOLDS = (0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95)
+COLOR_TOLERANCES = (0, 5, 10, 20)
+COUNT_FACTORS = (0.25, 0.5, 1, 2)
+ROI_MODES = ("roi", "pad", "full")
+SHORT_SIDES = (720, 540, 480, 360)
+
+
+def widen(value, tolerance: int, sign: int):
+    if value and isinstance(value[0], list):
+        return [widen(v, tolerance, sign) for v in value]
+    return [max(0, min(255, v + sign * tolerance)) for v in value]
+
+
+def pad_roi(roi: List[int]) -> List[int]:
+    x, y, w, h = roi
+    return [max(0, x - w // 4), max(0, y - h // 4), w + w // 2, h + h // 2]
+
+
+def variants(target: dict, short_sides: Tuple[int, ...]) -> List[Tuple[dict, dict]]:
+    """返回 [(参数说明, 目标)]，第一个为当前参数。"""
+    has_roi = bool(target.get("roi")) and target["roi"][2] > 0 and target["roi"][3] > 0
+    if target["type"] == "TemplateMatch":
+        current = target.get("threshold", 0.7)
+        grid = [{"threshold": t} for t in sorted({current, *THRESHOLDS})]
+    else:
+        current = target.get("count", 1)
+        grid = [
+            {"tolerance": t, "count": max(1, round(current * f))}
+            for t, f in itertools.product(COLOR_TOLERANCES, COUNT_FACTORS)
+        ]
+    roi_modes = ROI_MODES if has_roi else ("full",)
+
+    result = []
+    for params, roi_mode, short_side in itertools.product(grid, roi_modes, short_sides):
+        variant = dict(target)
+        if "threshold" in params:
+            variant["threshold"] = params["threshold"]
+        else:
+            variant["lower"] = widen(target["lower"], params["tolerance"], -1)
+            variant["upper"] = widen(target["upper"], params["tolerance"], 1)
+            variant["count"] = params["count"]
+        if roi_mode == "pad":
+            variant["roi"] = pad_roi(target["roi"])
+        elif roi_mode == "full":
+            variant.pop("roi", None)
+        result.append(({**params, "roi": roi_mode, "short_side": short_side}, variant))
+
+    baseline = {"threshold": current} if target["type"] == "TemplateMatch" else {"tolerance": 0, "count": current}
+    baseline.update(roi="roi" if has_roi else "full", short_side=BASE_SHORT_SIDE)
+    result.sort(key=lambda item: item[0] != baseline)
+    return result
+
+
+# 进程池工作进程内的语料库：短边 -> [(帧, 权重, 标注)]
+_frames: Dict[int, List[Tuple[np.ndarray, int, dict]]] = {}
+_corpus: Tuple[List[np.ndarray], List[dict]] = ([], [])
+
+
+def _init_worker(corpus: str):
+    global _corpus
+    # 模板路径相对资源目录，与 agent 运行时一致
+    _corpus = load_corpus(Path(corpus))
+    os.chdir(assets_dir)
+
+
+def _frames_at(short_side: int) -> List[Tuple[np.ndarray, int, dict]]:
+    if short_side not in _frames:
+        frames, labels = _corpus
+        _frames[short_side] = [
+            (frame if min(frame.shape[:2]) == short_side else resize(frame, short_side), item["weight"], item["hits"])
+            for frame, item in zip(frames, labels)
+        ]
+    return _frames[short_side]
+
+
+def run_variant(job: Tuple[str, dict, dict, int]) -> dict:
+    node, params, target, repeat = job
+    frames = _frames_at(params["short_side"])
+    key = target_key(target)
+
+    best: Optional[float] = None
+    for _ in range(repeat):
+        results = []
+        start = time.perf_counter()
+        for frame, _, _ in frames:
+            results.append(evaluate(FrameFeatures(frame), [target])[key])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tp = fp = fn = 0
+    for (frame, weight, hits), (hit, box, _) in zip(frames, results):
+        expected = hits.get(node)
+        if hit:
+            # 预测框换回基准分辨率，中心落在标注框内才算识别正确
+            factor = BASE_SHORT_SIDE / min(frame.shape[:2])
+            cx, cy = (box[0] + box[2] / 2) * factor, (box[1] + box[3] / 2) * factor
+            if expected and expected[0] <= cx <= expected[0] + expected[2] and expected[1] <= cy <= expected[1] + expected[3]:
+                tp += weight
+                continue
+            fp += weight
+        if expected:
+            fn += weight
+
+    return {
+        "node": node,
+        "params": params,
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "ms": best / max(len(frames), 1) * 1000,
+    }
+
+
+def pareto(rows: List[dict]) -> List[dict]:
+    """去掉被支配的变体（另一变体不更慢、精确率与召回率不更低且至少一项更好）。"""
+    front = []
+    for row in sorted(rows, key=lambda r: (r["ms"], -r["precision"], -r["recall"])):
+        if not any(o["precision"] >= row["precision"] and o["recall"] >= row["recall"] for o in front):
+            front.append(row)
+    return front
+
+
+def format_params(params: dict) -> str:
+    return " ".join(f"{k}={v}" for k, v in params.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="识别参数扫描（准确率 vs 耗时）")
+    parser.add_argument("--corpus", type=str, required=True, help="tools/build_corpus.py 的输出目录")
+    parser.add_argument("--node", type=str, action="append", default=[], help="只扫描这些节点")
+    parser.add_argument("--short_sides", type=int, nargs="+", default=list(SHORT_SIDES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--min_precision", type=float, default=1.0)
+    parser.add_argument("--min_recall", type=float, default=1.0)
+    parser.add_argument("--output", type=str, default=None, help="写出全部结果 JSON")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus).resolve()
+    labels = json.loads((corpus / "labels.json").read_text(encoding="utf-8"))
+    targets = label_targets(load_pipeline())
+    nodes = [n for n in labels["nodes"] if n in targets and (not args.node or n in args.node)]
+    if not nodes:
+        print("语料库中没有可扫描的节点")
+        return
+    positives = {n: sum(1 for item in labels["frames"] if n in item["hits"]) for n in nodes}
+
+    jobs = [
+        (node, params, target, args.repeat)
+        for node in nodes
+        # 基准分辨率总是参与，作为当前参数的对照
+        for params, target in variants(targets[node], tuple(sorted({BASE_SHORT_SIDE, *args.short_sides}, reverse=True)))
+    ]
+    print(f"{len(labels['frames'])} frames, {len(nodes)} nodes, {len(jobs)} variants, {args.workers} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(str(corpus),)) as pool:
+        rows = list(pool.map(run_variant, jobs, chunksize=4))
+    print(f"swept in {time.perf_counter() - start:.1f}s")
+
+    report = {}
+    for node in nodes:
+        node_rows = [r for r in rows if r["node"] == node]
+        baseline = node_rows[0]
+        acceptable = [r for r in node_rows if r["precision"] >= args.min_precision and r["recall"] >= args.min_recall]
+        pick = min(acceptable, key=lambda r: r["ms"]) if acceptable else None
+        front = pareto(node_rows)
+        report[node] = {"baseline": baseline, "recommended": pick, "pareto": front, "all": node_rows}
+
+        print(f"\n{node} ({targets[node]['type']}, {positives[node]} positive frames)")
+        print(f"    {'precision':>9} {'recall':>7} {'ms/frame':>9}  params")
+        shown = front + [r for r in (baseline, pick) if r is not None and r not in front]
+        for row in sorted(shown, key=lambda r: r["ms"]):
+            mark = ("*" if row is baseline else " ") + ("→" if row is pick else " ")
+            print(f"  {mark}{row['precision']:>9.3f} {row['recall']:>7.3f} {row['ms']:>9.2f}  {format_params(row['params'])}")
+        if pick is None:
+            print(f"  没有变体满足 precision ≥ {args.min_precision}, recall ≥ {args.min_recall}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"\n-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
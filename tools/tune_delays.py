@@ -0,0 +1,213 @@
+"""
+根据会话录制中画面实际稳定的时间，为各节点计算最小安全 post_delay / rate_limit，生成 pipeline_override。
+
+数据来源（agent 侧开启 MAA_RECORD_SESSION=1，并设置 MAA_PROBE_SETTLE=1）：
+- node_action 事件 + 其后的探测截图（agent/custom/sink/settle_probe.py）
+- next_list / node_recognition 事件（agent/custom/sink/node_stats.py）
+两者都来自任务器事件，客户端须调用 AgentClient.register_sink 转发；可用 tools/simulate_game.py --probe_settle 录制。
+
+post_delay：动作结束后，找到第一帧 i，使其后 --stable_ms 内所有帧与它的平均像素差都低于 --threshold，
+该帧的时间即画面稳定时间；探测窗口内始终未稳定的样本按窗口长度计（保守）。
+取 --percentile 分位 + --margin_ms，向上取整到 50 ms；画面从不变化的节点为 0。
+
+rate_limit：节点 next 列表每轮截图循环的识别耗时取同一分位，不低于 --min_rate_limit。
+降低 rate_limit 只缩短发现画面变化的等待（平均为间隔的一半），代价是更频繁的截图 / 识别。
+
+节省时间按每次完整刷图运行统计（录制中自定义动作为 MapCleanup / FarmAllMaps 的入口节点，
+如 EastContinent、FarmAllMaps 的动作次数）；录制中没有这类入口时按每个录制文件统计。预编译变体（tools/generate_variants.py）的样本计入原节点，
+生成的 override 同时覆盖原节点与其变体。可用 analyze_pipeline.py --override 查看调整后的延迟预算。
+
+用法:
+    python tools/tune_delays.py a.mysr [b.mysr ...] [--percentile 99] [--output tuned_delays.json]
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+sys.path.insert(0, Path(__file__).parent.__str__())
+sys.path.insert(0, Path(__file__).parent.parent.__str__())
+
+from agent.utils.session import SessionReader  # type: ignore
+from analyze_pipeline import DEFAULT_POST_DELAY, DEFAULT_RATE_LIMIT, apply_override, custom_action_name  # type: ignore
+from generate_variants import collect_jobs, collect_maps, generate_variants  # type: ignore
+from order_next_lists import collect_rounds, split_scans  # type: ignore
+from utils import assets_dir, load_jsonc, load_pipeline  # type: ignore
+
+# 自定义动作为这些之一的节点是一次完整刷图运行的入口
+RUN_ACTIONS = ("MapCleanup", "FarmAllMaps")
+# 与 agent/custom/sink/settle_probe.py 中的 PROBE_EXTRA_SECONDS 一致
+PROBE_EXTRA_SECONDS = 1.0
+
+
+def thumbnail(image: np.ndarray) -> np.ndarray:
+    return image[::8, ::8, :3].mean(axis=2, dtype=np.float32)
+
+
+def settle_time(frames: List[Tuple[float, np.ndarray]], stable: float, threshold: float) -> Optional[float]:
+    """
+    frames 为 (相对动作结束的秒数, 缩略图)，时间为截图返回时刻。返回画面稳定的时刻；窗口内未稳定返回 None。
+
+    稳定帧的内容不早于其截图开始（约为上一帧返回）时的画面，因此取上一帧的时间；第一帧即稳定时为 0。
+    """
+    for i, (t, reference) in enumerate(frames):
+        later = frames[i + 1 :]
+        # 需要足够长的后续帧才能判断已稳定
+        if not later or later[-1][0] - t < stable:
+            return None
+        if all(float(np.abs(image - reference).mean()) < threshold for u, image in later if u - t <= stable):
+            return frames[i - 1][0] if i else 0.0
+    return None
+
+
+def collect_settle(
+    sessions: List[Path], stable: float, threshold: float, run_entries: Set[str]
+) -> Tuple[Dict[str, List[float]], Dict[str, int], int]:
+    """返回 ({节点: [稳定耗时秒, ...]}, {节点: 动作次数}, run_entries 中节点的动作次数)。"""
+    samples: Dict[str, List[float]] = defaultdict(list)
+    counts: Dict[str, int] = defaultdict(int)
+    runs = 0
+    for path in sessions:
+        with SessionReader(path) as reader:
+            pending: Optional[Tuple[str, float, float]] = None  # (节点, 动作结束时刻, 窗口秒)
+            frames: List[Tuple[float, np.ndarray]] = []
+
+            def finish():
+                if pending is None:
+                    return
+                node, _, window = pending
+                settled = settle_time(frames, stable, threshold)
+                samples[node].append(window if settled is None else settled)
+
+            frame_index = 0
+            for timestamp, kind, item in reader.timeline():
+                if kind == "frame":
+                    if pending is not None and timestamp - pending[1] <= pending[2]:
+                        frames.append((timestamp - pending[1], thumbnail(reader.frame(frame_index))))
+                    frame_index += 1
+                    continue
+                if item.get("type") != "node_action":
+                    continue
+                finish()
+                counts[item["node"]] += 1
+                runs += item["node"] in run_entries
+                pending = (item["node"], timestamp, item.get("post_delay", 0) / 1000 + PROBE_EXTRA_SECONDS)
+                frames = []
+            finish()
+    return samples, counts, runs
+
+
+def base_names(pipeline: Dict[str, dict]) -> Dict[str, str]:
+    """{变体节点名: 原节点名}"""
+    interface = load_jsonc(assets_dir / "interface.json")
+    variants = generate_variants(pipeline, collect_maps(pipeline, interface), collect_jobs(interface))
+    mapping = {}
+    for name in variants:
+        bases = [base for base in pipeline if name == base or name.startswith(base + "_")]
+        if bases:
+            mapping[name] = max(bases, key=len)
+    return mapping
+
+
+def ceil_ms(seconds: float, step: int = 50) -> int:
+    return int(math.ceil(seconds * 1000 / step) * step)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="根据录制调整 post_delay / rate_limit")
+    parser.add_argument("sessions", type=str, nargs="+", help="会话录制 .mysr")
+    parser.add_argument("--percentile", type=float, default=99, help="安全分位")
+    parser.add_argument("--margin_ms", type=int, default=100, help="分位之上的余量")
+    parser.add_argument("--stable_ms", type=int, default=300, help="画面保持不变多久视为稳定")
+    parser.add_argument("--threshold", type=float, default=2.0, help="缩略图平均像素差阈值")
+    parser.add_argument("--min_samples", type=int, default=5, help="样本少于该数的节点不调整")
+    parser.add_argument("--min_rate_limit", type=int, default=500, help="rate_limit 下限 ms")
+    parser.add_argument("--output", type=str, default="tuned_delays.json")
+    parser.add_argument(
+        "--override", type=str, action="append", default=[], help="录制时额外叠加的 pipeline_override 文件"
+    )
+    args = parser.parse_args()
+
+    sessions = [Path(s) for s in args.sessions]
+    pipeline = load_pipeline()
+    for file in args.override:
+        apply_override(pipeline, load_jsonc(Path(file)))
+    variants = base_names(pipeline)
+
+    run_entries = {name for name, node in pipeline.items() if custom_action_name(node) in RUN_ACTIONS}
+    settle, counts, runs = collect_settle(sessions, args.stable_ms / 1000, args.threshold, run_entries)
+    rounds = collect_rounds(sessions)
+    per = runs if runs else len(sessions)
+    unit = "farm run" if runs else "session"
+
+    tuned: Dict[str, dict] = defaultdict(dict)
+    saved: Dict[str, float] = defaultdict(float)
+
+    # post_delay
+    merged_settle: Dict[str, List[float]] = defaultdict(list)
+    merged_counts: Dict[str, int] = defaultdict(int)
+    for node, values in settle.items():
+        merged_settle[variants.get(node, node)] += values
+    for node, count in counts.items():
+        merged_counts[variants.get(node, node)] += count
+
+    print(f"{'post_delay':<28}{'samples':>8}{'p50 ms':>8}{'p' + format(args.percentile, 'g') + ' ms':>9}{'old':>7}{'new':>7}")
+    for node in sorted(merged_settle):
+        values = merged_settle[node]
+        if node not in pipeline or len(values) < args.min_samples:
+            continue
+        old = pipeline[node].get("post_delay", DEFAULT_POST_DELAY)
+        high = float(np.percentile(values, args.percentile))
+        new = ceil_ms(high + args.margin_ms / 1000) if high > 0 else 0
+        flag = "  ↑ 当前延迟不足" if new > old else ""
+        print(f"{node:<28}{len(values):>8}{np.median(values) * 1000:>8.0f}{high * 1000:>9.0f}{old:>7}{new:>7}{flag}")
+        if new != old:
+            tuned[node]["post_delay"] = new
+            saved[node] += (old - new) / 1000 * merged_counts[node] / per
+
+    # rate_limit
+    print(f"\n{'rate_limit':<28}{'loops':>8}{'p50 ms':>8}{'p' + format(args.percentile, 'g') + ' ms':>9}{'old':>7}{'new':>7}")
+    merged_rounds: Dict[str, list] = defaultdict(list)
+    for node, node_rounds in rounds.items():
+        merged_rounds[variants.get(node, node)] += node_rounds
+    for node in sorted(merged_rounds):
+        if node not in pipeline or "rate_limit" not in pipeline[node]:
+            continue
+        scans = [scan for r in merged_rounds[node] for scan in split_scans(r)]
+        if len(scans) < args.min_samples:
+            continue
+        costs = [sum(ms for _, _, ms in scan) for scan in scans]
+        old = pipeline[node].get("rate_limit", DEFAULT_RATE_LIMIT)
+        high = float(np.percentile(costs, args.percentile))
+        new = max(args.min_rate_limit, ceil_ms(high / 1000))
+        print(f"{node:<28}{len(scans):>8}{np.median(costs):>8.0f}{high:>9.0f}{old:>7}{new:>7}")
+        if new < old:
+            tuned[node]["rate_limit"] = new
+            # 画面变化落在一次间隔内的任意时刻，平均多等半个间隔；只在确实轮询过（有未命中循环）的轮计入
+            polled = sum(1 for r in merged_rounds[node] if len(split_scans(r)) > 1)
+            saved[node] += (old - new) / 2000 * polled / per
+
+    override: Dict[str, dict] = {}
+    for node, fields in tuned.items():
+        override[node] = dict(fields)
+        for variant, base in variants.items():
+            if base == node:
+                override[variant] = dict(fields)
+
+    print(f"\nsaved per {unit} ({per} recorded):")
+    for node, seconds in sorted(saved.items(), key=lambda item: -item[1]):
+        print(f"  {node:<28}{seconds:>8.1f} s")
+    print(f"  {'total':<28}{sum(saved.values()):>8.1f} s")
+
+    Path(args.output).write_text(json.dumps(override, ensure_ascii=False, indent=4), encoding="utf-8")
+    print(f"{len(tuned)} node(s) tuned ({len(override)} with variants), saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 from pathlib import Path
+from typing import Dict
+
+import jsonc
 
 
 def get_maafw_version():
@@ -10,4 +13,21 @@ def get_maafw_version():
             if "maafw" in line:
                 return line.split("==")[1].strip()
 
-    raise ValueError(f"MaaFramework not found in {requirements_path}")
\ No newline at end of file
+    raise ValueError(f"MaaFramework not found in {requirements_path}")
+
+project_dir = Path(__file__).parent.parent.resolve()
+assets_dir = project_dir / "assets"
+pipeline_dir = assets_dir / "resource" / "base" / "pipeline"
+
+
+def load_jsonc(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return jsonc.load(f)
+
+
+def load_pipeline(directory: Path = pipeline_dir) -> Dict[str, dict]:
+    """按文件名顺序加载目录下所有 pipeline JSON，合并为 {节点名: 节点定义}。"""
+    pipeline = {}
+    for file in sorted(Path(directory).rglob("*.json")):
+        pipeline.update(load_jsonc(file))
+    return pipeline